@@ -0,0 +1,164 @@
+"""Benchmark de `build_orders_structure` y de la agrupación de `/api/egresos`.
+
+Compara la implementación actual (vectorizada) con la anterior (un
+`groupby` iterado con `g.iloc[0]` por pedido) sobre un detalle sintético.
+
+Uso::
+
+    python scripts/bench_orders_structure.py --items 10000 --items-per-order 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from create_prints_server.domain.orders import (  # noqa: E402
+    build_orders_structure,
+    group_orders,
+    text_values,
+)
+
+
+def _synthetic_detail(items: int, items_per_order: int, seed: int = 7) -> pd.DataFrame:
+    """Detalle de ventas sintético con la forma de `build_daily_orders`.
+
+    Args:
+        items: Cantidad de líneas de ítem.
+        items_per_order: Promedio de ítems por pedido.
+        seed: Semilla del generador aleatorio.
+
+    Returns:
+        pd.DataFrame: Detalle de ventas.
+    """
+    rng = np.random.default_rng(seed)
+    orders = max(1, items // max(1, items_per_order))
+    venta_ids = rng.integers(0, orders, size=items).astype(str)
+    return pd.DataFrame(
+        {
+            "venta_id": venta_ids,
+            "fecha": pd.Timestamp("2026-02-18"),
+            "nombre": np.char.add("Cliente ", (rng.integers(0, 300, size=items)).astype(str)),
+            "destinatario": np.where(rng.random(items) < 0.3, "Destinatario", ""),
+            "direccion": "Calle 123",
+            "direccion_destinatario": np.where(rng.random(items) < 0.2, "Otra 456", "nan"),
+            "factura_despacho": rng.random(items) < 0.5,
+            "producto": "Palta Hass",
+            "calibre": "18",
+            "kg": rng.integers(1, 200, size=items).astype(float),
+            "precio_unit": rng.integers(500, 3000, size=items),
+            "precio_total": rng.integers(1000, 90000, size=items),
+        }
+    )
+
+
+def _legacy_headers(det_dia: pd.DataFrame) -> list[dict]:
+    """Cabeceras con la implementación anterior (una iteración por grupo)."""
+    headers = []
+    for venta_id, g in det_dia.groupby("venta_id", sort=False):
+        r0 = g.iloc[0]
+        fecha_str = (
+            pd.to_datetime(r0.get("fecha")).strftime("%d-%m-%y")
+            if pd.notna(r0.get("fecha"))
+            else ""
+        )
+        cliente_nombre = str(r0.get("nombre", "") or "")
+        destinatario = str(r0.get("destinatario", "") or "")
+        if destinatario:
+            cliente_nombre = f"{destinatario} ({cliente_nombre})"
+        direccion = str(r0.get("direccion", "") or "")
+        direccion_des = str(r0.get("direccion_destinatario", "") or "")
+        if direccion_des != "nan" and direccion_des:
+            direccion = direccion_des
+        cols = ["producto", "calibre", "kg", "precio_unit", "precio_total"]
+        g[cols].copy()
+        headers.append(
+            {
+                "venta_id": venta_id,
+                "fecha_str": fecha_str,
+                "cliente_nombre": cliente_nombre,
+                "direccion": direccion,
+                "total_venta": g["precio_total"].sum(skipna=True),
+                "factura_despacho": r0.get("factura_despacho", None),
+            }
+        )
+    return headers
+
+
+def _legacy_egresos(det_dia: pd.DataFrame) -> list[tuple]:
+    """Agrupación de `/api/egresos` con la implementación anterior."""
+    rows = []
+    for venta_id, g in det_dia.groupby("venta_id", sort=False):
+        r0 = g.iloc[0]
+        cliente = str(r0.get("nombre", "") or r0.get("cliente", "") or "")
+        destinatario = str(r0.get("destinatario", "") or "")
+        rows.append((str(venta_id), cliente, destinatario, int(g["precio_total"].sum(skipna=True))))
+    return rows
+
+
+def _current_egresos(det_dia: pd.DataFrame) -> list[tuple]:
+    """Agrupación de `/api/egresos` vectorizada (misma lógica que `list_egresos`)."""
+    groups = group_orders(det_dia)
+    size = len(groups)
+    nombre = text_values(groups.first(det_dia, "nombre"), size)
+    clientes = np.where(nombre != "", nombre, text_values(groups.first(det_dia, "cliente"), size))
+    destinatarios = text_values(groups.first(det_dia, "destinatario"), size)
+    totals = groups.sum(det_dia, "precio_total").tolist()
+    return [
+        (str(v), c, d, int(t))
+        for v, c, d, t in zip(groups.keys, clientes.tolist(), destinatarios.tolist(), totals)
+    ]
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    """Mejor tiempo (segundos) de `repeat` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Corre el benchmark e imprime una tabla de tiempos.
+
+    Args:
+        argv: Argumentos de línea de comandos (por defecto `sys.argv[1:]`).
+
+    Returns:
+        int: Código de salida.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--items-per-order", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    det_dia = _synthetic_detail(args.items, args.items_per_order)
+    orders = build_orders_structure(det_dia)
+    assert [o.header for o in orders] == _legacy_headers(det_dia.copy(deep=True))
+    assert _current_egresos(det_dia) == _legacy_egresos(det_dia)
+
+    cases = [
+        ("build_orders_structure", lambda: _legacy_headers(det_dia.copy(deep=True)), lambda: build_orders_structure(det_dia)),
+        ("list_egresos (agrupación)", lambda: _legacy_egresos(det_dia), lambda: _current_egresos(det_dia)),
+    ]
+    print(f"{args.items} ítems, {len(orders)} pedidos (mejor de {args.repeat})")
+    for name, legacy, current in cases:
+        before = _best_of(legacy, args.repeat)
+        after = _best_of(current, args.repeat)
+        print(f"  {name:<28} antes {before * 1000:8.1f} ms  ahora {after * 1000:7.1f} ms  x{before / after:6.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -24,3 +24,195 @@ BEGIN
   END IF;
 END $$;
 
+
+-- Upgrades idempotentes sobre tablas ya creadas por la app.
+-- `Base.metadata.create_all(...)` crea tablas nuevas completas, pero no agrega
+-- columnas a tablas existentes. Re-ejecutar este script tras actualizar la app.
+DO $$
+BEGIN
+  IF to_regclass('printing.print_jobs') IS NOT NULL THEN
+    -- Lease del worker (recuperación de jobs si el worker cae).
+    ALTER TABLE printing.print_jobs ADD COLUMN IF NOT EXISTS attempts integer NOT NULL DEFAULT 0;
+    ALTER TABLE printing.print_jobs ADD COLUMN IF NOT EXISTS locked_by varchar(100);
+    ALTER TABLE printing.print_jobs ADD COLUMN IF NOT EXISTS lease_until timestamp without time zone;
+
+    -- Reintentos con backoff.
+    ALTER TABLE printing.print_jobs ADD COLUMN IF NOT EXISTS max_attempts integer NOT NULL DEFAULT 3;
+    ALTER TABLE printing.print_jobs ADD COLUMN IF NOT EXISTS available_at timestamp without time zone NOT NULL DEFAULT now();
+
+    -- Prioridad (0 = urgente).
+    ALTER TABLE printing.print_jobs ADD COLUMN IF NOT EXISTS priority smallint NOT NULL DEFAULT 5;
+    IF NOT EXISTS (
+      SELECT 1 FROM pg_constraint
+      WHERE conname = 'ck_print_jobs_priority_range'
+        AND conrelid = 'printing.print_jobs'::regclass
+    ) THEN
+      ALTER TABLE printing.print_jobs
+        ADD CONSTRAINT ck_print_jobs_priority_range CHECK (priority BETWEEN 0 AND 9);
+    END IF;
+
+    -- Idempotencia del alta: una sola fila viva por clave.
+    ALTER TABLE printing.print_jobs ADD COLUMN IF NOT EXISTS idempotency_key varchar(64);
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_print_jobs_active_idempotency_key
+      ON printing.print_jobs (idempotency_key)
+      WHERE status NOT IN ('done', 'error') AND idempotency_key IS NOT NULL;
+
+    -- Índices parciales de los claims y del reaper (ver PrintJob.__table_args__).
+    -- Sobre tablas muy grandes conviene crearlos antes a mano con
+    -- CREATE INDEX CONCURRENTLY (no se puede dentro de un bloque DO).
+    CREATE INDEX IF NOT EXISTS ix_print_jobs_pending_shipping_priority_created_at
+      ON printing.print_jobs (priority, created_at)
+      WHERE status = 'pending' AND job_type = 'shipping_docs';
+    CREATE INDEX IF NOT EXISTS ix_print_jobs_ready_priority_created_at
+      ON printing.print_jobs (priority, created_at)
+      WHERE status = 'ready';
+    -- Reemplazados por los índices (priority, created_at).
+    DROP INDEX IF EXISTS printing.ix_print_jobs_pending_shipping_created_at;
+    DROP INDEX IF EXISTS printing.ix_print_jobs_ready_created_at;
+    CREATE INDEX IF NOT EXISTS ix_print_jobs_leased_lease_until
+      ON printing.print_jobs (lease_until)
+      WHERE status IN ('generating', 'printing');
+  END IF;
+
+  IF to_regclass('printing.print_jobs_archive') IS NOT NULL THEN
+    ALTER TABLE printing.print_jobs_archive ADD COLUMN IF NOT EXISTS priority smallint NOT NULL DEFAULT 5;
+    ALTER TABLE printing.print_jobs_archive ADD COLUMN IF NOT EXISTS idempotency_key varchar(64);
+  END IF;
+END $$;
+
+
+-- Particiones mensuales de printing.print_job_status_events.
+-- Crea (si faltan) las particiones de los meses entre `from_month` y `to_month`.
+-- Si la partición DEFAULT tiene filas de un mes que se va a crear, las
+-- reubica en la partición nueva. Retorna cuántas particiones creó.
+-- La usa `python -m printing_queue.maintenance archive`.
+CREATE OR REPLACE FUNCTION printing.ensure_status_event_partitions(from_month date, to_month date)
+RETURNS integer
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+  month_start date := date_trunc('month', from_month)::date;
+  month_end date;
+  partition_name text;
+  created integer := 0;
+BEGIN
+  IF (SELECT c.relkind FROM pg_class c
+      WHERE c.oid = to_regclass('printing.print_job_status_events')) IS DISTINCT FROM 'p' THEN
+    RETURN 0;
+  END IF;
+
+  WHILE month_start <= date_trunc('month', to_month)::date LOOP
+    month_end := (month_start + interval '1 month')::date;
+    partition_name := 'print_job_status_events_' || to_char(month_start, 'YYYYMM');
+
+    IF to_regclass('printing.' || partition_name) IS NULL THEN
+      CREATE TEMP TABLE _events_moved (LIKE printing.print_job_status_events) ON COMMIT DROP;
+      WITH moved AS (
+        DELETE FROM printing.print_job_status_events_default
+        WHERE occurred_at >= month_start AND occurred_at < month_end
+        RETURNING *
+      )
+      INSERT INTO _events_moved SELECT * FROM moved;
+
+      EXECUTE format(
+        'CREATE TABLE printing.%I PARTITION OF printing.print_job_status_events FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_end
+      );
+      INSERT INTO printing.print_job_status_events SELECT * FROM _events_moved;
+      DROP TABLE _events_moved;
+      created := created + 1;
+    END IF;
+
+    month_start := month_end;
+  END LOOP;
+  RETURN created;
+END;
+$fn$;
+
+
+-- printing.print_job_status_events particionada por rango de `occurred_at`.
+-- Instalación nueva: se crea acá (antes de que la app corra `create_all`).
+-- Instalación existente (tabla común con FK a print_jobs): se convierte,
+-- copiando los eventos a particiones mensuales. Sin FK: los eventos de jobs
+-- archivados en printing.print_jobs_archive se conservan.
+DO $$
+DECLARE
+  events_kind "char";
+  first_month date;
+BEGIN
+  SELECT c.relkind INTO events_kind
+  FROM pg_class c
+  WHERE c.oid = to_regclass('printing.print_job_status_events');
+
+  IF events_kind = 'p' THEN
+    RETURN;
+  END IF;
+
+  IF events_kind = 'r' THEN
+    ALTER TABLE printing.print_job_status_events RENAME TO print_job_status_events_legacy;
+    ALTER TABLE printing.print_job_status_events_legacy
+      RENAME CONSTRAINT print_job_status_events_pkey TO print_job_status_events_legacy_pkey;
+    DROP INDEX IF EXISTS printing.ix_printing_print_job_status_events_job_id;
+    DROP INDEX IF EXISTS printing.ix_printing_print_job_status_events_occurred_at;
+    DROP INDEX IF EXISTS printing.ix_print_job_status_events_job_id_occurred_at;
+    SELECT date_trunc('month', min(occurred_at))::date INTO first_month
+    FROM printing.print_job_status_events_legacy;
+  END IF;
+
+  CREATE TABLE printing.print_job_status_events (
+    id serial,
+    job_id integer NOT NULL,
+    from_status printing.print_job_status,
+    to_status printing.print_job_status NOT NULL,
+    occurred_at timestamp without time zone NOT NULL,
+    source varchar(50),
+    PRIMARY KEY (id, occurred_at)
+  ) PARTITION BY RANGE (occurred_at);
+
+  CREATE TABLE printing.print_job_status_events_default
+    PARTITION OF printing.print_job_status_events DEFAULT;
+  CREATE INDEX ix_print_job_status_events_job_id_occurred_at
+    ON printing.print_job_status_events (job_id, occurred_at);
+
+  PERFORM printing.ensure_status_event_partitions(
+    COALESCE(first_month, current_date),
+    (current_date + interval '2 months')::date
+  );
+
+  IF events_kind = 'r' THEN
+    INSERT INTO printing.print_job_status_events (id, job_id, from_status, to_status, occurred_at, source)
+    SELECT id, job_id, from_status, to_status, occurred_at, source
+    FROM printing.print_job_status_events_legacy;
+
+    PERFORM setval(
+      pg_get_serial_sequence('printing.print_job_status_events', 'id'),
+      COALESCE((SELECT max(id) FROM printing.print_job_status_events), 0) + 1,
+      false
+    );
+    DROP TABLE printing.print_job_status_events_legacy;
+  END IF;
+END $$;
+
+-- Índice por `occurred_at` de versiones anteriores: redundante con el
+-- particionado por mes (las consultas por fecha se resuelven por partición).
+DROP INDEX IF EXISTS printing.ix_printing_print_job_status_events_occurred_at;
+
+
+-- Historial completo (cola + archivo) para paneles y consultas ad-hoc.
+-- En una instalación nueva las tablas todavía no existen (las crea la app):
+-- la vista la crea entonces `python -m printing_queue.maintenance archive`.
+-- Columnas en sync con `HISTORY_VIEW_COLUMNS` (printing_queue.infra.retention).
+DO $$
+BEGIN
+  IF to_regclass('printing.print_jobs') IS NOT NULL
+     AND to_regclass('printing.print_jobs_archive') IS NOT NULL THEN
+    CREATE OR REPLACE VIEW printing.print_jobs_all AS
+    SELECT id, job_type, status, payload, file_path, created_at, updated_at,
+           printed_at, error_msg, attempts, max_attempts, NULL::timestamp AS archived_at
+    FROM printing.print_jobs
+    UNION ALL
+    SELECT id, job_type, status, payload, file_path, created_at, updated_at,
+           printed_at, error_msg, attempts, max_attempts, archived_at
+    FROM printing.print_jobs_archive;
+  END IF;
+END $$;
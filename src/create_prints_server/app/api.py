@@ -5,18 +5,32 @@ from datetime import date, datetime
 from typing import Any, Literal
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 from pydantic import BaseModel, Field, model_validator
 from sqlalchemy.orm import Session
 
 from create_prints_server.domain.money import money_clp
 from create_prints_server.infra.documents_provider import (
-    DocumentQuery,
     build_documents_provider,
+    get_document_source_type,
 )
+from create_prints_server.infra.response_cache import (
+    etag_matches,
+    get_egresos_cache,
+    load_response_cache_config,
+)
+from create_prints_server.infra.sheets_cache import get_sheets_table_cache
 from printing_queue.db import get_db
-from printing_queue.infra.job_status_events import try_record_print_job_status_event
-from printing_queue.models import PrintJob, PrintJobStatus, PrintJobType
+from printing_queue.infra.idempotency import idempotency_key
+from printing_queue.infra.job_status_events import enqueue_job
+from printing_queue.models import (
+    JOB_PRIORITY_DEFAULT,
+    JOB_PRIORITY_LOWEST,
+    JOB_PRIORITY_URGENT,
+    PrintJob,
+    PrintJobStatus,
+    PrintJobType,
+)
 
 DocKind = Literal["shipping_list", "guides", "both", "egreso"]
 
@@ -33,6 +47,12 @@ class EnqueueGenerateRequest(BaseModel):
     venta_id: str | None = Field(
         None, description="Id de la venta (requerido si what == 'egreso')."
     )
+    priority: int = Field(
+        JOB_PRIORITY_DEFAULT,
+        ge=JOB_PRIORITY_URGENT,
+        le=JOB_PRIORITY_LOWEST,
+        description="Prioridad del job: 0 es la más urgente.",
+    )
 
     @model_validator(mode="after")
     def _validate_venta_id(self) -> "EnqueueGenerateRequest":
@@ -47,6 +67,9 @@ class EnqueueGenerateResponse(BaseModel):
     id: int
     status: str
     job_type: str
+    duplicate: bool = Field(
+        False, description="True si el pedido coincidió con un job en curso y no se encoló otro."
+    )
 
 
 def _today_in_config_timezone() -> date:
@@ -68,6 +91,7 @@ def health() -> dict[str, str]:
 def enqueue_generate(
     req: EnqueueGenerateRequest,
     db: Session = Depends(get_db),
+    idempotency_key_header: str | None = Header(None, alias="Idempotency-Key"),
 ) -> Any:
     """Crea un job para generar PDFs.
 
@@ -76,9 +100,15 @@ def enqueue_generate(
         ejecuta en el proceso HTTP. Un worker reclamará el job y lo dejará en
         READY con `payload.files` para que el worker de impresión lo procese.
 
+        Un pedido repetido (mismo `what`/`day`/`venta_id`, con o sin el mismo
+        header `Idempotency-Key`) mientras el anterior sigue en curso no encola
+        otro job: retorna el existente con `duplicate=True`. La misma clave con
+        otro pedido encola un job nuevo.
+
     Args:
         req: Parámetros del job.
         db: Sesión de BD.
+        idempotency_key_header: Clave de idempotencia opcional del cliente.
 
     Returns:
         EnqueueGenerateResponse: Job creado.
@@ -94,23 +124,20 @@ def enqueue_generate(
         status=PrintJobStatus.PENDING,
         payload=payload,
         file_path=None,
+        priority=req.priority,
+        idempotency_key=idempotency_key(
+            PrintJobType.SHIPPING_DOCS,
+            payload,
+            client_key=idempotency_key_header,
+        ),
     )
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-    try_record_print_job_status_event(
-        db,
-        job_id=job.id,
-        from_status=None,
-        to_status=job.status,
-        occurred_at=job.created_at,
-        source="api",
-    )
+    queued = enqueue_job(db, job, source="api")
 
     return EnqueueGenerateResponse(
-        id=job.id,
-        status=job.status.value,
-        job_type=job.job_type.value,
+        id=queued.id,
+        status=queued.status.value,
+        job_type=queued.job_type.value,
+        duplicate=queued is not job,
     )
 
 
@@ -125,40 +152,128 @@ class EgresoOption(BaseModel):
     destinatario: str | None = None
 
 
-@router.get("/api/egresos", response_model=list[EgresoOption])
-def list_egresos(day: date | None = None) -> list[EgresoOption]:
-    """Retorna ventas de tipo EGRESO para la fecha indicada."""
-    target_day = day or _today_in_config_timezone()
-    provider = build_documents_provider()
-    det_dia = provider.load_orders_frame(
-        DocumentQuery(day=target_day, allowed_types=["EGRESO"])
-    )
+def _load_egreso_options(target_day: date) -> list[EgresoOption]:
+    """Arma las opciones del selector de egresos desde el provider.
 
-    if det_dia.empty:
-        return []
+    El provider resume las ventas en la fuente (`aggregate_egresos`): aquí
+    solo se arman las etiquetas.
 
-    options: list[EgresoOption] = []
-    for venta_id, g in det_dia.groupby("venta_id", sort=False):
-        r0 = g.iloc[0]
-        cliente = str(r0.get("nombre", "") or r0.get("cliente", "") or "")
-        destinatario = str(r0.get("destinatario", "") or "")
-        total_venta = (
-            int(g["precio_total"].sum(skipna=True)) if "precio_total" in g.columns else 0
-        )
+    Args:
+        target_day: Fecha a consultar.
 
-        label_cliente = destinatario or cliente or ""
-        label_total = money_clp(total_venta)
+    Returns:
+        list[EgresoOption]: Opciones del selector.
+    """
+    provider = build_documents_provider()
+
+    options: list[EgresoOption] = []
+    for summary in provider.aggregate_egresos(target_day):
+        label_cliente = summary.destinatario or summary.cliente
+        label_total = money_clp(summary.total)
         label = f"{label_cliente} | {label_total}".strip(" |")
 
         options.append(
             EgresoOption(
-                venta_id=str(venta_id),
+                venta_id=summary.venta_id,
                 label=label,
-                cliente=cliente,
-                total=total_venta,
+                cliente=summary.cliente,
+                total=summary.total,
                 total_fmt=label_total,
-                destinatario=destinatario or None,
+                destinatario=summary.destinatario or None,
             )
         )
 
     return options
+
+
+@router.get("/api/egresos", response_model=list[EgresoOption])
+def list_egresos(
+    response: Response,
+    day: date | None = None,
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+) -> Any:
+    """Retorna ventas de tipo EGRESO para la fecha indicada.
+
+    Nota:
+        Las respuestas se cachean en el proceso por `(fuente, día)`: unos
+        segundos para hoy (`EGRESOS_CACHE_TTL_SECONDS`) y más para fechas
+        pasadas (`EGRESOS_CACHE_PAST_TTL_SECONDS`). Con `ETag` el navegador
+        revalida con `If-None-Match` y recibe un 304 sin body si no cambió.
+
+    Args:
+        response: Response de FastAPI (para headers de cache).
+        day: Fecha objetivo. Si es None, usa hoy.
+        if_none_match: ETag que el navegador ya tiene.
+
+    Returns:
+        list[EgresoOption] | Response: Opciones, o 304 si el ETag coincide.
+    """
+    today = _today_in_config_timezone()
+    target_day = day or today
+    config = load_response_cache_config()
+    past = target_day < today
+    ttl = config.past_ttl_seconds if past else config.ttl_seconds
+
+    cached = get_egresos_cache().get_or_load(
+        (get_document_source_type(), target_day),
+        lambda: _load_egreso_options(target_day),
+        ttl_seconds=ttl,
+        to_json=lambda options: [option.model_dump() for option in options],
+    )
+
+    headers = {
+        "ETag": cached.etag,
+        # Hoy: el navegador siempre revalida (304 barato). Pasado: puede reusar.
+        "Cache-Control": f"private, max-age={int(ttl)}" if past else "private, no-cache",
+    }
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return cached.body
+
+
+class SheetsCacheInvalidateRequest(BaseModel):
+    """Request para invalidar el cache de hojas de Sheets."""
+
+    sheets: list[str] | None = Field(
+        None, description="Hojas a invalidar (ej. CLIENTES). Si es None, todas."
+    )
+
+
+class SheetsCacheStats(BaseModel):
+    """Estado del cache de hojas de Sheets del proceso de la API."""
+
+    invalidated: int = Field(0, description="Tablas descartadas por esta llamada.")
+    sheets: dict[str, dict[str, int]] = Field(
+        default_factory=dict, description="hits/misses/cached por hoja."
+    )
+
+
+@router.get("/api/sheets-cache", response_model=SheetsCacheStats)
+def sheets_cache_stats() -> SheetsCacheStats:
+    """Retorna los contadores de hits/misses del cache de Sheets."""
+    return SheetsCacheStats(sheets=get_sheets_table_cache().stats())
+
+
+@router.post("/api/sheets-cache/invalidate", response_model=SheetsCacheStats)
+def invalidate_sheets_cache(
+    req: SheetsCacheInvalidateRequest | None = None,
+) -> SheetsCacheStats:
+    """Descarta tablas cacheadas para que la próxima lectura vaya a Sheets.
+
+    Nota:
+        Afecta al cache del proceso de la API (`/api/egresos`, incluidas sus
+        respuestas cacheadas). El `generate_worker` tiene su propio cache y lo
+        refresca por TTL.
+
+    Args:
+        req: Hojas a invalidar. Sin body, invalida todas.
+
+    Returns:
+        SheetsCacheStats: Cantidad invalidada y contadores actuales.
+    """
+    cache = get_sheets_table_cache()
+    removed = cache.invalidate(req.sheets if req is not None else None)
+    # Las respuestas de /api/egresos se armaron con las hojas descartadas.
+    get_egresos_cache().clear()
+    return SheetsCacheStats(invalidated=removed, sheets=cache.stats())
@@ -1,21 +1,36 @@
 from __future__ import annotations
 
+import multiprocessing
 import os
+import re
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from datetime import date, datetime
+from multiprocessing.queues import SimpleQueue
 from pathlib import Path
-from typing import Literal
+from typing import Callable, Literal
 from create_prints_server.infra.logging import get_logger
 
 from dotenv import load_dotenv
 
 from create_prints_server.config.settings import OutputConfig
-from create_prints_server.domain.orders import build_orders_structure
+from create_prints_server.domain.orders import Order, build_orders_structure, compact_orders
 from create_prints_server.infra.documents_provider import (
     DocumentQuery,
     build_documents_provider,
 )
-from create_prints_server.render.guides_pdf import render_guides_pdf
+from create_prints_server.infra.pdf_cache import PdfCache, frame_digest, load_pdf_cache_config
+from create_prints_server.render.guides_pdf import (
+    GUIDES_PER_PAGE,
+    render_guides_pdf,
+    split_guides_in_chunks,
+)
+from create_prints_server.render.pdf_merge import merge_pdfs
 from create_prints_server.render.shipping_pdf import render_orders_pdf
 
 
@@ -46,6 +61,10 @@ class NoOrdersForDateError(RuntimeError):
     """Error cuando no hay pedidos para la fecha solicitada."""
 
 
+class RenderTimeoutError(RuntimeError):
+    """Error cuando el pool de render no termina dentro de `RENDER_TIMEOUT_SECONDS`."""
+
+
 def _resolve_logo_path() -> str | None:
     """Resuelve la ruta al logo para PDFs.
 
@@ -80,6 +99,277 @@ def _dated_path(original_path: str, day: date) -> str:
     return str(p.with_name(f"{p.stem}_{stamp}{p.suffix}"))
 
 
+def _egreso_guides_path(guides_path: str, venta_id: str | None = None) -> str:
+    """Path base de las guías de egreso, junto a las de despacho.
+
+    Cada egreso es de una sola venta: el `venta_id` va en el nombre para que
+    dos egresos del mismo día no se pisen el archivo.
+
+    Ej:
+      guides_list.pdf -> guides_egreso.pdf
+      guides_list.pdf, "101" -> guides_egreso_101.pdf
+
+    Args:
+        guides_path: Path base de las guías (`PDF_GUIDES_PATH`).
+        venta_id: Id de la venta del egreso. Sin él, el base común (para limpiar).
+
+    Returns:
+        str: Path base de las guías de egreso.
+    """
+    name = "guides_egreso.pdf"
+    if venta_id:
+        name = f"guides_egreso_{re.sub(r'[^0-9A-Za-z-]', '_', str(venta_id))}.pdf"
+    return str(Path(guides_path).with_name(name))
+
+
+def _render_atomically(render: Callable[[str], None], pdf_path: str) -> None:
+    """Renderiza a un archivo temporal y lo mueve a `pdf_path` al terminar.
+
+    Con varios procesos de generación, dos jobs del mismo día pueden escribir
+    el mismo PDF fechado; así nadie lee ni imprime un archivo a medio escribir.
+
+    Args:
+        render: Función que escribe el PDF en el path recibido.
+        pdf_path: Path final.
+    """
+    Path(pdf_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{pdf_path}.{os.getpid()}.tmp"
+    try:
+        render(tmp_path)
+        os.replace(tmp_path, pdf_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _render_document(
+    kind: str,
+    orders: list[Order],
+    out_cfg: OutputConfig,
+    pdf_path: str,
+    guide_title: str = "",
+) -> str:
+    """Renderiza un documento a partir de la estructura de pedidos.
+
+    Es de nivel de módulo para poder ejecutarse en el pool de render.
+
+    Args:
+        kind: "shipping_list" o "guides".
+        orders: Resultado de `build_orders_structure` (compartido entre documentos).
+        out_cfg: Configuración de salida.
+        pdf_path: Path final del PDF.
+        guide_title: Título de las guías (solo `kind == "guides"`).
+
+    Returns:
+        str: `pdf_path`.
+    """
+    if kind == "shipping_list":
+        _render_atomically(lambda path: render_orders_pdf(orders, out_cfg, path), pdf_path)
+    else:
+        _render_atomically(
+            lambda path: render_guides_pdf(orders, out_cfg, path, guide_title=guide_title),
+            pdf_path,
+        )
+    return pdf_path
+
+
+_RENDERED_LOG = {"shipping_list": "Lista de despacho generada", "guides": "Guías generadas"}
+
+_render_pool: ProcessPoolExecutor | None = None
+# PIDs que reporta cada proceso del pool al arrancar (para terminarlos si un render se cuelga).
+_render_pool_pids: SimpleQueue | None = None
+_render_pool_lock = threading.Lock()
+
+
+def _parallel_render_enabled() -> bool:
+    """Indica si `what=both` renderiza ambos documentos en paralelo (`PARALLEL_RENDER`)."""
+    return os.getenv("PARALLEL_RENDER", "true").strip().lower() in ("1", "true", "yes")
+
+
+def _init_render_process(pids: SimpleQueue) -> None:
+    """Initializer del pool: reporta su PID e ignora Ctrl+C.
+
+    Ctrl+C lo maneja el proceso que genera, no los renders.
+
+    Args:
+        pids: Cola donde el proceso anota su PID.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pids.put(os.getpid())
+
+
+def _render_workers() -> int:
+    """Procesos del pool de render de este proceso de generación.
+
+    `RENDER_WORKERS` si está definido; si no, los CPUs repartidos entre los
+    `GENERATE_WORKERS` procesos (hasta 4): cada hijo del supervisor tiene su
+    propio pool y sin repartir competirían por los mismos cores. Con 1 o
+    menos se renderiza en el proceso actual.
+    """
+    configured = os.getenv("RENDER_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    generate_workers = max(1, int(os.getenv("GENERATE_WORKERS", "1")))
+    return min(4, (os.cpu_count() or 1) // generate_workers)
+
+
+def _render_timeout_seconds() -> float:
+    """Espera máxima por los renders de un job en el pool (`RENDER_TIMEOUT_SECONDS`).
+
+    El `LeaseKeeper` renueva el lease mientras se espera, así que sin este
+    tope un render colgado bloquearía el job para siempre.
+    """
+    return max(1.0, float(os.getenv("RENDER_TIMEOUT_SECONDS", "300")))
+
+
+def _guides_chunk_pages() -> int:
+    """Páginas por tramo al renderizar guías en paralelo (`GUIDES_CHUNK_PAGES`)."""
+    return max(1, int(os.getenv("GUIDES_CHUNK_PAGES", "20")))
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Pool de render del proceso, creado en el primer uso y reutilizado.
+
+    Levantar procesos (e importar pandas/reportlab en ellos) cuesta más que
+    un render chico, por eso el pool vive lo que vive el worker.
+
+    Returns:
+        ProcessPoolExecutor: Pool de `RENDER_WORKERS` procesos (contexto spawn,
+        igual que en Windows).
+    """
+    global _render_pool, _render_pool_pids
+    with _render_pool_lock:
+        if _render_pool is None:
+            ctx = multiprocessing.get_context("spawn")
+            _render_pool_pids = ctx.SimpleQueue()
+            _render_pool = ProcessPoolExecutor(
+                max_workers=_render_workers(),
+                mp_context=ctx,
+                initializer=_init_render_process,
+                initargs=(_render_pool_pids,),
+            )
+        return _render_pool
+
+
+def _reset_render_pool(*, kill: bool = False) -> None:
+    """Descarta el pool (ej. si un proceso murió) para recrearlo en el próximo uso.
+
+    Args:
+        kill: Si es True, termina también los procesos en curso por el PID
+            que reportó cada uno al arrancar (un render colgado no sale con
+            `shutdown`).
+    """
+    global _render_pool, _render_pool_pids
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+        pids, _render_pool_pids = _render_pool_pids, None
+    if pool is None:
+        return
+    pool.shutdown(wait=False, cancel_futures=True)
+    if pids is None:
+        return
+    if kill:
+        while not pids.empty():
+            try:
+                os.kill(pids.get(), signal.SIGTERM)
+            except OSError:
+                # Ya salió (ej. el pool estaba roto).
+                continue
+    pids.close()
+
+
+def _part_path(pdf_path: str, index: int) -> str:
+    """Path temporal del tramo `index` de un PDF renderizado por partes."""
+    return f"{pdf_path}.{os.getpid()}.part{index:04d}.tmp"
+
+
+def _render_documents(tasks: list[tuple[str, list[Order], OutputConfig, str, str]]) -> None:
+    """Renderiza los documentos pedidos, en paralelo si conviene.
+
+    Con `PARALLEL_RENDER` activo y al menos dos procesos de render (ver
+    `_render_workers`), cada documento es una unidad de trabajo del pool y las
+    guías con más de `GUIDES_CHUNK_PAGES` páginas se parten en tramos
+    alineados a página que se unen en orden al terminar. Con una sola unidad
+    se renderiza en el proceso actual.
+
+    Se espera a todas las unidades y, si alguna falló, se relanza el error de
+    la primera en orden (el mismo que en modo serie).
+
+    Args:
+        tasks: Argumentos de `_render_document` por documento.
+    """
+    if not _parallel_render_enabled() or _render_workers() <= 1:
+        for task in tasks:
+            _render_document(*task)
+        return
+
+    chunk_pages = _guides_chunk_pages()
+    units: list[tuple[Callable[..., object], tuple]] = []
+    merges: list[tuple[str, list[str]]] = []
+    for kind, orders, out_cfg, pdf_path, guide_title in tasks:
+        if kind != "guides" or len(orders) <= chunk_pages * GUIDES_PER_PAGE:
+            units.append((_render_document, (kind, orders, out_cfg, pdf_path, guide_title)))
+            continue
+        parts: list[str] = []
+        for index, chunk in enumerate(split_guides_in_chunks(orders, chunk_pages)):
+            part = _part_path(pdf_path, index)
+            parts.append(part)
+            units.append((render_guides_pdf, (compact_orders(chunk), out_cfg, part, guide_title)))
+        merges.append((pdf_path, parts))
+
+    try:
+        if len(units) < 2:
+            for fn, args in units:
+                fn(*args)
+        else:
+            _run_in_render_pool(units)
+        for pdf_path, parts in merges:
+            _render_atomically(lambda path, parts=parts: merge_pdfs(parts, path), pdf_path)
+    finally:
+        for _pdf_path, parts in merges:
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
+
+
+def _run_in_render_pool(units: list[tuple[Callable[..., object], tuple]]) -> None:
+    """Ejecuta las unidades en el pool de render y espera a todas.
+
+    Args:
+        units: `(función, argumentos)` de nivel de módulo (picklables).
+
+    Raises:
+        RenderTimeoutError: Si las unidades no terminan en `RENDER_TIMEOUT_SECONDS`
+            (el job se reintenta vía `retry_or_fail`).
+        Exception: El error de la primera unidad fallida, en orden.
+    """
+    try:
+        pool = _get_render_pool()
+        futures: list[Future[object]] = [pool.submit(fn, *args) for fn, args in units]
+    except BrokenProcessPool:
+        _reset_render_pool()
+        raise
+
+    timeout = _render_timeout_seconds()
+    deadline = time.monotonic() + timeout
+    errors: list[BaseException] = []
+    for future in futures:
+        try:
+            error = future.exception(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            # Se recicla el pool: sus procesos siguen ocupados con el render colgado.
+            _reset_render_pool(kill=True)
+            raise RenderTimeoutError(
+                f"Render sin terminar tras {timeout:.0f}s (RENDER_TIMEOUT_SECONDS)"
+            ) from None
+        if error is not None:
+            errors.append(error)
+    if any(isinstance(error, BrokenProcessPool) for error in errors):
+        _reset_render_pool()
+    if errors:
+        raise errors[0]
+
+
 def generate_pdfs(
     *,
     what: DocKind,
@@ -112,11 +402,18 @@ def generate_pdfs(
         logo_path=_resolve_logo_path(),
     )
 
+    # Paths base de todo lo que escribe el generador (cualquier `what`) y si
+    # llevan clave de venta: se usan para borrar las salidas fechadas viejas.
+    output_bases = (
+        (out_cfg.pdf_orders_path, False),
+        (out_cfg.pdf_guides_path, False),
+        (_egreso_guides_path(out_cfg.pdf_guides_path), True),
+    )
+
     # Ajusta nombres de archivo por fecha y, si es egreso, cambia nombre base de guías.
     guides_base = out_cfg.pdf_guides_path
     if what == "egreso":
-        p = Path(out_cfg.pdf_guides_path)
-        guides_base = str(p.with_name("guides_egreso.pdf"))
+        guides_base = _egreso_guides_path(out_cfg.pdf_guides_path, venta_id)
 
     out_cfg = OutputConfig(
         pdf_orders_path=_dated_path(out_cfg.pdf_orders_path, day),
@@ -140,6 +437,8 @@ def generate_pdfs(
             day=day,
             allowed_types=allowed_types,
             venta_id=venta_id,
+            # Una venta ingresada justo antes de imprimir debe salir en el PDF.
+            fresh=True,
         )
     )
     logger.info(f"Ventas filtradas para {day.isoformat()}: {len(det_dia)} registros")
@@ -147,27 +446,49 @@ def generate_pdfs(
     if det_dia.empty:
         raise NoOrdersForDateError(f"No hay ventas para {day.isoformat()}")
 
-    orders = build_orders_structure(det_dia.copy(deep=True))
-    guides = build_orders_structure(det_dia.copy(deep=True))
+    cache = PdfCache(load_pdf_cache_config())
+    det_digest = frame_digest(det_dia) if cache.enabled else ""
+    orders_count = int(det_dia["venta_id"].nunique()) if "venta_id" in det_dia.columns else 0
 
     shipping_path: str | None = None
     guides_path: str | None = None
 
+    # (kind, path, clave de cache, título de guía) de cada documento pedido.
+    documents: list[tuple[str, str, str, str]] = []
     if what in ("shipping_list", "both"):
-        render_orders_pdf(orders, out_cfg, out_cfg.pdf_orders_path)
         shipping_path = out_cfg.pdf_orders_path
-        logger.info(f"Lista de despacho generada en {shipping_path}")
-
+        documents.append(
+            ("shipping_list", shipping_path, cache.key("shipping_list", det_digest, out_cfg), "")
+        )
     if what in ("guides", "both", "egreso"):
         guide_title = "GUIA DE EGRESO" if what == "egreso" else "GUIA DE DESPACHO"
-        render_guides_pdf(guides, out_cfg, out_cfg.pdf_guides_path, guide_title=guide_title)
         guides_path = out_cfg.pdf_guides_path
-        logger.info(f"Guías generadas en {guides_path}")
+        documents.append(
+            (
+                "guides",
+                guides_path,
+                cache.key("guides", det_digest, out_cfg, guide_title=guide_title),
+                guide_title,
+            )
+        )
+
+    misses = [doc for doc in documents if not cache.restore(doc[2], doc[1])]
+    if misses:
+        # Una sola estructura para ambos renderers (no modifica `det_dia`).
+        orders = build_orders_structure(det_dia)
+        _render_documents([(kind, orders, out_cfg, path, title) for kind, path, _key, title in misses])
+    for kind, path, key, _title in misses:
+        cache.store(key, path)
+        logger.info(f"{_RENDERED_LOG[kind]} en {path}")
+
+    if cache.enabled:
+        for base_path, keyed in output_bases:
+            cache.prune_outputs(base_path, keyed=keyed)
 
     result = GeneratedArtifacts(
         shipping_list_path=shipping_path,
         guides_path=guides_path,
-        orders_count=len(orders),
+        orders_count=orders_count,
     )
     logger.info(
         f"Generación completada: orders_count={result.orders_count} shipping={bool(result.shipping_list_path)} guides={bool(result.guides_path)}"
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from create_prints_server.domain.orders import ItemRow, OrderItems, as_order_items
+
 
 @dataclass(frozen=True)
 class GuidesOutputConfig:
@@ -51,7 +53,10 @@ def split_order_date_components(order_header: Dict[str, Any]) -> Tuple[str, str,
     return f"{d.day:02d}", f"{d.month:02d}", f"{d.year:04d}"
 
 
-def compute_order_total(order_header: Dict[str, Any], items: pd.DataFrame) -> float:
+def compute_order_total(
+    order_header: Dict[str, Any],
+    items: OrderItems | pd.DataFrame,
+) -> float:
     """Calcula el total de la guía desde header o desde ítems.
 
     Prioridad:
@@ -61,7 +66,7 @@ def compute_order_total(order_header: Dict[str, Any], items: pd.DataFrame) -> fl
 
     Args:
         order_header (Dict[str, Any]): Header de la orden.
-        items (pd.DataFrame): DataFrame de ítems.
+        items (OrderItems | pd.DataFrame): Ítems de la orden.
 
     Returns:
         float: Total calculado (0.0 si no hay datos).
@@ -71,47 +76,47 @@ def compute_order_total(order_header: Dict[str, Any], items: pd.DataFrame) -> fl
     if total_hdr is not None and _is_number(total_hdr):
         return float(total_hdr)
 
-    if isinstance(items, pd.DataFrame) and not items.empty:
-        if "precio_total" in items.columns:
-            s = pd.to_numeric(items["precio_total"], errors="coerce").fillna(0).sum()
-            return float(s)
+    items = as_order_items(items)
+    if items.empty:
+        return 0.0
+
+    if "precio_total" in items.columns:
+        return float(_to_numeric(items.column("precio_total")).fillna(0).sum())
 
-        if "kg" in items.columns and "precio_unit" in items.columns:
-            kg = pd.to_numeric(items["kg"], errors="coerce").fillna(0)
-            pu = pd.to_numeric(items["precio_unit"], errors="coerce").fillna(0)
-            return float((kg * pu).sum())
+    if "kg" in items.columns and "precio_unit" in items.columns:
+        kg = _to_numeric(items.column("kg")).fillna(0)
+        pu = _to_numeric(items.column("precio_unit")).fillna(0)
+        return float((kg * pu).sum())
 
     return 0.0
 
 
-def normalize_guide_items(items: pd.DataFrame, max_items: int) -> pd.DataFrame:
-    """Normaliza el DF de ítems para guías: Producto | Kilos | Precio Unitario.
+def normalize_guide_items(items: OrderItems | pd.DataFrame, max_items: int) -> List[ItemRow]:
+    """Recorta los ítems de la guía (Producto | Kilos | Precio Unitario).
 
     Args:
-        items (pd.DataFrame): Ítems originales (posiblemente con más columnas).
+        items (OrderItems | pd.DataFrame): Ítems de la orden.
         max_items (int): Máximo de filas a mantener.
 
     Returns:
-        pd.DataFrame: Ítems recortados y con columnas esperadas (si existen).
+        List[ItemRow]: Primeras `max_items` filas (las columnas faltantes
+        vienen como None).
+
+    """
+    return as_order_items(items).rows(limit=int(max_items), fill=None)
+
+
+def _to_numeric(values: Any) -> pd.Series:
+    """Convierte valores a numéricos (no numéricos y vacíos quedan NaN).
+
+    Args:
+        values (Any): Valores de una columna.
+
+    Returns:
+        pd.Series: Serie numérica.
 
     """
-    if not isinstance(items, pd.DataFrame) or items.empty:
-        return pd.DataFrame(columns=["producto", "kg", "precio_unit"])
-
-    cols = []
-    for c in ["producto", "kg", "precio_unit"]:
-        if c in items.columns:
-            cols.append(c)
-
-    base = items[cols].copy() if cols else items.copy()
-    if "producto" not in base.columns:
-        base["producto"] = ""
-    if "kg" not in base.columns:
-        base["kg"] = None
-    if "precio_unit" not in base.columns:
-        base["precio_unit"] = None
-
-    return base[["producto", "kg", "precio_unit"]].head(int(max_items))
+    return pd.to_numeric(pd.Series(values), errors="coerce")
 
 
 def _parse_date(value: Any) -> Optional[date]:
@@ -1,5 +1,7 @@
-import pandas as pd
+import re
+
 import numpy as np
+import pandas as pd
 
 def money_clp(x) -> str:
     if pd.isna(x):
@@ -13,6 +15,33 @@ def money_clp(x) -> str:
     return "$" + s.replace(",", ".")
 
 
+# Caracteres que se descartan al limpiar una celda (todo salvo dígitos,
+# separadores y signo). El separador de celdas `\x00` se conserva.
+_NON_NUMERIC = re.compile(r"[^\d,.\-\x00]+")
+_CELL_SEP = "\x00"
+
+
+def _clean_cells(series: pd.Series) -> np.ndarray:
+    """Deja solo dígitos, ',', '.' y '-' en cada celda, con una sola pasada de regex.
+
+    Las celdas se unen con `\x00`, se limpian juntas y se vuelven a separar;
+    si alguna celda trae `\x00`, se limpia celda a celda con `.str.replace`.
+
+    Args:
+        series: Columna no numérica.
+
+    Returns:
+        np.ndarray: Array de strings (`dtype=str`).
+    """
+    texts = series.astype(str).tolist()
+    joined = _CELL_SEP.join(texts)
+    if texts and joined.count(_CELL_SEP) == len(texts) - 1:
+        cleaned = _NON_NUMERIC.sub("", joined).split(_CELL_SEP)
+    else:
+        cleaned = series.astype(str).str.replace(r"[^\d,\.\-]", "", regex=True).tolist()
+    return np.array(cleaned, dtype=str)
+
+
 def parse_cl_number(series: pd.Series) -> pd.Series:
     """
     Convierte valores típicos CL/Latam:
@@ -22,47 +51,52 @@ def parse_cl_number(series: pd.Series) -> pd.Series:
       '2.000,50'   -> 2000.5
       '20.00'      -> 20.0   (decimal punto)
       20.0 (float) -> 20.0
+
+    Reglas de separadores:
+      - con ',' y '.': '.' es miles y ',' decimal.
+      - solo ',': decimal.
+      - más de un '.': miles.
+      - un solo '.': miles si hay exactamente 3 dígitos después y 1 a 3
+        antes ('14.500'); si no, decimal ('20.00').
+    Lo que no queda como número válido pasa a NaN.
+
+    Todo se resuelve por columna (máscaras con `np.char` + `np.select`), sin
+    una función Python por celda.
     """
-    s = series.copy()
-
-    # Si viene numérico puro, no lo toques
-    if pd.api.types.is_numeric_dtype(s):
-        return s.astype(float)
-
-    s = s.astype(str).str.strip()
-
-    # deja solo dígitos, separadores y signo
-    s = s.str.replace(r"[^\d,\.\-]", "", regex=True)
-
-    def _norm(x: str):
-        if x is None:
-            return np.nan
-        x = x.strip()
-        if x == "" or x.lower() == "nan":
-            return np.nan
-
-        # Caso con ambos: normalmente '.' miles y ',' decimal
-        if "," in x and "." in x:
-            x = x.replace(".", "").replace(",", ".")
-        elif "," in x:
-            # Solo coma => decimal coma
-            x = x.replace(",", ".")
-        else:
-            # Solo punto o nada.
-            # Si hay más de un punto => seguramente miles, quítalos.
-            if x.count(".") > 1:
-                x = x.replace(".", "")
-            elif x.count(".") == 1:
-                # Decide si ese punto es miles o decimal:
-                # Si hay exactamente 3 dígitos después del punto y pocos antes => miles
-                left, right = x.split(".")
-                if len(right) == 3 and 1 <= len(left) <= 3:
-                    x = left + right  # quita el punto (miles)
-                # si no, lo dejamos como decimal (ej: 20.00)
-
-        try:
-            return float(x)
-        except ValueError:
-            return np.nan
-
-    return s.map(_norm).astype(float)
\ No newline at end of file
+    # Si viene numérico puro (o vacío), no lo toques
+    if pd.api.types.is_numeric_dtype(series) or series.empty:
+        return series.astype(float)
+
+    s = _clean_cells(series)
+
+    has_comma = np.char.find(s, ",") >= 0
+    dots = np.char.count(s, ".")
+    left = np.char.find(s, ".")
+    right = np.char.str_len(s) - left - 1
+    thousands_dot = (dots == 1) & (right == 3) & (left >= 1) & (left <= 3)
+
+    # Cada regla se aplica solo a las filas que la necesitan.
+    normalized = s.copy()
+    rules = [
+        (has_comma & (dots > 0), lambda v: np.char.replace(np.char.replace(v, ".", ""), ",", ".")),
+        (has_comma & (dots == 0), lambda v: np.char.replace(v, ",", ".")),
+        (~has_comma & ((dots > 1) | thousands_dot), lambda v: np.char.replace(v, ".", "")),
+    ]
+    for mask, rewrite in rules:
+        if mask.any():
+            normalized[mask] = rewrite(s[mask])
+
+    # Número válido para `float()`: a lo más un '-' inicial, a lo más un '.'
+    # y al menos un dígito; el resto ('', '-', '1-2', '1.2.3') queda NaN.
+    body = np.char.lstrip(normalized, "-")
+    signs = np.char.str_len(normalized) - np.char.str_len(body)
+    body_dots = np.char.count(body, ".")
+    one_dot = body_dots == 1
+    if one_dot.any():
+        body[one_dot] = np.char.replace(body[one_dot], ".", "")
+    valid = (signs <= 1) & (body_dots <= 1) & np.char.isdecimal(body)
+
+    values = np.full(len(s), np.nan)
+    # Vía `object`: NumPy convierte str -> float más rápido así que desde `<U`.
+    values[valid] = normalized[valid].astype(object).astype(float)
+    return pd.Series(values, index=series.index, name=series.name)
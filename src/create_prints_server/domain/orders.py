@@ -1,7 +1,188 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Mapping, NamedTuple
+
+import numpy as np
 import pandas as pd
 
 from create_prints_server.domain.money import parse_cl_number
 
+# Columnas de ítem que usan los renderers.
+ITEM_COLUMNS = ("producto", "calibre", "kg", "precio_unit", "precio_total")
+
+
+class ItemRow(NamedTuple):
+    """Fila de ítem de un pedido, con valores Python (no escalares NumPy)."""
+
+    producto: Any
+    calibre: Any
+    kg: Any
+    precio_unit: Any
+    precio_total: Any
+
+
+@dataclass(frozen=True, slots=True)
+class OrderItems:
+    """Ítems de un pedido: filas `[start, stop)` de columnas compartidas.
+
+    Todos los pedidos de un `build_orders_structure` apuntan al mismo dict de
+    arrays (uno por columna de `ITEM_COLUMNS` presente en el detalle), sin un
+    DataFrame por pedido.
+
+    Args:
+        columns: Arrays del día, con las filas agrupadas por pedido.
+        start: Primera fila del pedido.
+        stop: Fila siguiente a la última del pedido.
+    """
+
+    columns: Mapping[str, np.ndarray]
+    start: int
+    stop: int
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def empty(self) -> bool:
+        """Indica si el pedido no tiene ítems."""
+        return self.stop <= self.start
+
+    def column(self, name: str, fill: Any = "") -> np.ndarray:
+        """Valores de una columna para las filas del pedido.
+
+        Args:
+            name: Columna de `ITEM_COLUMNS`.
+            fill: Valor si la columna no existe en el detalle.
+
+        Returns:
+            np.ndarray: Vista sin copia, o un array de `fill` si no existe.
+        """
+        if name not in self.columns:
+            return np.full(len(self), fill, dtype=object)
+        return self.columns[name][self.start : self.stop]
+
+    def rows(self, limit: int | None = None, fill: Any = "") -> list[ItemRow]:
+        """Filas del pedido en orden, opcionalmente solo las primeras `limit`.
+
+        Args:
+            limit: Máximo de filas.
+            fill: Valor para columnas que no existen en el detalle.
+
+        Returns:
+            list[ItemRow]: Filas con valores Python.
+        """
+        stop = self.stop if limit is None else min(self.stop, self.start + max(0, int(limit)))
+        count = stop - self.start
+        values = [
+            self.columns[name][self.start : stop].tolist() if name in self.columns else [fill] * count
+            for name in ITEM_COLUMNS
+        ]
+        return [ItemRow(*row) for row in zip(*values)]
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "OrderItems":
+        """Crea los ítems de un solo pedido desde un DataFrame (formato anterior).
+
+        Args:
+            frame: Ítems del pedido.
+
+        Returns:
+            OrderItems: Ítems con columnas propias.
+        """
+        return cls(_item_columns(frame, np.arange(len(frame))), 0, len(frame))
+
+
+@dataclass(frozen=True, slots=True)
+class Order:
+    """Pedido listo para renderizar.
+
+    Args:
+        header: Cabecera (venta_id, fecha_str, cliente_nombre, direccion,
+            total_venta, factura_despacho).
+        items: Ítems del pedido.
+    """
+
+    header: dict[str, Any]
+    items: OrderItems
+
+
+def as_order_items(items: OrderItems | pd.DataFrame | None) -> OrderItems:
+    """Acepta ítems en el modelo compacto o como DataFrame (formato anterior).
+
+    Args:
+        items: Ítems de un pedido.
+
+    Returns:
+        OrderItems: Ítems en el modelo compacto.
+    """
+    if isinstance(items, OrderItems):
+        return items
+    if isinstance(items, pd.DataFrame):
+        return OrderItems.from_frame(items)
+    return OrderItems.from_frame(pd.DataFrame())
+
+
+def as_order(order: Order | Mapping[str, Any]) -> Order:
+    """Acepta un `Order` o un dict `{"header", "items"}` (formato anterior).
+
+    Args:
+        order: Pedido.
+
+    Returns:
+        Order: Pedido en el modelo compacto.
+    """
+    if isinstance(order, Order):
+        return order
+    return Order(
+        header=dict(order.get("header", {}) or {}),
+        items=as_order_items(order.get("items")),
+    )
+
+
+def _parse_sale_dates(values: pd.Series) -> pd.Series:
+    """Parsea `VENTAS.fecha` (dd/mm/YYYY) a fechas normalizadas.
+
+    Se parsea una vez cada valor distinto (el historial repite pocas fechas
+    muchas veces) y se expande con los códigos de `factorize`. El primer valor
+    distinto es el primer valor no nulo de la columna, así que pandas infiere
+    el mismo formato que al parsear la columna completa.
+
+    Args:
+        values: Columna `fecha` de VENTAS.
+
+    Returns:
+        pd.Series: Fechas normalizadas (NaT si no se pueden parsear), mismo índice.
+    """
+    codes, uniques = pd.factorize(values, sort=False)
+    # Datos de Sheets vienen en formato dd/mm/YYYY; declaramos dayfirst explícito para
+    # evitar que pandas asuma mes/día y emita FutureWarning.
+    parsed = pd.to_datetime(pd.Series(uniques), errors="coerce", dayfirst=True).dt.normalize()
+    taken = parsed.to_numpy()[codes]
+    taken[codes < 0] = np.datetime64("NaT")
+    return pd.Series(taken, index=values.index, dtype=parsed.dtype)
+
+
+def _str_isin(values: pd.Series, wanted: pd.Series) -> np.ndarray:
+    """Máscara de `values.astype(str).isin(wanted)` sin convertir toda la columna.
+
+    Args:
+        values: Columna a filtrar (ej. `DETALLE_VENTAS.venta_id`).
+        wanted: Valores buscados, ya como `str`.
+
+    Returns:
+        np.ndarray: Máscara booleana por fila.
+    """
+    codes, uniques = pd.factorize(values, sort=False, use_na_sentinel=False)
+    return pd.Series(uniques).astype(str).isin(wanted).to_numpy()[codes]
+
+
+def _as_str_columns(frame: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """Copia `frame` con las columnas indicadas (si existen) como `str`."""
+    present = [col for col in columns if col in frame.columns]
+    return frame.astype({col: str for col in present}) if present else frame.copy()
+
 
 def build_daily_orders(
     df_clientes: pd.DataFrame,
@@ -15,6 +196,12 @@ def build_daily_orders(
     """
     Retorna una tabla por ítem (detalle) ya unida con cabecera de venta y cliente.
 
+    Los filtros (día, tipo y `venta_id`) se aplican antes de normalizar: solo
+    las ventas que sobreviven, y los clientes, destinatarios y detalle que
+    ellas referencian, se convierten y se unen. Así el costo depende de las
+    ventas del día y no del historial de las planillas. Las tablas de entrada
+    no se modifican.
+
     Args:
         df_clientes: tabla CLIENTES
         df_destinatarios: tabla DESTINATARIOS
@@ -28,32 +215,14 @@ def build_daily_orders(
         pd.DataFrame con detalle de ventas del día filtrado, unido con clientes y ventas.
     """
 
-    # --- normalizaciones mínimas ---
-    # fechas
+    # --- filtrar ventas del día ---
     if "fecha" not in df_ventas.columns:
         raise KeyError("VENTAS debe tener columna 'fecha'")
-    # Datos de Sheets vienen en formato dd/mm/YYYY; declaramos dayfirst explícito para
-    # evitar que pandas asuma mes/día y emita FutureWarning.
-    df_ventas["fecha"] = pd.to_datetime(
-        df_ventas["fecha"], errors="coerce", dayfirst=True
-    ).dt.normalize()
-
-    # ids (para join estable)
-    for col in ["id"]:
-        if col in df_clientes.columns:
-            df_clientes[col] = df_clientes[col].astype(str)
-    for col in ["id", "cliente"]:
-        if col in df_ventas.columns:
-            df_ventas[col] = df_ventas[col].astype(str)
-    for col in ["id", "cliente_id"]:
-        if col in df_destinatarios.columns:
-            df_destinatarios[col] = df_destinatarios[col].astype(str)
-    for col in ["venta_id"]:
-        if col in df_det.columns:
-            df_det[col] = df_det[col].astype(str)
+    fechas = _parse_sale_dates(df_ventas["fecha"])
+    in_day = (fechas == day).to_numpy()
 
-    # --- filtrar ventas del día ---
-    ventas_dia = df_ventas[df_ventas["fecha"] == day].copy()
+    ventas_dia = df_ventas[in_day].copy()
+    ventas_dia["fecha"] = fechas[in_day]
 
     if ventas_dia.empty:
         return pd.DataFrame()
@@ -73,6 +242,9 @@ def build_daily_orders(
         if ventas_dia.empty:
             return pd.DataFrame()
 
+    # ids (para join estable), solo de las ventas que sobrevivieron
+    ventas_dia = _as_str_columns(ventas_dia, ["id", "cliente"])
+
     # --- filtrar por venta específica si corresponde ---
     if venta_id is not None:
         ventas_dia = ventas_dia[ventas_dia["id"] == str(venta_id)].copy()
@@ -84,8 +256,12 @@ def build_daily_orders(
     if "cliente" not in ventas_dia.columns:
         raise KeyError("VENTAS debe tener columna 'cliente' (id del cliente)")
 
+    # Un left merge no cambia si se descartan antes los clientes sin ventas del día.
+    clientes = df_clientes
+    if "nombre" in clientes.columns:
+        clientes = clientes[clientes["nombre"].isin(ventas_dia["cliente"])]
     ventas_cli = ventas_dia.merge(
-        df_clientes,
+        _as_str_columns(clientes, ["id"]),
         left_on="cliente",
         right_on="nombre",
         how="left",
@@ -97,8 +273,11 @@ def build_daily_orders(
     if "destinatario" not in ventas_cli.columns:
         raise KeyError("VENTAS debe tener columna 'destinatario'")
 
+    destinatarios = df_destinatarios
+    if "nombre" in destinatarios.columns:
+        destinatarios = destinatarios[destinatarios["nombre"].isin(ventas_cli["destinatario"])]
     ventas_cli_des = ventas_cli.merge(
-        df_destinatarios,
+        _as_str_columns(destinatarios, ["id", "cliente_id"]),
         left_on="destinatario",
         right_on="nombre",
         how="left",
@@ -109,7 +288,8 @@ def build_daily_orders(
     if "venta_id" not in df_det.columns:
         raise KeyError("DETALLE_VENTAS debe tener columna 'venta_id'")
 
-    det_dia = df_det.merge(
+    det = df_det[_str_isin(df_det["venta_id"], ventas_cli_des["id"])]
+    det_dia = _as_str_columns(det, ["venta_id"]).merge(
         ventas_cli_des,
         left_on="venta_id",
         right_on="id",
@@ -134,58 +314,237 @@ def build_daily_orders(
     return det_dia
 
 
-def build_orders_structure(det_dia: pd.DataFrame) -> list[dict]:
-    """
-    Construye la estructura de pedidos para el PDF.
-    Retorna lista de dicts con 'header' y 'items' por pedido.
+def compact_orders(orders: list[Order]) -> list[Order]:
+    """Copia los ítems de un tramo de pedidos a arrays propios.
+
+    Sirve para mandar un tramo a otro proceso sin serializar las columnas de
+    todo el día.
+
+    Args:
+        orders: Pedidos consecutivos de un mismo `build_orders_structure`.
+
+    Returns:
+        list[Order]: Mismos pedidos, con columnas que solo cubren sus filas.
     """
-    orders = []
-    for venta_id, g in det_dia.groupby("venta_id", sort=False):
-        # header de la venta (sale del primer registro)
-        r0 = g.iloc[0]
-        fecha_str = (
-            pd.to_datetime(r0.get("fecha")).strftime("%d-%m-%y")
-            if pd.notna(r0.get("fecha"))
-            else ""
+    if not orders:
+        return []
+    shared = orders[0].items.columns
+    if any(order.items.columns is not shared for order in orders):
+        return list(orders)
+    start = min(order.items.start for order in orders)
+    stop = max(order.items.stop for order in orders)
+    columns = {name: values[start:stop].copy() for name, values in shared.items()}
+    return [
+        Order(
+            header=order.header,
+            items=OrderItems(columns, order.items.start - start, order.items.stop - start),
         )
+        for order in orders
+    ]
 
-        # nombre cliente: CLIENTES.nombre
-        cliente_nombre = str(r0.get("nombre", "") or "")
-        # destinatario: VENTAS.destinatario
-        destinatario = str(r0.get("destinatario", "") or "")
-        if destinatario:
-            cliente_nombre = f"{destinatario} ({cliente_nombre})"
-
-        # dirección: prioriza VENTAS.destinatario
-        direccion = str(r0.get("direccion", "") or "")
-        direccion_des = str(r0.get("direccion_destinatario", "") or "")
-        if direccion_des != "nan" and direccion_des:
-            direccion = direccion_des
-
-        total_venta = (
-            g["precio_total"].sum(skipna=True) if "precio_total" in g.columns else 0
-        )
 
-        factura_despacho = r0.get("factura_despacho", None)
-        rut = str(r0.get("rut", "") or r0.get("rut_cliente", "") or "")
+def _item_columns(det_dia: pd.DataFrame, positions: np.ndarray) -> dict[str, np.ndarray]:
+    """Extrae las columnas de ítem en el orden de `positions`.
+
+    Args:
+        det_dia: Detalle de ventas.
+        positions: Posiciones de fila a tomar, en orden.
+
+    Returns:
+        dict[str, np.ndarray]: Un array por columna de `ITEM_COLUMNS` presente.
+    """
+    return {
+        name: det_dia[name].to_numpy()[positions]
+        for name in ITEM_COLUMNS
+        if name in det_dia.columns
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class OrderGroups:
+    """Filas de un detalle agrupadas por `venta_id`, sin un DataFrame por grupo.
+
+    Los grupos siguen el orden de primera aparición (como `groupby(sort=False)`)
+    y las filas sin `venta_id` quedan fuera.
+
+    Args:
+        keys: `venta_id` de cada grupo.
+        positions: Posiciones de fila del detalle, agrupadas por pedido.
+        starts: Inicio de cada grupo dentro de `positions`.
+        stops: Fin (exclusivo) de cada grupo dentro de `positions`.
+    """
+
+    keys: list[Any]
+    positions: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def first(self, frame: pd.DataFrame, name: str) -> pd.Series | None:
+        """Valor de la primera fila de cada grupo (como `g.iloc[0][name]`).
+
+        Args:
+            frame: Detalle agrupado.
+            name: Columna.
 
-        header = {
-            "venta_id": venta_id,
-            "fecha_str": fecha_str,
-            "cliente_nombre": cliente_nombre,
-            "direccion": direccion,
-            "total_venta": total_venta,
-            "factura_despacho": factura_despacho,
-        }
+        Returns:
+            pd.Series | None: Un valor por grupo, o None si no existe la columna.
+        """
+        if name not in frame.columns:
+            return None
+        return frame[name].iloc[self.positions[self.starts]].reset_index(drop=True)
 
-        # items: aseguramos columnas esperadas
-        cols = ["producto", "calibre", "kg", "precio_unit", "precio_total"]
-        for col in cols:
-            if col not in g.columns:
-                g[col] = ""
+    def sum(self, frame: pd.DataFrame, name: str) -> np.ndarray:
+        """Suma por grupo ignorando NaN (como `g[name].sum(skipna=True)`).
 
-        items = g[cols].copy()
+        Args:
+            frame: Detalle agrupado.
+            name: Columna existente.
 
-        orders.append({"header": header, "items": items})
+        Returns:
+            np.ndarray: Una suma por grupo.
+        """
+        values = frame[name].to_numpy()[self.positions]
+        if len(self) == 0:
+            return np.zeros(0, dtype=values.dtype if values.dtype.kind in "iubf" else object)
+        if values.dtype.kind in "iub":
+            return np.add.reduceat(values, self.starts)
+        if values.dtype.kind == "f":
+            return np.add.reduceat(np.nan_to_num(values, nan=0.0), self.starts)
+        group_ids = np.repeat(np.arange(len(self)), self.stops - self.starts)
+        return pd.Series(values).groupby(group_ids).sum().to_numpy()
 
-    return orders
+
+def group_orders(det_dia: pd.DataFrame) -> OrderGroups:
+    """Agrupa las filas del detalle por `venta_id` en una sola pasada.
+
+    Args:
+        det_dia: Detalle de ventas (debe tener `venta_id`).
+
+    Returns:
+        OrderGroups: Grupos en orden de primera aparición.
+    """
+    codes, uniques = pd.factorize(det_dia["venta_id"], sort=False)
+    valid = np.flatnonzero(codes >= 0)
+    positions = valid[np.argsort(codes[valid], kind="stable")]
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    stops = np.cumsum(counts)
+    return OrderGroups(
+        keys=list(uniques),
+        positions=positions,
+        starts=stops - counts,
+        stops=stops,
+    )
+
+
+def text_values(values: pd.Series | None, size: int) -> np.ndarray:
+    """Equivale a `str(v or "")` por elemento (NaN queda como "nan").
+
+    Args:
+        values: Valores, o None si la columna no existe.
+        size: Largo del resultado cuando `values` es None.
+
+    Returns:
+        np.ndarray: Array de `str`.
+    """
+    if values is None:
+        return np.full(size, "", dtype=object)
+    raw = values.to_numpy(dtype=object)
+    if raw.size == 0:
+        return raw
+    return np.where(np.logical_not(raw), "", raw.astype(str)).astype(object)
+
+
+def format_order_dates(values: pd.Series | None, size: int) -> np.ndarray:
+    """Formatea fechas como `dd-mm-yy` ("" si falta la fecha).
+
+    Args:
+        values: Fechas (datetime64, date/Timestamp o texto), o None.
+        size: Largo del resultado cuando `values` es None.
+
+    Returns:
+        np.ndarray: Array de `str`.
+    """
+    if values is None:
+        return np.full(size, "", dtype=object)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        if not all(isinstance(v, (date, datetime)) or pd.isna(v) for v in values):
+            # Texto u otros: se parsea cada valor como antes (sin inferir un
+            # formato común a todas las filas).
+            return np.array(
+                [pd.to_datetime(v).strftime("%d-%m-%y") if pd.notna(v) else "" for v in values],
+                dtype=object,
+            )
+        values = pd.to_datetime(values)
+    return values.dt.strftime("%d-%m-%y").fillna("").to_numpy(dtype=object)
+
+
+def build_orders_structure(det_dia: pd.DataFrame) -> list[Order]:
+    """Construye la estructura de pedidos para los PDFs.
+
+    Las filas se agrupan por `venta_id` (en orden de primera aparición, como
+    `groupby(sort=False)`) en un único juego de arrays por columna; cada
+    `Order` guarda su cabecera y el tramo de filas de sus ítems. Las
+    cabeceras se calculan por columna para todos los pedidos a la vez. No
+    modifica `det_dia`, así que ambos renderers pueden usar el mismo resultado.
+
+    Args:
+        det_dia: Detalle de ventas del día (ver `build_daily_orders`).
+
+    Returns:
+        list[Order]: Un pedido por `venta_id`.
+    """
+    groups = group_orders(det_dia)
+    size = len(groups)
+    columns = _item_columns(det_dia, groups.positions)
+
+    fecha_str = format_order_dates(groups.first(det_dia, "fecha"), size)
+
+    # nombre cliente: CLIENTES.nombre; si hay VENTAS.destinatario, va adelante.
+    cliente_nombre = text_values(groups.first(det_dia, "nombre"), size)
+    destinatario = text_values(groups.first(det_dia, "destinatario"), size)
+    con_destinatario = destinatario != ""
+    cliente_nombre = np.where(
+        con_destinatario,
+        destinatario + " (" + cliente_nombre + ")",
+        cliente_nombre,
+    )
+
+    # dirección: prioriza VENTAS.destinatario
+    direccion = text_values(groups.first(det_dia, "direccion"), size)
+    direccion_des = text_values(groups.first(det_dia, "direccion_destinatario"), size)
+    direccion = np.where((direccion_des != "nan") & (direccion_des != ""), direccion_des, direccion)
+
+    if "precio_total" in det_dia.columns:
+        total_venta = list(groups.sum(det_dia, "precio_total"))
+    else:
+        total_venta = [0] * size
+
+    facturas = groups.first(det_dia, "factura_despacho")
+    factura_despacho = facturas.tolist() if facturas is not None else [None] * size
+
+    return [
+        Order(
+            header={
+                "venta_id": venta_id,
+                "fecha_str": fecha,
+                "cliente_nombre": cliente,
+                "direccion": dir_,
+                "total_venta": total,
+                "factura_despacho": factura,
+            },
+            items=OrderItems(columns, start, stop),
+        )
+        for venta_id, fecha, cliente, dir_, total, factura, start, stop in zip(
+            groups.keys,
+            fecha_str.tolist(),
+            cliente_nombre.tolist(),
+            direccion.tolist(),
+            total_venta,
+            factura_despacho,
+            groups.starts.tolist(),
+            groups.stops.tolist(),
+        )
+    ]
@@ -2,22 +2,35 @@ from __future__ import annotations
 
 import os
 import re
+import threading
 from dataclasses import dataclass
 from datetime import date, datetime
 from functools import lru_cache
 from typing import Literal, Protocol, runtime_checkable
 
+import numpy as np
 import pandas as pd
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
 from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.engine import Engine
 
-from create_prints_server.domain.orders import build_daily_orders
-from create_prints_server.infra.google_sheets import sheet_to_df
+from create_prints_server.domain.orders import build_daily_orders, group_orders, text_values
+from create_prints_server.infra.google_sheets import get_sheets_service_registry, sheets_to_dfs
+from create_prints_server.infra.sheets_cache import (
+    SheetsCacheConfig,
+    SheetsTableCache,
+    get_sheets_table_cache,
+    load_sheets_cache_config,
+)
+from create_prints_server.infra.sheets_snapshot import (
+    SheetsSnapshotStore,
+    SnapshotConfig,
+    SnapshotSyncer,
+    SnapshotSyncLock,
+    load_snapshot_config,
+)
 
 
-DocumentSourceType = Literal["sheets", "postgres"]
+DocumentSourceType = Literal["sheets", "snapshot", "postgres"]
 
 
 @dataclass(frozen=True)
@@ -28,11 +41,32 @@ class DocumentQuery:
         day: Fecha objetivo a consultar.
         allowed_types: Tipos de venta permitidos. Si es None, no filtra.
         venta_id: Si se informa, limita la consulta a una venta puntual.
+        fresh: Si es True, las ventas y su detalle se leen de la fuente aunque
+            haya una copia vigente en cache o snapshot (lo usa la generación
+            de PDFs).
     """
 
     day: date
     allowed_types: list[str] | None = None
     venta_id: str | None = None
+    fresh: bool = False
+
+
+@dataclass(frozen=True)
+class EgresoSummary:
+    """Resumen de una venta tipo EGRESO para el selector de la UI.
+
+    Args:
+        venta_id: Id de la venta.
+        cliente: Nombre del cliente ("" si no tiene).
+        destinatario: Nombre del destinatario ("" si no tiene).
+        total: Suma de `precio_total` de sus ítems.
+    """
+
+    venta_id: str
+    cliente: str
+    destinatario: str
+    total: int
 
 
 @runtime_checkable
@@ -53,6 +87,16 @@ class DocumentsProvider(Protocol):
             pd.DataFrame: Tabla a nivel de ítem compatible con el render actual.
         """
 
+    def aggregate_egresos(self, day: date) -> list[EgresoSummary]:
+        """Obtiene una fila por venta tipo EGRESO del día, con su total.
+
+        Args:
+            day: Fecha a consultar.
+
+        Returns:
+            list[EgresoSummary]: Ventas ordenadas por cliente, destinatario y id.
+        """
+
 
 @dataclass(frozen=True)
 class GoogleSheetsConfig:
@@ -101,16 +145,32 @@ class BusinessDatabaseConfig:
 
 
 class SheetsDocumentsProvider:
-    """Proveedor de documentos comerciales basado en Google Sheets."""
+    """Proveedor de documentos comerciales basado en Google Sheets.
+
+    Las hojas se leen a través de un `SheetsTableCache`: CLIENTES y
+    DESTINATARIOS con un TTL largo y VENTAS/DETALLE_VENTAS con uno corto. Solo
+    las hojas vencidas se piden a la API, en un único `batchGet`. Una consulta
+    con `fresh=True` vuelve a leer VENTAS/DETALLE_VENTAS siempre.
+    """
 
-    def __init__(self, config: GoogleSheetsConfig) -> None:
+    def __init__(
+        self,
+        config: GoogleSheetsConfig,
+        *,
+        cache: SheetsTableCache | None = None,
+        cache_config: SheetsCacheConfig | None = None,
+    ) -> None:
         """Inicializa el proveedor de Google Sheets.
 
         Args:
             config: Configuración de acceso a Sheets.
+            cache: Cache de tablas. Por defecto, el compartido del proceso.
+            cache_config: Vigencias del cache. Por defecto, desde entorno.
         """
 
         self._config = config
+        self._cache = cache or get_sheets_table_cache()
+        self._cache_config = cache_config or load_sheets_cache_config()
 
     def load_orders_frame(self, query: DocumentQuery) -> pd.DataFrame:
         """Carga el detalle de ventas desde Google Sheets.
@@ -122,62 +182,229 @@ class SheetsDocumentsProvider:
             pd.DataFrame: Tabla detallada compatible con el flujo actual.
         """
 
-        service = self._build_service()
-        df_clientes = sheet_to_df(
-            service,
-            self._config.spreadsheet_id,
-            self._config.clientes_sheet,
-            self._config.clientes_range,
-        )
-        df_destinatarios = sheet_to_df(
-            service,
-            self._config.spreadsheet_id,
-            self._config.destinatarios_sheet,
-            self._config.destinatarios_range,
-        )
-        df_ventas = sheet_to_df(
-            service,
-            self._config.spreadsheet_id,
-            self._config.ventas_sheet,
-            self._config.ventas_range,
+        return _orders_from_sheet_frames(self._load_tables(fresh_facts=query.fresh), query)
+
+    def aggregate_egresos(self, day: date) -> list[EgresoSummary]:
+        """Resume las ventas tipo EGRESO del día (ver `summarize_egresos`).
+
+        Args:
+            day: Fecha a consultar.
+
+        Returns:
+            list[EgresoSummary]: Una fila por venta.
+        """
+
+        return summarize_egresos(
+            self.load_orders_frame(DocumentQuery(day=day, allowed_types=["EGRESO"]))
         )
-        df_det = sheet_to_df(
-            service,
-            self._config.spreadsheet_id,
-            self._config.detalle_sheet,
-            self._config.detalle_range,
+
+    def _load_tables(self, *, fresh_facts: bool = False) -> list[pd.DataFrame]:
+        """Lee CLIENTES, DESTINATARIOS, VENTAS y DETALLE_VENTAS (cache + API).
+
+        Args:
+            fresh_facts: Si es True, VENTAS y DETALLE_VENTAS se piden a la API
+                aunque estén vigentes (y se actualizan en el cache).
+
+        Returns:
+            list[pd.DataFrame]: Las cuatro tablas, en ese orden.
+        """
+
+        cfg = self._config
+        dimension_ttl = self._cache_config.dimension_ttl_seconds
+        fact_ttl = 0.0 if fresh_facts else self._cache_config.fact_ttl_seconds
+        tables = [
+            (cfg.clientes_sheet, cfg.clientes_range, dimension_ttl),
+            (cfg.destinatarios_sheet, cfg.destinatarios_range, dimension_ttl),
+            (cfg.ventas_sheet, cfg.ventas_range, fact_ttl),
+            (cfg.detalle_sheet, cfg.detalle_range, fact_ttl),
+        ]
+
+        frames: list[pd.DataFrame | None] = [None] * len(tables)
+        if self._cache_config.enabled:
+            for index, (sheet, a1_range, ttl) in enumerate(tables):
+                frames[index] = self._cache.get(
+                    cfg.spreadsheet_id, sheet, a1_range, ttl_seconds=ttl
+                )
+
+        missing = [index for index, frame in enumerate(frames) if frame is None]
+        if missing:
+            # Un solo round trip para las hojas que no estaban vigentes.
+            fetched = sheets_to_dfs(
+                self._build_service(),
+                cfg.spreadsheet_id,
+                [tables[index][:2] for index in missing],
+            )
+            for index, frame in zip(missing, fetched):
+                frames[index] = frame
+                # Una hoja vacía suele ser un rango mal configurado: no se
+                # cachea para no arrastrar el error hasta que venza el TTL.
+                if self._cache_config.enabled and not frame.empty:
+                    self._cache.put(cfg.spreadsheet_id, *tables[index][:2], frame)
+        return frames  # type: ignore[return-value]
+
+    def _build_service(self):
+        """Obtiene el cliente readonly de Google Sheets.
+
+        El cliente y las credenciales se reutilizan entre jobs (ver
+        `SheetsServiceRegistry`).
+
+        Returns:
+            Resource: Cliente de la API de Sheets.
+        """
+
+        return get_sheets_service_registry().service(self._config.credentials_path)
+
+
+class SnapshotDocumentsProvider:
+    """Proveedor de documentos que responde desde un snapshot local de Sheets.
+
+    Las cuatro hojas se copian a un SQLite local (`SheetsSnapshotStore`) y un
+    thread las sincroniza cada `sync_seconds` trayendo solo las filas nuevas.
+    Todos los procesos arrancan el thread, pero solo sincroniza el que tiene
+    el `SnapshotSyncLock` del archivo. Las consultas no esperan a la red salvo
+    la primera vez, con el snapshot vacío, o si piden `DocumentQuery.fresh`.
+    """
+
+    def __init__(
+        self,
+        config: GoogleSheetsConfig,
+        snapshot: SnapshotConfig,
+        *,
+        store: SheetsSnapshotStore | None = None,
+    ) -> None:
+        """Inicializa el proveedor.
+
+        Args:
+            config: Configuración de acceso a Sheets.
+            snapshot: Archivo e intervalos del snapshot.
+            store: Store opcional para testing o inyección manual.
+        """
+
+        self._config = config
+        self._snapshot = snapshot
+        self._store = store or SheetsSnapshotStore(snapshot.path, config.spreadsheet_id)
+        self._syncer = SnapshotSyncer(
+            self.sync,
+            snapshot.sync_seconds,
+            lock=SnapshotSyncLock(f"{snapshot.path}.sync.lock"),
         )
+        self._lock = threading.Lock()
 
-        if df_clientes.empty or df_ventas.empty or df_det.empty:
-            raise RuntimeError(
-                "Alguna tabla esta vacia o el rango no trae datos "
-                "(CLIENTES/VENTAS/DETALLE_VENTAS)."
+    @property
+    def _sheets(self) -> list[tuple[str, str]]:
+        cfg = self._config
+        return [
+            (cfg.clientes_sheet, cfg.clientes_range),
+            (cfg.destinatarios_sheet, cfg.destinatarios_range),
+            (cfg.ventas_sheet, cfg.ventas_range),
+            (cfg.detalle_sheet, cfg.detalle_range),
+        ]
+
+    def sync(self, *, reread_facts: bool = False) -> dict[str, int]:
+        """Sincroniza el snapshot con Sheets (filas nuevas o relectura completa).
+
+        Args:
+            reread_facts: Si es True, solo relee completas VENTAS y
+                DETALLE_VENTAS: así se recogen también las filas editadas, que
+                la sincronización incremental no ve.
+
+        Returns:
+            dict[str, int]: Filas agregadas por hoja (-1 si se releyó completa).
+        """
+
+        sheets = self._sheets[2:] if reread_facts else self._sheets
+        full_sync_seconds = 0.0 if reread_facts else self._snapshot.full_sync_seconds
+        with self._lock:
+            return self._store.sync(
+                self._build_service(), sheets, full_sync_seconds=full_sync_seconds
             )
 
-        target_day = datetime(query.day.year, query.day.month, query.day.day)
-        return build_daily_orders(
-            df_clientes,
-            df_destinatarios,
-            df_ventas,
-            df_det,
-            target_day,
-            allowed_types=query.allowed_types,
-            venta_id=query.venta_id,
+    def load_orders_frame(self, query: DocumentQuery) -> pd.DataFrame:
+        """Carga el detalle de ventas desde el snapshot local.
+
+        Con `query.fresh`, VENTAS y DETALLE_VENTAS se releen completas antes
+        de leer: el snapshot puede tener hasta `sync_seconds` de atraso en las
+        filas agregadas y hasta `full_sync_seconds` en las editadas.
+
+        Args:
+            query: Filtros de lectura para la consulta.
+
+        Returns:
+            pd.DataFrame: Tabla detallada compatible con el flujo actual.
+        """
+
+        if not self._store.has_sheets(self._sheets):
+            self.sync()
+        elif query.fresh:
+            self.sync(reread_facts=True)
+        if self._snapshot.sync_seconds > 0:
+            self._syncer.start()
+        frames = [self._store.load(sheet_name) for sheet_name, _range in self._sheets]
+        return _orders_from_sheet_frames(frames, query)
+
+    def aggregate_egresos(self, day: date) -> list[EgresoSummary]:
+        """Resume las ventas tipo EGRESO del día (ver `summarize_egresos`).
+
+        Args:
+            day: Fecha a consultar.
+
+        Returns:
+            list[EgresoSummary]: Una fila por venta.
+        """
+
+        return summarize_egresos(
+            self.load_orders_frame(DocumentQuery(day=day, allowed_types=["EGRESO"]))
         )
 
+    def close(self) -> None:
+        """Detiene la sincronización en segundo plano."""
+
+        self._syncer.stop()
+
     def _build_service(self):
-        """Construye el cliente readonly de Google Sheets.
+        """Obtiene el cliente readonly de Google Sheets (ver `SheetsServiceRegistry`).
 
         Returns:
             Resource: Cliente de la API de Sheets.
         """
 
-        scopes = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
-        creds = Credentials.from_service_account_file(
-            self._config.credentials_path,
-            scopes=scopes,
+        return get_sheets_service_registry().service(self._config.credentials_path)
+
+
+def _orders_from_sheet_frames(
+    frames: list[pd.DataFrame],
+    query: DocumentQuery,
+) -> pd.DataFrame:
+    """Arma el detalle del día desde las cuatro tablas de Sheets.
+
+    Args:
+        frames: CLIENTES, DESTINATARIOS, VENTAS y DETALLE_VENTAS, en ese orden.
+        query: Filtros de lectura para la consulta.
+
+    Returns:
+        pd.DataFrame: Tabla detallada compatible con el flujo actual.
+
+    Raises:
+        RuntimeError: Si CLIENTES, VENTAS o DETALLE_VENTAS vienen vacías.
+    """
+
+    df_clientes, df_destinatarios, df_ventas, df_det = frames
+    if df_clientes.empty or df_ventas.empty or df_det.empty:
+        raise RuntimeError(
+            "Alguna tabla esta vacia o el rango no trae datos "
+            "(CLIENTES/VENTAS/DETALLE_VENTAS)."
         )
-        return build("sheets", "v4", credentials=creds)
+
+    target_day = datetime(query.day.year, query.day.month, query.day.day)
+    return build_daily_orders(
+        df_clientes,
+        df_destinatarios,
+        df_ventas,
+        df_det,
+        target_day,
+        allowed_types=query.allowed_types,
+        venta_id=query.venta_id,
+    )
 
 
 class PostgresDocumentsProvider:
@@ -214,6 +441,34 @@ class PostgresDocumentsProvider:
             frame = pd.read_sql_query(statement, connection, params=params)
         return _normalize_postgres_orders_frame(frame)
 
+    def aggregate_egresos(self, day: date) -> list[EgresoSummary]:
+        """Resume las ventas tipo EGRESO del día con un solo GROUP BY.
+
+        Args:
+            day: Fecha a consultar.
+
+        Returns:
+            list[EgresoSummary]: Una fila por venta.
+        """
+
+        statement, params = build_postgres_egresos_query(self._schema, self._config, day)
+        with self._engine.connect() as connection:
+            rows = connection.execute(statement, params).all()
+        if any(row.missing_totals for row in rows):
+            # Igual que `_normalize_postgres_orders_frame` al generar la guía.
+            raise RuntimeError(
+                "La columna requerida 'precio_total' trae valores no numéricos desde PostgreSQL."
+            )
+        return [
+            EgresoSummary(
+                venta_id=str(row.venta_id),
+                cliente=row.cliente or "",
+                destinatario=row.destinatario or "",
+                total=int(row.total or 0),
+            )
+            for row in rows
+        ]
+
 
 def get_document_source_type() -> DocumentSourceType:
     """Retorna el tipo de fuente configurado globalmente.
@@ -226,9 +481,9 @@ def get_document_source_type() -> DocumentSourceType:
     """
 
     source = os.getenv("DOCUMENTS_DATA_SOURCE", "sheets").strip().lower()
-    if source not in {"sheets", "postgres"}:
+    if source not in {"sheets", "snapshot", "postgres"}:
         raise ValueError(
-            "DOCUMENTS_DATA_SOURCE debe ser 'sheets' o 'postgres'."
+            "DOCUMENTS_DATA_SOURCE debe ser 'sheets', 'snapshot' o 'postgres'."
         )
     return source  # type: ignore[return-value]
 
@@ -246,10 +501,48 @@ def build_documents_provider() -> DocumentsProvider:
 
     source = get_document_source_type()
     if source == "sheets":
-        return SheetsDocumentsProvider(_load_google_sheets_config())
+        return _get_sheets_provider(_load_google_sheets_config(), load_sheets_cache_config())
+    if source == "snapshot":
+        return _get_snapshot_provider(_load_google_sheets_config(), load_snapshot_config())
     return PostgresDocumentsProvider(_load_business_database_config())
 
 
+@lru_cache(maxsize=None)
+def _get_sheets_provider(
+    config: GoogleSheetsConfig,
+    cache_config: SheetsCacheConfig,
+) -> SheetsDocumentsProvider:
+    """Construye y cachea el provider de Sheets por configuración.
+
+    Args:
+        config: Configuración de acceso a Sheets.
+        cache_config: Vigencias del cache de hojas.
+
+    Returns:
+        SheetsDocumentsProvider: Provider reutilizable entre requests y jobs.
+    """
+
+    return SheetsDocumentsProvider(config, cache_config=cache_config)
+
+
+@lru_cache(maxsize=None)
+def _get_snapshot_provider(
+    config: GoogleSheetsConfig,
+    snapshot: SnapshotConfig,
+) -> SnapshotDocumentsProvider:
+    """Construye y cachea el provider de snapshot (un syncer por proceso).
+
+    Args:
+        config: Configuración de acceso a Sheets.
+        snapshot: Archivo e intervalos del snapshot.
+
+    Returns:
+        SnapshotDocumentsProvider: Provider reutilizable entre requests y jobs.
+    """
+
+    return SnapshotDocumentsProvider(config, snapshot)
+
+
 def _load_google_sheets_config() -> GoogleSheetsConfig:
     """Carga la configuración de Google Sheets desde variables de entorno.
 
@@ -302,21 +595,7 @@ def build_postgres_orders_query(
         tuple: Statement SQLAlchemy y parámetros asociados.
     """
 
-    conditions = [
-        "sales.deleted_at IS NULL",
-        "sale_items.deleted_at IS NULL",
-        "sales.fecha = :day",
-    ]
-    params: dict[str, object] = {"day": query.day}
-
-    if query.venta_id is not None:
-        conditions.append("CAST(sales.id AS TEXT) = :venta_id")
-        params["venta_id"] = str(query.venta_id)
-
-    translated_types = _translate_sale_types(query.allowed_types, config)
-    if translated_types:
-        conditions.append("UPPER(TRIM(COALESCE(sale_types.tipo, ''))) IN :allowed_types")
-        params["allowed_types"] = translated_types
+    conditions, params, translated_types = _postgres_sales_filter(config, query)
 
     statement = text(
         f"""
@@ -366,6 +645,152 @@ def build_postgres_orders_query(
     return statement, params
 
 
+def _half_even_sql(value: str) -> str:
+    """SQL que redondea `value` al entero con .5 al par, como `Series.round()`.
+
+    `ROUND(numeric)` de PostgreSQL aleja el .5 de cero (2.5 -> 3); aquí un
+    empate va al entero par (2.5 -> 2, 3.5 -> 4, -2.5 -> -2).
+
+    Args:
+        value: Expresión SQL numérica (se repite: debe ser barata).
+
+    Returns:
+        str: Expresión SQL redondeada.
+    """
+
+    return (
+        f"CASE WHEN {value} - FLOOR({value}) = 0.5 "
+        f"THEN FLOOR({value}) + ABS(MOD(FLOOR({value}), 2)) "
+        f"ELSE ROUND({value}) END"
+    )
+
+
+def build_postgres_egresos_query(
+    schema: str,
+    config: BusinessDatabaseConfig,
+    day: date,
+):
+    """Construye el SQL que resume por venta los EGRESO de un día.
+
+    Mismos filtros y orden que `build_postgres_orders_query`, pero agrupado por
+    venta: la base devuelve una fila por venta en vez del detalle de ítems.
+
+    El total es el de las guías impresas: cada ítem se redondea al peso
+    antes de sumar con la regla de `_normalize_postgres_orders_frame`
+    (`Series.round()`, .5 al par; ver `_half_even_sql`). `missing_totals`
+    cuenta los `precio_total` NULL, que en las guías son un error.
+
+    Args:
+        schema: Schema validado con las tablas comerciales.
+        config: Configuración del proveedor PostgreSQL.
+        day: Fecha a consultar.
+
+    Returns:
+        tuple: Statement SQLAlchemy y parámetros asociados.
+    """
+
+    conditions, params, _translated = _postgres_sales_filter(
+        config, DocumentQuery(day=day, allowed_types=["EGRESO"])
+    )
+    statement = text(
+        f"""
+        SELECT
+            CAST(sales.id AS TEXT) AS venta_id,
+            COALESCE(customer_party.nombre, '') AS cliente,
+            COALESCE(recipient_party.nombre, '') AS destinatario,
+            SUM({_half_even_sql("CAST(sale_items.precio_total AS NUMERIC)")}) AS total,
+            COUNT(*) - COUNT(sale_items.precio_total) AS missing_totals
+        FROM {schema}.sales AS sales
+        JOIN {schema}.sale_items AS sale_items
+            ON sale_items.venta_id = sales.id
+        LEFT JOIN {schema}.dim_sale_types AS sale_types
+            ON sale_types.id = sales.tipo_id
+        LEFT JOIN {schema}.parties AS customer_party
+            ON customer_party.id = sales.cliente_id
+        LEFT JOIN {schema}.parties AS recipient_party
+            ON recipient_party.id = sales.destinatario_id
+        WHERE {' AND '.join(conditions)}
+        GROUP BY sales.id, customer_party.nombre, recipient_party.nombre
+        ORDER BY customer_party.nombre ASC NULLS LAST,
+                 recipient_party.nombre ASC NULLS LAST,
+                 sales.id ASC
+        """
+    ).bindparams(bindparam("allowed_types", expanding=True))
+    return statement, params
+
+
+def _postgres_sales_filter(
+    config: BusinessDatabaseConfig,
+    query: DocumentQuery,
+) -> tuple[list[str], dict[str, object], list[str]]:
+    """Condiciones WHERE y parámetros comunes a las consultas de ventas.
+
+    Args:
+        config: Configuración del proveedor PostgreSQL.
+        query: Filtros de negocio de la consulta.
+
+    Returns:
+        tuple: Condiciones SQL, parámetros y tipos de venta traducidos.
+    """
+
+    conditions = [
+        "sales.deleted_at IS NULL",
+        "sale_items.deleted_at IS NULL",
+        "sales.fecha = :day",
+    ]
+    params: dict[str, object] = {"day": query.day}
+
+    if query.venta_id is not None:
+        conditions.append("CAST(sales.id AS TEXT) = :venta_id")
+        params["venta_id"] = str(query.venta_id)
+
+    translated_types = _translate_sale_types(query.allowed_types, config)
+    if translated_types:
+        conditions.append("UPPER(TRIM(COALESCE(sale_types.tipo, ''))) IN :allowed_types")
+        params["allowed_types"] = translated_types
+
+    return conditions, params, translated_types
+
+
+def summarize_egresos(det_dia: pd.DataFrame) -> list[EgresoSummary]:
+    """Resume un detalle de ventas por `venta_id` (fallback sin SQL).
+
+    Agrupa con `group_orders`, sin recorrer grupos en Python. El cliente es
+    `nombre` (o `cliente` si viene vacío) y el total suma `precio_total`.
+
+    Args:
+        det_dia: Detalle de ventas (ej. de `load_orders_frame`).
+
+    Returns:
+        list[EgresoSummary]: Una fila por venta, en orden de aparición.
+    """
+
+    if det_dia.empty:
+        return []
+
+    groups = group_orders(det_dia)
+    size = len(groups)
+    nombre = text_values(groups.first(det_dia, "nombre"), size)
+    clientes = np.where(nombre != "", nombre, text_values(groups.first(det_dia, "cliente"), size))
+    destinatarios = text_values(groups.first(det_dia, "destinatario"), size)
+    if "precio_total" in det_dia.columns:
+        totals = groups.sum(det_dia, "precio_total").tolist()
+    else:
+        totals = [0] * size
+
+    return [
+        EgresoSummary(
+            venta_id=str(venta_id),
+            cliente=cliente,
+            destinatario=destinatario,
+            total=int(total),
+        )
+        for venta_id, cliente, destinatario, total in zip(
+            groups.keys, clientes.tolist(), destinatarios.tolist(), totals
+        )
+    ]
+
+
 def _normalize_postgres_orders_frame(frame: pd.DataFrame) -> pd.DataFrame:
     """Normaliza el resultado PostgreSQL al contrato del pipeline actual.
 
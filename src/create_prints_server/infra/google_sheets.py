@@ -1,43 +1,219 @@
+from __future__ import annotations
+
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Mapping, Sequence
+
 import pandas as pd
+from google.oauth2.service_account import Credentials
+from googleapiclient.discovery import build
+
+SHEETS_READONLY_SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+
+
+class SheetsServiceRegistry:
+    """Clientes de la API de Sheets reutilizables durante todo el proceso.
+
+    Las credenciales del service account se leen una vez por archivo (y de
+    nuevo solo si el JSON cambia en disco). El token OAuth lo pide y renueva
+    `google-auth` recién cuando hace falta, al ejecutar un request.
+
+    El cliente de discovery se construye una vez por thread: su
+    `httplib2.Http` mantiene la conexión HTTPS abierta entre requests, pero
+    no es thread-safe, y la API atiende `/api/egresos` desde un threadpool.
+    """
+
+    def __init__(self) -> None:
+        """Inicializa el registro vacío."""
+        self._lock = threading.Lock()
+        self._credentials: dict[tuple[str, int], Credentials] = {}
+        self._local = threading.local()
+
+    def credentials(self, credentials_path: str) -> Credentials:
+        """Credenciales readonly del service account, compartidas entre threads.
+
+        Args:
+            credentials_path: Ruta al JSON del service account.
+
+        Returns:
+            Credentials: Credenciales (el token se obtiene al primer uso).
+        """
+        key = (credentials_path, os.stat(credentials_path).st_mtime_ns)
+        with self._lock:
+            creds = self._credentials.get(key)
+            if creds is None:
+                creds = Credentials.from_service_account_file(
+                    credentials_path,
+                    scopes=SHEETS_READONLY_SCOPES,
+                )
+                # Un JSON rotado reemplaza a las credenciales anteriores.
+                for stale in [k for k in self._credentials if k[0] == credentials_path]:
+                    del self._credentials[stale]
+                self._credentials[key] = creds
+            return creds
+
+    def service(self, credentials_path: str):
+        """Cliente readonly de Sheets del thread actual.
+
+        Args:
+            credentials_path: Ruta al JSON del service account.
+
+        Returns:
+            Resource: Cliente de la API de Sheets.
+        """
+        creds = self.credentials(credentials_path)
+        services: dict[str, tuple[Credentials, Any]] | None = getattr(
+            self._local, "services", None
+        )
+        if services is None:
+            services = self._local.services = {}
+        cached = services.get(credentials_path)
+        if cached is None or cached[0] is not creds:
+            cached = (creds, build("sheets", "v4", credentials=creds, cache_discovery=False))
+            services[credentials_path] = cached
+        return cached[1]
+
+
+@lru_cache(maxsize=1)
+def get_sheets_service_registry() -> SheetsServiceRegistry:
+    """Registro de clientes de Sheets compartido por el proceso.
+
+    Returns:
+        SheetsServiceRegistry: Instancia única del proceso.
+    """
+    return SheetsServiceRegistry()
+
+
+def a1_notation(sheet_name: str, a1_range: str) -> str:
+    """Rango completo `hoja!rango` para la API de Sheets.
+
+    Args:
+        sheet_name: Nombre de la hoja.
+        a1_range: Rango A1 dentro de la hoja (ej. `A1:H`).
+
+    Returns:
+        str: Rango en notación A1 con la hoja.
+    """
+    return f"{sheet_name}!{a1_range}"
+
+
+def rows_to_df(header: Sequence[str], data: Sequence[Sequence[Any]]) -> pd.DataFrame:
+    """Construye un DataFrame con filas crudas de Sheets y su header.
+
+    Las filas más cortas (Google omite las celdas vacías del final) se
+    completan con "" y las más largas se cortan.
+
+    Args:
+        header: Nombres de columna (primera fila del rango).
+        data: Filas de datos.
+
+    Returns:
+        pd.DataFrame: Tabla con una columna por elemento de `header`.
+    """
+    width = len(header)
+    # normaliza largo de filas (Google a veces trae filas más cortas); las
+    # filas que ya tienen el ancho justo se usan tal cual.
+    fixed = [
+        r if len(r) == width else (list(r) + [""] * (width - len(r)))[:width] for r in data
+    ]
+
+    return pd.DataFrame(fixed, columns=list(header))
+
+
+def value_range_to_df(value_range: Mapping[str, Any]) -> pd.DataFrame:
+    """Construye un DataFrame desde un `ValueRange` de la API de Sheets.
+
+    Args:
+        value_range: Respuesta de `values().get` o un elemento de
+            `valueRanges` de `values().batchGet`. La primera fila es el header.
+
+    Returns:
+        pd.DataFrame: Tabla de la hoja, vacía si el rango no trae filas.
+    """
+    rows = value_range.get("values", [])
+    if not rows:
+        return pd.DataFrame()
+    return rows_to_df(rows[0], rows[1:])
+
+
+def batch_get_rows(
+    service, spreadsheet_id: str, ranges: Sequence[str]
+) -> list[list[list[Any]]]:
+    """Lee varios rangos completos (`hoja!A1`) con un único `values().batchGet`.
+
+    Args:
+        service: Cliente de la API de Sheets (`googleapiclient` Resource).
+        spreadsheet_id: ID del spreadsheet.
+        ranges: Rangos en notación A1 con hoja (ver `a1_notation`).
+
+    Returns:
+        list[list[list[Any]]]: Filas crudas de cada rango, en el orden pedido.
+
+    Raises:
+        RuntimeError: Si la respuesta no trae un `ValueRange` por rango pedido.
+    """
+    result = (
+        service.spreadsheets()
+        .values()
+        .batchGet(spreadsheetId=spreadsheet_id, ranges=list(ranges))
+        .execute()
+    )
+
+    value_ranges = result.get("valueRanges", [])
+    if len(value_ranges) != len(ranges):
+        raise RuntimeError(
+            f"Sheets devolvió {len(value_ranges)} rangos para {len(ranges)} pedidos."
+        )
+    # La API responde los rangos en el orden en que se pidieron.
+    return [value_range.get("values", []) for value_range in value_ranges]
+
+
+def sheets_to_dfs(
+    service, spreadsheet_id: str, ranges: Sequence[tuple[str, str]]
+) -> list[pd.DataFrame]:
+    """Lee varias hojas con un único `values().batchGet`.
+
+    Args:
+        service: Cliente de la API de Sheets (`googleapiclient` Resource).
+        spreadsheet_id: ID del spreadsheet.
+        ranges: Pares `(hoja, rango A1)` a leer.
+
+    Returns:
+        list[pd.DataFrame]: Una tabla por rango, en el mismo orden de `ranges`.
+
+    Raises:
+        RuntimeError: Si la respuesta no trae un `ValueRange` por rango pedido.
+    """
+    rows_by_range = batch_get_rows(
+        service,
+        spreadsheet_id,
+        [a1_notation(sheet_name, a1_range) for sheet_name, a1_range in ranges],
+    )
+    return [value_range_to_df({"values": rows}) for rows in rows_by_range]
 
 
 def sheet_to_df(
     service, spreadsheet_id: str, sheet_name: str, a1_range: str
 ) -> pd.DataFrame:
-    """transforma un sheet en un DF de pandas
+    """Lee una sola hoja como DataFrame (ver `sheets_to_dfs` para varias).
 
     Args:
-        service (_type_): _description_
-        spreadsheet_id (str): _description_
-        sheet_name (str): _description_
-        a1_range (str): _description_
+        service: Cliente de la API de Sheets.
+        spreadsheet_id: ID del spreadsheet.
+        sheet_name: Nombre de la hoja.
+        a1_range: Rango A1 dentro de la hoja.
 
     Returns:
-        pd.DataFrame: _description_
+        pd.DataFrame: Tabla de la hoja, vacía si el rango no trae filas.
     """
     result = (
         service.spreadsheets()
         .values()
         .get(
             spreadsheetId=spreadsheet_id,
-            range=f"{sheet_name}!{a1_range}",
+            range=a1_notation(sheet_name, a1_range),
         )
         .execute()
     )
-
-    rows = result.get("values", [])
-    if not rows:
-        return pd.DataFrame()
-
-    header = rows[0]
-    data = rows[1:]
-
-    # normaliza largo de filas (Google a veces trae filas más cortas)
-    fixed = []
-    for r in data:
-        if len(r) < len(header):
-            r = r + [""] * (len(header) - len(r))
-        fixed.append(r[: len(header)])
-
-    df = pd.DataFrame(fixed, columns=header)
-    return df
+    return value_range_to_df(result)
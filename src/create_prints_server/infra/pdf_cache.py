@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from create_prints_server.config.settings import OutputConfig
+from create_prints_server.infra.logging import get_logger
+
+logger = get_logger(__name__)
+
+_PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+# Módulos cuyo código define el contenido de los PDFs. Si cambian, cambia la
+# huella del renderer y las entradas anteriores dejan de coincidir.
+_RENDERER_MODULES = (
+    "domain/orders.py",
+    "domain/guides.py",
+    "domain/money.py",
+    "render/shipping_pdf.py",
+    "render/guides_pdf.py",
+)
+
+# Subir manualmente si cambia algo del render que no está en `_RENDERER_MODULES`
+# (ej. versión de reportlab o fuentes del sistema).
+RENDERER_VERSION = "1"
+
+
+@lru_cache(maxsize=1)
+def renderer_fingerprint() -> str:
+    """Huella del código de render (`RENDERER_VERSION` + fuentes de los módulos).
+
+    Returns:
+        str: sha256 en hex.
+    """
+    digest = hashlib.sha256(RENDERER_VERSION.encode("utf-8"))
+    for relative in _RENDERER_MODULES:
+        path = _PACKAGE_ROOT / relative
+        digest.update(relative.encode("utf-8"))
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def frame_digest(frame: pd.DataFrame) -> str:
+    """Hash del contenido de un DataFrame de detalle (`det_dia`).
+
+    Se normaliza el orden de columnas; el orden de filas se respeta porque
+    define el orden de los pedidos en el PDF.
+
+    Args:
+        frame: Detalle de ventas a renderizar.
+
+    Returns:
+        str: sha256 en hex.
+    """
+    normalized = frame.reindex(columns=sorted(frame.columns, key=str)).reset_index(drop=True)
+    digest = hashlib.sha256()
+    digest.update(repr([(str(c), str(t)) for c, t in normalized.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(normalized, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _file_stamp(path: str | None) -> str:
+    """Identifica un archivo auxiliar del render (ej. logo) por tamaño y mtime."""
+    if not path or not os.path.exists(path):
+        return ""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+@dataclass(frozen=True)
+class PdfCacheConfig:
+    """Configuración del cache de PDFs.
+
+    Args:
+        enabled: Si es False, siempre se renderiza.
+        cache_dir: Carpeta de entradas `<clave>.pdf` (por defecto `pdf_cache`
+            junto a `PDF_ORDERS_PATH`).
+        max_bytes: Tamaño máximo total del cache.
+        max_age_seconds: Antigüedad máxima (desde el último uso) de una entrada
+            y de los PDFs fechados de salida.
+    """
+
+    enabled: bool
+    cache_dir: str
+    max_bytes: int
+    max_age_seconds: int
+
+
+def load_pdf_cache_config() -> PdfCacheConfig:
+    """Lee la configuración del cache desde variables de entorno.
+
+    Returns:
+        PdfCacheConfig: Configuración resuelta.
+    """
+    return PdfCacheConfig(
+        enabled=os.getenv("PDF_CACHE_ENABLED", "true").strip().lower() in ("1", "true", "yes"),
+        cache_dir=os.getenv("PDF_CACHE_DIR")
+        or str(Path(os.getenv("PDF_ORDERS_PATH", "shipping_list.pdf")).parent / "pdf_cache"),
+        max_bytes=int(os.getenv("PDF_CACHE_MAX_MB", "500")) * 1024 * 1024,
+        max_age_seconds=int(os.getenv("PDF_CACHE_MAX_AGE_DAYS", "14")) * 86400,
+    )
+
+
+class PdfCache:
+    """Cache direccionado por contenido de PDFs generados.
+
+    La clave combina el hash del `det_dia`, el tipo de documento, el
+    `OutputConfig` (sin los paths de salida) y la huella del renderer. Un hit
+    copia el PDF cacheado al path de salida en vez de renderizar.
+    """
+
+    def __init__(self, config: PdfCacheConfig) -> None:
+        """Inicializa el cache.
+
+        Args:
+            config: Configuración del cache.
+        """
+        self._config = config
+        self._dir = Path(config.cache_dir)
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si el cache está activo."""
+        return self._config.enabled
+
+    def key(self, kind: str, det_digest: str, out: OutputConfig, *, guide_title: str = "") -> str:
+        """Calcula la clave de un documento.
+
+        Args:
+            kind: Tipo de documento (shipping_list o guides).
+            det_digest: Resultado de `frame_digest(det_dia)`.
+            out: Configuración de salida usada para renderizar.
+            guide_title: Título de guía (despacho/egreso).
+
+        Returns:
+            str: sha256 en hex.
+        """
+        render_cfg = asdict(out)
+        render_cfg.pop("pdf_orders_path", None)
+        render_cfg.pop("pdf_guides_path", None)
+        material = "|".join(
+            [
+                kind,
+                guide_title,
+                det_digest,
+                repr(sorted(render_cfg.items())),
+                _file_stamp(out.logo_path),
+                renderer_fingerprint(),
+            ]
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def restore(self, key: str, output_path: str) -> bool:
+        """Copia la entrada `key` a `output_path` si existe.
+
+        Args:
+            key: Clave del documento.
+            output_path: Path de salida esperado por el job.
+
+        Returns:
+            bool: True si hubo hit.
+        """
+        if not self.enabled:
+            return False
+        entry = self._entry(key)
+        if not entry.exists():
+            return False
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{output_path}.{os.getpid()}.tmp"
+        shutil.copyfile(entry, tmp)
+        os.replace(tmp, output_path)
+        # mtime = último uso: la expiración y el LRU se calculan con él.
+        os.utime(entry)
+        logger.info(f"PDF reutilizado desde cache key={key[:12]} -> {output_path}")
+        return True
+
+    def store(self, key: str, rendered_path: str) -> None:
+        """Guarda un PDF recién renderizado y aplica la expiración.
+
+        Args:
+            key: Clave del documento.
+            rendered_path: PDF generado.
+        """
+        if not self.enabled:
+            return
+        self._dir.mkdir(parents=True, exist_ok=True)
+        entry = self._entry(key)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        shutil.copyfile(rendered_path, tmp)
+        os.replace(tmp, entry)
+        self.evict()
+
+    def evict(self, now: float | None = None) -> int:
+        """Borra entradas vencidas y, si se excede el tamaño, las menos usadas.
+
+        Args:
+            now: Timestamp de referencia. Por defecto, ahora.
+
+        Returns:
+            int: Entradas borradas.
+        """
+        if not self._dir.exists():
+            return 0
+        now = now or time.time()
+        entries = sorted(
+            ((p, p.stat()) for p in self._dir.glob("*.pdf")),
+            key=lambda item: item[1].st_mtime,
+        )
+        total = sum(stat.st_size for _p, stat in entries)
+        removed = 0
+        for path, stat in entries:
+            expired = now - stat.st_mtime > self._config.max_age_seconds
+            if not expired and total <= self._config.max_bytes:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= stat.st_size
+            removed += 1
+        return removed
+
+    def prune_outputs(
+        self, base_path: str, now: float | None = None, *, keyed: bool = False
+    ) -> int:
+        """Borra PDFs fechados de salida (`<base>_YYYYMMDD.pdf`) más viejos que el límite.
+
+        Los nombres siguen a `generator._dated_path`: `guides.pdf` produce
+        `guides_YYYYMMDD.pdf` y un base sin `.pdf` (`guides`) también. Con
+        `keyed`, también `<base>_<clave>_YYYYMMDD.pdf` (egresos por venta).
+
+        Args:
+            base_path: Path base configurado (ej. `PDF_GUIDES_PATH`).
+            now: Timestamp de referencia. Por defecto, ahora.
+            keyed: Si los nombres llevan una clave entre el base y la fecha.
+
+        Returns:
+            int: Archivos borrados.
+        """
+        base = Path(base_path)
+        if not base.parent.exists():
+            return 0
+        now = now or time.time()
+        removed = 0
+        prefix = glob.escape(base.stem if base.suffix.lower() == ".pdf" else base.name)
+        dated = "[0-9]" * 8 + ".pdf"
+        patterns = [f"{prefix}_{dated}"]
+        if keyed:
+            patterns.append(f"{prefix}_*_{dated}")
+        for path in (p for pattern in patterns for p in base.parent.glob(pattern)):
+            try:
+                if now - path.stat().st_mtime > self._config.max_age_seconds:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _entry(self, key: str) -> Path:
+        return self._dir / f"{key}.pdf"
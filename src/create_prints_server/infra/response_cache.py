@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Hashable
+
+
+@dataclass(frozen=True)
+class ResponseCacheConfig:
+    """Configuración del cache de respuestas de `/api/egresos`.
+
+    Args:
+        ttl_seconds: Vigencia para hoy y fechas futuras (las ventas cambian).
+        past_ttl_seconds: Vigencia para fechas pasadas (casi no cambian).
+        max_entries: Máximo de respuestas guardadas (LRU).
+    """
+
+    ttl_seconds: float
+    past_ttl_seconds: float
+    max_entries: int
+
+
+def load_response_cache_config() -> ResponseCacheConfig:
+    """Lee la configuración del cache desde variables de entorno.
+
+    Returns:
+        ResponseCacheConfig: Configuración resuelta.
+    """
+    return ResponseCacheConfig(
+        ttl_seconds=float(os.getenv("EGRESOS_CACHE_TTL_SECONDS", "15")),
+        past_ttl_seconds=float(os.getenv("EGRESOS_CACHE_PAST_TTL_SECONDS", "600")),
+        max_entries=int(os.getenv("EGRESOS_CACHE_MAX_ENTRIES", "64")),
+    )
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Respuesta cacheada con su ETag.
+
+    Args:
+        body: Valor a responder.
+        etag: ETag (entre comillas) calculado sobre el JSON del body.
+        expires_at: Momento (reloj monotónico) en que deja de ser vigente.
+    """
+
+    body: Any
+    etag: str
+    expires_at: float
+
+
+def compute_etag(payload: Any) -> str:
+    """ETag fuerte de un valor serializable a JSON.
+
+    Args:
+        payload: Valor a responder (ej. lista de dicts).
+
+    Returns:
+        str: ETag entre comillas.
+    """
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Indica si un header `If-None-Match` coincide con `etag`.
+
+    Args:
+        if_none_match: Valor del header (lista separada por comas o `*`).
+        etag: ETag actual.
+
+    Returns:
+        bool: True si el cliente ya tiene esta versión.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Comparación débil (RFC 9110): un proxy puede haber marcado el ETag como W/.
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
+class ResponseCache:
+    """Cache TTL + LRU de respuestas HTTP, en memoria del proceso.
+
+    Si varios requests piden la misma clave vencida a la vez, solo uno
+    consulta la fuente: el resto espera y usa su resultado.
+    """
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic) -> None:
+        """Inicializa el cache vacío.
+
+        Args:
+            max_entries: Máximo de respuestas guardadas.
+            clock: Reloj monotónico (inyectable en tests).
+        """
+        self._max_entries = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._loading: dict[Hashable, threading.Lock] = {}
+
+    def _fresh(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self._clock():
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        *,
+        ttl_seconds: float,
+        to_json: Callable[[Any], Any] = lambda body: body,
+    ) -> CachedResponse:
+        """Retorna la respuesta vigente de `key` o la calcula con `loader`.
+
+        Args:
+            key: Clave de la respuesta (ej. `(fuente, día)`).
+            loader: Calcula el body si no hay una respuesta vigente.
+            ttl_seconds: Vigencia de la respuesta calculada (0 = no guardar).
+            to_json: Convierte el body a un valor JSON para el ETag.
+
+        Returns:
+            CachedResponse: Respuesta vigente o recién calculada.
+        """
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                # Otro request pudo calcularla mientras se esperaba el lock.
+                entry = self._fresh(key)
+                if entry is not None:
+                    return entry
+
+            try:
+                body = loader()
+                entry = CachedResponse(
+                    body=body,
+                    etag=compute_etag(to_json(body)),
+                    expires_at=self._clock() + ttl_seconds,
+                )
+                with self._lock:
+                    if ttl_seconds > 0:
+                        self._entries[key] = entry
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self._max_entries:
+                            self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+            return entry
+
+    def clear(self) -> int:
+        """Descarta todas las respuestas.
+
+        Returns:
+            int: Respuestas descartadas.
+        """
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+
+
+@lru_cache(maxsize=1)
+def get_egresos_cache() -> ResponseCache:
+    """Cache de respuestas de `/api/egresos` compartido por el proceso.
+
+    Returns:
+        ResponseCache: Instancia única del proceso.
+    """
+    return ResponseCache(load_response_cache_config().max_entries)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable
+
+import pandas as pd
+
+from create_prints_server.infra.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class SheetsCacheConfig:
+    """Configuración del cache de hojas de Google Sheets.
+
+    Args:
+        enabled: Si es False, cada lectura va a la API.
+        dimension_ttl_seconds: Vigencia de CLIENTES y DESTINATARIOS (cambian poco).
+        fact_ttl_seconds: Vigencia de VENTAS y DETALLE_VENTAS (cambian durante el día).
+    """
+
+    enabled: bool
+    dimension_ttl_seconds: float
+    fact_ttl_seconds: float
+
+
+def load_sheets_cache_config() -> SheetsCacheConfig:
+    """Lee la configuración del cache desde variables de entorno.
+
+    Returns:
+        SheetsCacheConfig: Configuración resuelta.
+    """
+    return SheetsCacheConfig(
+        enabled=os.getenv("SHEETS_CACHE_ENABLED", "true").strip().lower() in ("1", "true", "yes"),
+        dimension_ttl_seconds=float(os.getenv("SHEETS_DIMENSION_TTL_SECONDS", "3600")),
+        fact_ttl_seconds=float(os.getenv("SHEETS_FACT_TTL_SECONDS", "60")),
+    )
+
+
+@dataclass
+class _Entry:
+    frame: pd.DataFrame
+    loaded_at: float
+
+
+class SheetsTableCache:
+    """Cache en memoria de tablas leídas de Sheets, con vigencia por tabla.
+
+    Las entradas se identifican por `(spreadsheet_id, hoja, rango)` y cada
+    lectura indica su TTL, así CLIENTES puede durar una hora mientras VENTAS
+    se refresca cada minuto. Lleva contadores de hits/misses por hoja.
+
+    Los DataFrames se comparten entre lecturas: quien los use no debe
+    modificarlos (`build_daily_orders` no modifica sus entradas).
+
+    El cache vive en el proceso: invalidarlo desde la API no afecta al
+    `generate_worker`. Por eso la generación de PDFs lee VENTAS y
+    DETALLE_VENTAS sin cache (`DocumentQuery.fresh`) y solo reutiliza las
+    dimensiones.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Inicializa el cache vacío.
+
+        Args:
+            clock: Reloj monotónico (inyectable en tests).
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str, str], _Entry] = {}
+        self._hits: dict[str, int] = {}
+        self._misses: dict[str, int] = {}
+
+    def get(
+        self, spreadsheet_id: str, sheet_name: str, a1_range: str, *, ttl_seconds: float
+    ) -> pd.DataFrame | None:
+        """Retorna la tabla cacheada si sigue vigente.
+
+        Args:
+            spreadsheet_id: ID del spreadsheet.
+            sheet_name: Nombre de la hoja.
+            a1_range: Rango A1 leído.
+            ttl_seconds: Vigencia máxima de la entrada (0 = no usar el cache).
+
+        Returns:
+            pd.DataFrame | None: Tabla cacheada, o None si no hay o venció.
+        """
+        with self._lock:
+            entry = self._entries.get((spreadsheet_id, sheet_name, a1_range))
+            fresh = entry is not None and self._clock() - entry.loaded_at < ttl_seconds
+            counters = self._hits if fresh else self._misses
+            counters[sheet_name] = counters.get(sheet_name, 0) + 1
+            return entry.frame if fresh else None
+
+    def put(self, spreadsheet_id: str, sheet_name: str, a1_range: str, frame: pd.DataFrame) -> None:
+        """Guarda una tabla recién leída.
+
+        Args:
+            spreadsheet_id: ID del spreadsheet.
+            sheet_name: Nombre de la hoja.
+            a1_range: Rango A1 leído.
+            frame: Tabla leída de la API.
+        """
+        with self._lock:
+            self._entries[(spreadsheet_id, sheet_name, a1_range)] = _Entry(frame, self._clock())
+
+    def invalidate(self, sheet_names: Iterable[str] | None = None) -> int:
+        """Descarta entradas para forzar una nueva lectura.
+
+        Args:
+            sheet_names: Hojas a descartar. Si es None, descarta todas.
+
+        Returns:
+            int: Entradas descartadas.
+        """
+        with self._lock:
+            if sheet_names is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                names = set(sheet_names)
+                stale = [key for key in self._entries if key[1] in names]
+                for key in stale:
+                    del self._entries[key]
+                removed = len(stale)
+        logger.info(f"Cache de Sheets invalidado: {removed} tablas ({sheet_names or 'todas'})")
+        return removed
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Contadores por hoja desde el inicio del proceso.
+
+        Returns:
+            dict[str, dict[str, int]]: `{hoja: {"hits": n, "misses": m, "cached": 0|1}}`.
+        """
+        with self._lock:
+            cached = {key[1] for key in self._entries}
+            names = sorted(set(self._hits) | set(self._misses) | cached)
+            return {
+                name: {
+                    "hits": self._hits.get(name, 0),
+                    "misses": self._misses.get(name, 0),
+                    "cached": int(name in cached),
+                }
+                for name in names
+            }
+
+
+@lru_cache(maxsize=1)
+def get_sheets_table_cache() -> SheetsTableCache:
+    """Cache de tablas compartido por todos los providers del proceso.
+
+    Returns:
+        SheetsTableCache: Instancia única del proceso.
+    """
+    return SheetsTableCache()
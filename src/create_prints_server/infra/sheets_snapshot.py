@@ -0,0 +1,506 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import pandas as pd
+
+from create_prints_server.infra.google_sheets import a1_notation, batch_get_rows, rows_to_df
+from create_prints_server.infra.logging import get_logger
+
+logger = get_logger(__name__)
+
+_A1_RANGE = re.compile(r"^([A-Za-z]+)(\d*)(?::([A-Za-z]+)(\d*))?$")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sheet_meta (
+        sheet TEXT PRIMARY KEY,
+        source TEXT NOT NULL,
+        header TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        last_row TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        generation INTEGER NOT NULL,
+        synced_at REAL NOT NULL,
+        full_synced_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sheet_rows (
+        sheet TEXT NOT NULL,
+        row_num INTEGER NOT NULL,
+        cells TEXT NOT NULL,
+        PRIMARY KEY (sheet, row_num)
+    )
+    """,
+)
+
+
+@dataclass(frozen=True)
+class SnapshotConfig:
+    """Configuración del snapshot local de Google Sheets.
+
+    Args:
+        path: Archivo SQLite del snapshot (compartido por API y workers).
+        sync_seconds: Intervalo de la sincronización incremental en segundo
+            plano (0 = solo se sincroniza si el snapshot está vacío).
+        full_sync_seconds: Cada cuánto se relee una hoja completa para
+            recoger ediciones de filas ya sincronizadas.
+    """
+
+    path: str
+    sync_seconds: float
+    full_sync_seconds: float
+
+
+def load_snapshot_config() -> SnapshotConfig:
+    """Lee la configuración del snapshot desde variables de entorno.
+
+    Returns:
+        SnapshotConfig: Configuración resuelta.
+    """
+    return SnapshotConfig(
+        path=os.getenv("SHEETS_SNAPSHOT_PATH", "data/sheets_snapshot.sqlite3"),
+        sync_seconds=float(os.getenv("SHEETS_SNAPSHOT_SYNC_SECONDS", "30")),
+        full_sync_seconds=float(os.getenv("SHEETS_SNAPSHOT_FULL_SYNC_SECONDS", "3600")),
+    )
+
+
+def rows_range(a1_range: str, skip: int) -> str | None:
+    """Sub-rango de `a1_range` que empieza `skip` filas más abajo.
+
+    Args:
+        a1_range: Rango A1 configurado (ej. `A1:H`).
+        skip: Filas a saltar desde la primera fila del rango.
+
+    Returns:
+        str | None: Rango A1 resultante, o None si queda fuera de un rango
+        con fila final explícita.
+
+    Raises:
+        ValueError: Si `a1_range` no es un rango de columnas A1 simple.
+    """
+    match = _A1_RANGE.match(a1_range.strip())
+    if match is None:
+        raise ValueError(f"Rango A1 no soportado por el snapshot: {a1_range!r}")
+    start_col, start_row, end_col, end_row = match.groups()
+    first = int(start_row or 1) + skip
+    if end_row and first > int(end_row):
+        return None
+    return f"{start_col}{first}:{end_col or start_col}{end_row or ''}"
+
+
+@dataclass(frozen=True)
+class _SheetMeta:
+    source: str
+    header: list[Any]
+    row_count: int
+    last_row: list[Any]
+    version: int
+    full_synced_at: float
+
+    @property
+    def marker(self) -> list[Any]:
+        """Última fila conocida del rango (el header si no hay datos)."""
+        return self.last_row if self.row_count else self.header
+
+
+@dataclass(frozen=True)
+class _Loaded:
+    version: int
+    generation: int
+    row_count: int
+    frame: pd.DataFrame
+
+
+class SheetsSnapshotStore:
+    """Copia local (SQLite) de hojas de Sheets, sincronizada por filas agregadas.
+
+    Cada hoja guarda su header y sus filas crudas (JSON por fila). Una
+    sincronización incremental pide solo el rango desde la última fila
+    conocida: si esa fila sigue igual, agrega las siguientes; si cambió (o
+    desapareció), la hoja se relee completa. Las ediciones de filas anteriores
+    se recogen en la relectura completa periódica.
+
+    Las lecturas se memorizan por `version` de hoja, así consultas repetidas
+    sin cambios no vuelven a decodificar el snapshot; `generation` cambia solo
+    al releer la hoja completa, y mientras no cambie basta con decodificar las
+    filas agregadas. Los DataFrames se comparten: no deben modificarse.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        spreadsheet_id: str,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Inicializa el store (crea el archivo y el schema si no existen).
+
+        Args:
+            path: Archivo SQLite del snapshot.
+            spreadsheet_id: ID del spreadsheet sincronizado.
+            clock: Reloj de pared (inyectable en tests).
+        """
+        self._path = path
+        self._spreadsheet_id = spreadsheet_id
+        self._clock = clock
+        self._memo: dict[str, _Loaded] = {}
+        self._memo_lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transacciones explícitas (BEGIN/COMMIT): varios procesos comparten el archivo.
+        return sqlite3.connect(self._path, timeout=30, isolation_level=None)
+
+    def _source(self, sheet_name: str, a1_range: str) -> str:
+        return f"{self._spreadsheet_id}!{a1_notation(sheet_name, a1_range)}"
+
+    def _metas(self, conn: sqlite3.Connection) -> dict[str, _SheetMeta]:
+        rows = conn.execute(
+            "SELECT sheet, source, header, row_count, last_row, version, full_synced_at "
+            "FROM sheet_meta"
+        ).fetchall()
+        return {
+            sheet: _SheetMeta(
+                source=source,
+                header=json.loads(header),
+                row_count=row_count,
+                last_row=json.loads(last_row),
+                version=version,
+                full_synced_at=full_synced_at,
+            )
+            for sheet, source, header, row_count, last_row, version, full_synced_at in rows
+        }
+
+    def has_sheets(self, sheets: Sequence[tuple[str, str]]) -> bool:
+        """Indica si todas las hojas ya tienen una sincronización completa.
+
+        Args:
+            sheets: Pares `(hoja, rango A1)`.
+
+        Returns:
+            bool: True si el snapshot puede responder consultas.
+        """
+        with closing(self._connect()) as conn:
+            metas = self._metas(conn)
+        return all(
+            name in metas and metas[name].source == self._source(name, a1_range)
+            for name, a1_range in sheets
+        )
+
+    def load(self, sheet_name: str) -> pd.DataFrame:
+        """Lee una hoja del snapshot.
+
+        Si desde la última lectura solo se agregaron filas, se decodifican
+        únicamente esas y se concatenan a la tabla memorizada.
+
+        Args:
+            sheet_name: Nombre de la hoja.
+
+        Returns:
+            pd.DataFrame: Tabla de la hoja (vacía si no está sincronizada).
+        """
+        conn = self._connect()
+        try:
+            # Header, versión y filas se leen en la misma transacción.
+            conn.execute("BEGIN")
+            meta = conn.execute(
+                "SELECT header, version, generation, row_count FROM sheet_meta WHERE sheet = ?",
+                (sheet_name,),
+            ).fetchone()
+            if meta is None:
+                return pd.DataFrame()
+            header, version, generation, row_count = json.loads(meta[0]), *meta[1:]
+            with self._memo_lock:
+                cached = self._memo.get(sheet_name)
+            if cached is not None and cached.version == version:
+                return cached.frame
+            appended_only = cached is not None and cached.generation == generation
+            first_row = cached.row_count if appended_only else 0
+            cells = conn.execute(
+                "SELECT cells FROM sheet_rows WHERE sheet = ? AND row_num > ? ORDER BY row_num",
+                (sheet_name, first_row),
+            ).fetchall()
+        finally:
+            conn.close()
+
+        data = json.loads("[" + ",".join(row for (row,) in cells) + "]")
+        frame = rows_to_df(header, data) if header else pd.DataFrame()
+        if appended_only:
+            frame = pd.concat([cached.frame, frame], ignore_index=True)
+        with self._memo_lock:
+            self._memo[sheet_name] = _Loaded(version, generation, row_count, frame)
+        return frame
+
+    def sync(
+        self,
+        service,
+        sheets: Sequence[tuple[str, str]],
+        *,
+        full_sync_seconds: float,
+    ) -> dict[str, int]:
+        """Trae de Sheets las filas nuevas de cada hoja.
+
+        Como máximo hace dos `batchGet`: uno con los rangos incrementales y,
+        si alguna hoja lo necesita, otro con las hojas a releer completas.
+
+        Args:
+            service: Cliente de la API de Sheets.
+            sheets: Pares `(hoja, rango A1)` a sincronizar.
+            full_sync_seconds: Antigüedad máxima de la última relectura completa.
+
+        Returns:
+            dict[str, int]: Filas agregadas por hoja (-1 si se releyó completa).
+        """
+        now = self._clock()
+        with closing(self._connect()) as conn:
+            metas = self._metas(conn)
+
+        full: list[tuple[str, str]] = []
+        incremental: list[tuple[str, str, _SheetMeta, str]] = []
+        for name, a1_range in sheets:
+            meta = metas.get(name)
+            if (
+                meta is None
+                or meta.source != self._source(name, a1_range)
+                or now - meta.full_synced_at >= full_sync_seconds
+            ):
+                full.append((name, a1_range))
+                continue
+            # Desde la última fila conocida: sirve de marcador de que nada se movió.
+            tail = rows_range(a1_range, meta.row_count)
+            if tail is not None:
+                incremental.append((name, a1_range, meta, tail))
+
+        changes: dict[str, int] = {}
+        if incremental:
+            fetched = batch_get_rows(
+                service,
+                self._spreadsheet_id,
+                [a1_notation(name, tail) for name, _a1, _meta, tail in incremental],
+            )
+            for (name, a1_range, meta, _tail), rows in zip(incremental, fetched):
+                current = rows[0] if rows else []
+                if current != meta.marker:
+                    full.append((name, a1_range))
+                    continue
+                appended = rows[1:]
+                if appended and self._append(name, meta, appended, now):
+                    changes[name] = len(appended)
+
+        if full:
+            fetched = batch_get_rows(
+                service,
+                self._spreadsheet_id,
+                [a1_notation(name, a1_range) for name, a1_range in full],
+            )
+            for (name, a1_range), rows in zip(full, fetched):
+                self._replace(name, a1_range, rows, now)
+                changes[name] = -1
+
+        if changes:
+            logger.info(f"Snapshot de Sheets sincronizado: {changes}")
+        return changes
+
+    def _append(self, name: str, meta: _SheetMeta, rows: list[list[Any]], now: float) -> bool:
+        """Agrega filas al final de una hoja si nadie la cambió mientras tanto."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute(
+                "SELECT version FROM sheet_meta WHERE sheet = ?", (name,)
+            ).fetchone()
+            if version is None or version[0] != meta.version:
+                # Otro proceso sincronizó primero.
+                conn.execute("ROLLBACK")
+                return False
+            conn.executemany(
+                "INSERT INTO sheet_rows (sheet, row_num, cells) VALUES (?, ?, ?)",
+                [
+                    (name, meta.row_count + offset, json.dumps(row, ensure_ascii=False))
+                    for offset, row in enumerate(rows, start=1)
+                ],
+            )
+            conn.execute(
+                "UPDATE sheet_meta SET row_count = ?, last_row = ?, version = version + 1, "
+                "synced_at = ? WHERE sheet = ?",
+                (meta.row_count + len(rows), json.dumps(rows[-1], ensure_ascii=False), now, name),
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _replace(self, name: str, a1_range: str, rows: list[list[Any]], now: float) -> None:
+        """Reemplaza una hoja completa (header + filas)."""
+        header, data = (rows[0], rows[1:]) if rows else ([], [])
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            previous = conn.execute(
+                "SELECT version, generation FROM sheet_meta WHERE sheet = ?", (name,)
+            ).fetchone()
+            conn.execute("DELETE FROM sheet_rows WHERE sheet = ?", (name,))
+            conn.executemany(
+                "INSERT INTO sheet_rows (sheet, row_num, cells) VALUES (?, ?, ?)",
+                [
+                    (name, row_num, json.dumps(row, ensure_ascii=False))
+                    for row_num, row in enumerate(data, start=1)
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sheet_meta "
+                "(sheet, source, header, row_count, last_row, version, generation, "
+                "synced_at, full_synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    self._source(name, a1_range),
+                    json.dumps(header, ensure_ascii=False),
+                    len(data),
+                    json.dumps(data[-1] if data else [], ensure_ascii=False),
+                    (previous[0] if previous else 0) + 1,
+                    (previous[1] if previous else 0) + 1,
+                    now,
+                    now,
+                ),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+class SnapshotSyncLock:
+    """Lock de archivo no bloqueante para elegir un solo syncer por host.
+
+    API y workers comparten el archivo del snapshot: basta con que un proceso
+    lo sincronice en segundo plano. El sistema operativo libera el lock si
+    ese proceso muere, y otro lo toma en su próximo ciclo.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Inicializa el lock sin tomarlo.
+
+        Args:
+            path: Archivo del lock (ej. `<snapshot>.sync.lock`).
+        """
+        self._path = path
+        self._handle = None
+
+    def acquire(self) -> bool:
+        """Intenta tomar el lock sin esperar (idempotente).
+
+        Returns:
+            bool: True si este proceso tiene el lock.
+        """
+        if self._handle is not None:
+            return True
+        Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self._path, "a+b")
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        """Libera el lock si este proceso lo tiene."""
+        if self._handle is not None:
+            # Cerrar el archivo libera el lock en ambos sistemas.
+            self._handle.close()
+            self._handle = None
+
+
+class SnapshotSyncer:
+    """Thread que sincroniza el snapshot cada `sync_seconds`.
+
+    Con un `SnapshotSyncLock`, solo sincroniza el proceso que tiene el lock;
+    el resto lo reintenta en cada ciclo y mientras tanto no va a la red.
+
+    Un error de red solo se registra: las consultas siguen respondiendo con
+    el último snapshot y el próximo ciclo vuelve a intentar.
+    """
+
+    def __init__(
+        self,
+        sync: Callable[[], object],
+        interval: float,
+        *,
+        lock: SnapshotSyncLock | None = None,
+    ) -> None:
+        """Inicializa el syncer.
+
+        Args:
+            sync: Función que ejecuta una sincronización.
+            interval: Segundos entre sincronizaciones.
+            lock: Lock por host. Si es None, el syncer siempre sincroniza.
+        """
+        self._sync = sync
+        self._interval = interval
+        self._host_lock = lock
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Inicia el thread (idempotente)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sheets-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el thread y espera a que termine."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._host_lock is not None:
+            self._host_lock.release()
+
+    def run_once(self) -> bool:
+        """Ejecuta un ciclo: sincroniza si este proceso es el syncer del host.
+
+        Returns:
+            bool: True si sincronizó.
+        """
+        if self._host_lock is not None and not self._host_lock.acquire():
+            return False
+        try:
+            self._sync()
+        except Exception as exc:
+            logger.warning(f"Falló la sincronización del snapshot de Sheets: {exc}")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.run_once()
@@ -16,6 +16,9 @@ from create_prints_server.domain.guides import (
     split_order_date_components,
 )
 from create_prints_server.domain.money import money_clp
+from create_prints_server.domain.orders import Order, OrderItems, as_order, as_order_items
+
+GUIDES_PER_PAGE = 3
 
 
 def _fit_text(
@@ -56,19 +59,20 @@ def _fit_text(
     return f"{trimmed.rstrip()}{suffix}"
 
 
-def _format_total_kilos(items: pd.DataFrame) -> str:
+def _format_total_kilos(items: OrderItems | pd.DataFrame) -> str:
     """Calcula el total de kilos para el resumen visible del talón.
 
     Args:
-        items (pd.DataFrame): Ítems de la guía.
+        items (OrderItems | pd.DataFrame): Ítems de la guía.
 
     Returns:
         str: Total de kilos formateado o cadena vacía si no aplica.
     """
-    if items.empty or "kg" not in items:
+    items = as_order_items(items)
+    if items.empty or "kg" not in items.columns:
         return ""
 
-    kilos = pd.to_numeric(items["kg"], errors="coerce")
+    kilos = pd.to_numeric(pd.Series(items.column("kg")), errors="coerce")
     if not kilos.notna().any():
         return ""
 
@@ -113,7 +117,7 @@ def _draw_receipt_stub(
     w: float,
     h: float,
     order_header: Dict[str, Any],
-    items: pd.DataFrame,
+    items: OrderItems | pd.DataFrame,
     total: float,
 ) -> None:
     """Dibuja el talón recortable lateral de recepción y pago.
@@ -125,7 +129,7 @@ def _draw_receipt_stub(
         w (float): Ancho reservado para el talón.
         h (float): Alto reservado para el talón.
         order_header (Dict[str, Any]): Cabecera resumida del documento.
-        items (pd.DataFrame): Ítems asociados a la guía.
+        items (OrderItems | pd.DataFrame): Ítems asociados a la guía.
         total (float): Total monetario del documento.
     """
     pad = 6
@@ -251,7 +255,7 @@ def draw_guide_block(
     h: float,
     out: Any,
     order_header: Dict[str, Any],
-    items: pd.DataFrame,
+    items: OrderItems | pd.DataFrame,
     guide_title: str = "GUIA DE DESPACHO",
 ):
     """Dibuja una guía de despacho en (x,y) con ancho w y alto h.
@@ -269,7 +273,7 @@ def draw_guide_block(
         h (float): Alto del bloque.
         out (Any): Config (debe exponer: contact, logo_path, max_items).
         order_header (Dict[str, Any]): Header de la orden.
-        items (pd.DataFrame): Ítems de la orden.
+        items (OrderItems | pd.DataFrame): Ítems de la orden.
     """
     pad = 4
     line = 9.5
@@ -286,6 +290,7 @@ def draw_guide_block(
     )
     direccion = order_header.get("direccion", "") or ""
 
+    items = as_order_items(items)
     total = compute_order_total(order_header, items)
 
     bottom = y - h
@@ -425,10 +430,10 @@ def draw_guide_block(
         c.setStrokeColor(colors.black)
 
         if i < len(items_n):
-            r = items_n.iloc[i]
-            prod = str(r.get("producto", "") or "")
-            kg = r.get("kg", None)
-            pu = r.get("precio_unit", None)
+            r = items_n[i]
+            prod = str(r.producto or "")
+            kg = r.kg
+            pu = r.precio_unit
 
             kg_s = ""
             if kg is not None and not pd.isna(kg):
@@ -471,7 +476,7 @@ def draw_guide_block(
 
 
 def render_guides_pdf(
-    guides: List[Dict[str, Any]],
+    guides: List[Order | Dict[str, Any]],
     out: Any,
     pdf_path: str,
     guide_title: str = "GUIA DE DESPACHO",
@@ -479,7 +484,8 @@ def render_guides_pdf(
     """Renderiza un PDF con guías de despacho (3 por página).
 
     Args:
-        guides (List[Dict[str, Any]]): Estructura tipo `build_orders_structure`.
+        guides (List[Order | Dict[str, Any]]): Resultado de `build_orders_structure`
+            (o dicts `{"header", "items"}`).
         out (Any): Config (ver `draw_guide_block`).
         pdf_path (str): Ruta del PDF de salida.
     """
@@ -494,13 +500,14 @@ def render_guides_pdf(
     # Dejamos una franja de seguridad abajo, similar al aire que ya tiene la
     # lista de despacho, para evitar que la tercera guia se corte al imprimir.
     block_w = page_w - 2 * top_margin
-    block_h = (page_h - top_margin - bottom_margin - 2 * v_gap) / 3
+    block_h = (page_h - top_margin - bottom_margin - 2 * v_gap) / GUIDES_PER_PAGE
 
     x = top_margin
     y_top = page_h - top_margin
     cursor_y = y_top
 
     for idx, od in enumerate(guides):
+        order = as_order(od)
         draw_guide_block(
             c=c,
             x=x,
@@ -508,20 +515,41 @@ def render_guides_pdf(
             w=block_w,
             h=block_h,
             out=out,
-            order_header=od.get("header", {}) or {},
-            items=od.get("items", pd.DataFrame()),
+            order_header=order.header,
+            items=order.items,
             guide_title=guide_title,
         )
 
         cursor_y -= block_h + v_gap
 
-        if (idx + 1) % 3 == 0 and (idx + 1) < len(guides):
+        if (idx + 1) % GUIDES_PER_PAGE == 0 and (idx + 1) < len(guides):
             c.showPage()
             cursor_y = y_top
 
     c.save()
 
 
+def split_guides_in_chunks(
+    guides: List[Order],
+    pages_per_chunk: int,
+) -> List[List[Order]]:
+    """Divide las guías en tramos alineados a página para renderizar en paralelo.
+
+    Cada tramo tiene un múltiplo de `GUIDES_PER_PAGE` guías (salvo el último),
+    así cada uno empieza en página nueva y al unir los PDFs en orden queda el
+    mismo documento que con `render_guides_pdf` sobre la lista completa.
+
+    Args:
+        guides (List[Order]): Guías en el orden de impresión.
+        pages_per_chunk (int): Páginas por tramo (mínimo 1).
+
+    Returns:
+        List[List[Order]]: Tramos en orden.
+    """
+    size = max(1, int(pages_per_chunk)) * GUIDES_PER_PAGE
+    return [guides[i : i + size] for i in range(0, len(guides), size)]
+
+
 def render_pdf_guides(
     guides: List[Dict[str, Any]],
     out: Any,
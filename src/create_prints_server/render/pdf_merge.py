@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from pypdf import PdfWriter
+
+
+def merge_pdfs(part_paths: Iterable[str], pdf_path: str) -> None:
+    """Une varios PDFs en uno, página a página y en el orden recibido.
+
+    Args:
+        part_paths (Iterable[str]): PDFs a unir.
+        pdf_path (str): Ruta del PDF de salida.
+    """
+    writer = PdfWriter()
+    try:
+        for part in part_paths:
+            writer.append(part)
+        with open(pdf_path, "wb") as fh:
+            writer.write(fh)
+    finally:
+        writer.close()
@@ -8,6 +8,7 @@ from reportlab.pdfgen import canvas
 
 from create_prints_server.config.settings import OutputConfig
 from create_prints_server.domain.money import money_clp
+from create_prints_server.domain.orders import Order, OrderItems, as_order, as_order_items
 
 
 def draw_order_block(
@@ -18,7 +19,7 @@ def draw_order_block(
     h: float,
     out: OutputConfig,
     order_header: dict,
-    items: pd.DataFrame,
+    items: OrderItems | pd.DataFrame,
 ):
     """
     Dibuja un bloque estilo "pedido" en (x,y) con ancho w y alto h.
@@ -91,17 +92,17 @@ def draw_order_block(
     max_items = out.max_items
 
     # asegura máximo 5 filas
-    items = items.head(max_items).copy()
+    rows = as_order_items(items).rows(limit=max_items)
 
     # dibuja filas
     for i in range(max_items):
-        if i < len(items):
-            r = items.iloc[i]
-            prod = str(r.get("producto", "") or "")
-            cal = str(r.get("calibre", "") or "")
-            kg = r.get("kg", "")
-            pu = r.get("precio_unit", "")
-            pt = r.get("precio_total", "")
+        if i < len(rows):
+            r = rows[i]
+            prod = str(r.producto or "")
+            cal = str(r.calibre or "")
+            kg = r.kg
+            pu = r.precio_unit
+            pt = r.precio_total
             kg_s = "" if pd.isna(kg) else f"{float(kg):.0f}".rstrip(".")
             c.drawString(col_prod, row_y, prod[:24])
             c.drawString(col_cal, row_y, cal[:12])
@@ -134,7 +135,7 @@ def draw_order_block(
     )
 
 
-def render_orders_pdf(orders: List[dict], out: OutputConfig, pdf_path: str):
+def render_orders_pdf(orders: List[Order | dict], out: OutputConfig, pdf_path: str):
     page_w, page_h = A4
     c = canvas.Canvas(pdf_path, pagesize=A4)
 
@@ -154,6 +155,7 @@ def render_orders_pdf(orders: List[dict], out: OutputConfig, pdf_path: str):
     blocks_in_row = 0
 
     for od in orders:
+        order = as_order(od)
         x = x_left if col == 0 else x_right
         y = cursor_y
 
@@ -164,8 +166,8 @@ def render_orders_pdf(orders: List[dict], out: OutputConfig, pdf_path: str):
             w=col_w,
             h=block_h,
             out=out,
-            order_header=od["header"],
-            items=od["items"],
+            order_header=order.header,
+            items=order.items,
         )
 
         # alternar columna
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import argparse
+import multiprocessing
 import os
+import signal
 import time
-from datetime import date, datetime
+from datetime import date
+from multiprocessing.synchronize import Event
 from typing import Any
 from create_prints_server.infra.logging import get_logger
 
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from create_prints_server.app.generator import NoOrdersForDateError, generate_pdfs
 from printing_queue.db import SessionLocal, engine
-from printing_queue.infra.job_status_events import try_record_print_job_status_event
+from printing_queue.infra.claims import claim_batch, seconds_until_available
+from printing_queue.infra.job_status_events import LeaseLostError, transition_job
+from printing_queue.infra.leases import LeaseKeeper, reap_expired_leases, worker_identity
+from printing_queue.infra.notifications import JobNotificationListener
 from printing_queue.infra.observability import capture_exception, init_sentry
+from printing_queue.infra.retries import retry_or_fail
 from printing_queue.models import Base, PrintJob, PrintJobStatus, PrintJobType
 from printing_queue.settings import settings
 
@@ -20,44 +27,37 @@ from printing_queue.settings import settings
 DocKind = str
 logger = get_logger(__name__)
 
+DOC_KINDS: frozenset[str] = frozenset({"shipping_list", "guides", "both", "egreso"})
+# Cada cuánto revisa `stop_event` un hijo del pool mientras espera jobs.
+STOP_CHECK_SECONDS = 1.0
 
-def _claim_next_job(db: Session) -> PrintJob | None:
-    """Reclama el siguiente job PENDING de generación usando bloqueo.
+
+class PermanentGenerateError(RuntimeError):
+    """Falla que un reintento no arregla (payload del job incompleto o inválido)."""
+
+
+def _claim_jobs(db: Session, worker_id: str) -> list[PrintJob]:
+    """Reclama hasta `GENERATE_CLAIM_BATCH_SIZE` jobs PENDING de generación usando bloqueo.
     
     Args:
         db: Sesión de DB.
+        worker_id: Identidad del worker que toma el lease.
         
     Returns:
-        El job reclamado, o None si no hay jobs PENDING.
+        Los jobs reclamados por prioridad y FIFO (vacío si no hay jobs PENDING).
     """
-    stmt = (
-        select(PrintJob)
-        .where(PrintJob.status == PrintJobStatus.PENDING)
-        .where(PrintJob.job_type == PrintJobType.SHIPPING_DOCS)
-        .order_by(PrintJob.created_at.asc())
-        .with_for_update(skip_locked=True)
-        .limit(1)
-    )
-    job = db.execute(stmt).scalars().first()
-    if not job:
-        return None
-
-    logger.info(f"Job reclamado para generación id={job.id}")
-    prev_status = job.status
-    changed_at = datetime.now()
-    job.status = PrintJobStatus.GENERATING
-    job.updated_at = changed_at
-    db.commit()
-    db.refresh(job)
-    try_record_print_job_status_event(
+    jobs = claim_batch(
         db,
-        job_id=job.id,
-        from_status=prev_status,
-        to_status=job.status,
-        occurred_at=changed_at,
+        settings.GENERATE_CLAIM_BATCH_SIZE,
+        from_status=PrintJobStatus.PENDING,
+        to_status=PrintJobStatus.GENERATING,
         source="generate_worker",
+        locked_by=worker_id,
+        job_type=PrintJobType.SHIPPING_DOCS,
     )
-    return job
+    if jobs:
+        logger.info(f"Jobs reclamados para generación ids={[job.id for job in jobs]}")
+    return jobs
 
 
 def _payload_get(payload: dict[str, Any], key: str) -> Any:
@@ -71,14 +71,60 @@ def _payload_get(payload: dict[str, Any], key: str) -> Any:
         El valor asociado a la clave.
         
     Raises:
-        KeyError: Si la clave no existe en el payload.
+        PermanentGenerateError: Si la clave no existe en el payload.
     """
     value = payload.get(key)
     if value is None:
-        raise KeyError(f"payload.{key} es requerido")
+        raise PermanentGenerateError(f"payload.{key} es requerido")
     return value
 
 
+def _parse_payload(payload: dict[str, Any]) -> tuple[DocKind, date, str | None]:
+    """Valida el payload de un job de generación.
+
+    Args:
+        payload: El dict payload del job.
+
+    Returns:
+        Tupla `(what, day, venta_id)` lista para `generate_pdfs`.
+
+    Raises:
+        PermanentGenerateError: Si falta una clave, la fecha no es ISO, `what`
+            no es conocido o un egreso no trae `venta_id`.
+    """
+    what: DocKind = str(_payload_get(payload, "what"))
+    if what not in DOC_KINDS:
+        raise PermanentGenerateError(f"payload.what desconocido: {what!r}")
+    raw_day = str(_payload_get(payload, "date"))
+    try:
+        day = date.fromisoformat(raw_day)
+    except ValueError as e:
+        raise PermanentGenerateError(f"payload.date inválido: {raw_day!r}") from e
+    venta_id = payload.get("venta_id")
+    if what == "egreso" and not venta_id:
+        raise PermanentGenerateError("payload.venta_id es requerido cuando what == 'egreso'")
+    return what, day, venta_id
+
+
+def _mark_failed(db: Session, job: PrintJob, err: Exception) -> None:
+    """Deja el job en ERROR sin reintentar (la falla no se arregla sola).
+
+    Args:
+        db: Sesión de DB.
+        job: Job a actualizar.
+        err: Error permanente.
+    """
+    transition_job(
+        db,
+        job,
+        PrintJobStatus.ERROR,
+        source="generate_worker",
+        error_msg=str(err),
+    )
+    capture_exception(err)
+    logger.error(f"Job fallido id={job.id}; error permanente, sin reintentos: {err}")
+
+
 def _process_job(db: Session, job: PrintJob) -> None:
     """Procesa un job de generación: genera los PDFs y actualiza el job a READY o ERROR.
     
@@ -88,13 +134,14 @@ def _process_job(db: Session, job: PrintJob) -> None:
         
     Side effects:
         Actualiza el job en la base de datos con el resultado de la generación.
+
+    Raises:
+        LeaseLostError: Si el lease venció antes de registrar el resultado.
     """
     payload = job.payload or {}
-    what: DocKind = str(_payload_get(payload, "what"))
-    day = date.fromisoformat(str(_payload_get(payload, "date")))
 
     try:
-        venta_id = payload.get("venta_id")
+        what, day, venta_id = _parse_payload(payload)
         logger.info(f"Generando PDFs job_id={job.id} what={what} day={day} venta_id={venta_id}")
         artifacts = generate_pdfs(what=what, day=day, venta_id=venta_id)
         files: list[str] = []
@@ -103,86 +150,270 @@ def _process_job(db: Session, job: PrintJob) -> None:
         if artifacts.guides_path:
             files.append(artifacts.guides_path)
 
-        job.payload = {
-            **payload,
-            "orders_count": artifacts.orders_count,
-            "files": files,
-        }
-        prev_status = job.status
-        changed_at = datetime.now()
-        job.status = PrintJobStatus.READY
-        job.updated_at = changed_at
-        job.error_msg = None
-        db.commit()
-        try_record_print_job_status_event(
+        transition_job(
             db,
-            job_id=job.id,
-            from_status=prev_status,
-            to_status=job.status,
-            occurred_at=changed_at,
+            job,
+            PrintJobStatus.READY,
             source="generate_worker",
+            payload={
+                **payload,
+                "orders_count": artifacts.orders_count,
+                "files": files,
+            },
+            error_msg=None,
+            # La etapa de impresión cuenta sus propios intentos.
+            attempts=0,
         )
         logger.info(f"Job listo id={job.id} orders={artifacts.orders_count} files={files}")
 
     except NoOrdersForDateError as e:
-        job.payload = {**payload, "orders_count": 0, "files": [], "note": str(e)}
-        prev_status = job.status
-        changed_at = datetime.now()
-        job.status = PrintJobStatus.DONE
-        job.updated_at = changed_at
-        job.error_msg = None
-        db.commit()
-        try_record_print_job_status_event(
+        transition_job(
             db,
-            job_id=job.id,
-            from_status=prev_status,
-            to_status=job.status,
-            occurred_at=changed_at,
+            job,
+            PrintJobStatus.DONE,
             source="generate_worker",
+            payload={**payload, "orders_count": 0, "files": [], "note": str(e)},
+            error_msg=None,
         )
         logger.info(f"Job sin ventas id={job.id}: {e}")
 
+    except LeaseLostError:
+        raise
+
+    except PermanentGenerateError as e:
+        _mark_failed(db, job, e)
+
     except Exception as e:
-        prev_status = job.status
-        changed_at = datetime.now()
-        job.status = PrintJobStatus.ERROR
-        job.error_msg = str(e)
-        job.updated_at = changed_at
-        db.commit()
-        try_record_print_job_status_event(
+        retried = retry_or_fail(db, job, str(e), source="generate_worker")
+        capture_exception(e)
+        if retried:
+            logger.exception(
+                f"Error generando job_id={job.id}; reintento {job.attempts}/{job.max_attempts} "
+                f"desde {job.available_at:%H:%M:%S}"
+            )
+        else:
+            logger.exception(f"Error generando job_id={job.id}; sin más reintentos")
+
+
+def _reap_expired_leases() -> None:
+    """Devuelve a la cola los jobs GENERATING cuyo worker dejó vencer el lease."""
+    db = SessionLocal()
+    try:
+        reaped = reap_expired_leases(
             db,
-            job_id=job.id,
-            from_status=prev_status,
-            to_status=job.status,
-            occurred_at=changed_at,
+            statuses=[PrintJobStatus.GENERATING],
             source="generate_worker",
         )
+        for job in reaped:
+            logger.warning(
+                f"Lease vencido recuperado id={job.id} -> {job.status.value} attempts={job.attempts}"
+            )
+    except Exception as e:
+        db.rollback()
         capture_exception(e)
-        logger.exception(f"Error generando job_id={job.id}")
+        logger.exception("Error recuperando leases vencidos")
+    finally:
+        db.close()
 
 
-def run_worker() -> None:
-    """Loop principal: toma jobs PENDING (generación) y los deja READY."""
-    init_sentry("generate_worker")
-    Base.metadata.create_all(bind=engine)
+def _wait_for_jobs(
+    listener: JobNotificationListener,
+    timeout: float | None,
+    stop_event: Event | None,
+) -> None:
+    """Espera un NOTIFY (o el próximo reintento) sin dejar de atender `stop_event`.
+
+    `listener.wait` puede bloquear hasta `NOTIFY_FALLBACK_SECONDS`: con un
+    `stop_event` se espera en tramos de `STOP_CHECK_SECONDS` para que el
+    supervisor no tenga que matar a un hijo ocioso al apagar.
+
+    Args:
+        listener: Listener de jobs PENDING.
+        timeout: Espera máxima (ej. hasta el próximo reintento diferido).
+        stop_event: Evento de apagado del pool (None = proceso único).
+    """
+    if stop_event is None:
+        listener.wait(timeout=timeout)
+        return
+    limit = settings.NOTIFY_FALLBACK_SECONDS if listener.enabled else settings.POLL_SECONDS
+    deadline = time.monotonic() + (limit if timeout is None else min(limit, timeout))
+    while not stop_event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or listener.wait(timeout=min(remaining, STOP_CHECK_SECONDS)):
+            return
+
+
+def _run_loop(stop_event: Event | None = None) -> None:
+    """Loop de claims: toma jobs PENDING (generación) y los deja READY.
+
+    Args:
+        stop_event: Si se indica, el loop termina (entre jobs) cuando se activa.
+    """
     logger.info(f"Worker iniciado, buscando jobs para generar...")
     heartbeat_seconds = int(os.getenv("WORKER_HEARTBEAT_SECONDS", "60"))
     last_heartbeat = time.monotonic()
-    while True:
-        db = SessionLocal()
-        try:
-            job = _claim_next_job(db)
-            if not job:
-                now = time.monotonic()
-                if heartbeat_seconds > 0 and (now - last_heartbeat) >= heartbeat_seconds:
-                    logger.info(f"Sin jobs PENDING; sleep {settings.POLL_SECONDS}s")
-                    last_heartbeat = now
-                time.sleep(settings.POLL_SECONDS)
+    last_reap = 0.0
+    worker_id = worker_identity("generate_worker")
+    listener = JobNotificationListener(PrintJobStatus.PENDING)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            if time.monotonic() - last_reap >= settings.REAPER_INTERVAL_SECONDS:
+                _reap_expired_leases()
+                last_reap = time.monotonic()
+
+            # Cada job del lote se commitea por separado; sin expire_on_commit esos
+            # commits no obligan a recargar los jobs que siguen en el lote.
+            db = SessionLocal(expire_on_commit=False)
+            next_retry: float | None = None
+            try:
+                jobs = _claim_jobs(db, worker_id)
+                if not jobs:
+                    next_retry = seconds_until_available(
+                        db,
+                        status=PrintJobStatus.PENDING,
+                        job_type=PrintJobType.SHIPPING_DOCS,
+                    )
+                with LeaseKeeper([job.id for job in jobs], locked_by=worker_id):
+                    for job in jobs:
+                        try:
+                            _process_job(db, job)
+                        except LeaseLostError as e:
+                            # El reaper ya lo devolvió a la cola: otro intento manda.
+                            logger.warning(f"Lease perdido; se descarta el resultado: {e}")
+                        except Exception as e:
+                            db.rollback()
+                            capture_exception(e)
+                            logger.exception(f"Error inesperado procesando job_id={job.id}; sigue el lote")
+            finally:
+                db.close()
+
+            if jobs:
                 continue
-            _process_job(db, job)
-        finally:
-            db.close()
+
+            # La sesión ya está cerrada: no retenemos conexión/transacción mientras
+            # se espera el NOTIFY.
+            now = time.monotonic()
+            if heartbeat_seconds > 0 and (now - last_heartbeat) >= heartbeat_seconds:
+                logger.info(f"Sin jobs PENDING; esperando NOTIFY (listen={listener.enabled})")
+                last_heartbeat = now
+            _wait_for_jobs(listener, next_retry, stop_event)
+    finally:
+        listener.close()
+    logger.info("Worker detenido")
+
+
+def run_worker() -> None:
+    """Worker de un solo proceso: toma jobs PENDING (generación) y los deja READY."""
+    init_sentry("generate_worker")
+    Base.metadata.create_all(bind=engine)
+    _run_loop()
+
+
+def _pool_child(stop_event: Event) -> None:
+    """Entrada de un proceso hijo del pool.
+
+    Ctrl+C llega a todos los procesos de la consola: el hijo lo ignora y
+    termina cuando el supervisor activa `stop_event`.
+
+    Args:
+        stop_event: Evento compartido de apagado.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_sentry("generate_worker")
+    _run_loop(stop_event)
+
+
+def run_pool(processes: int) -> None:
+    """Supervisor: mantiene `processes` workers de generación en paralelo.
+
+    Los hijos compiten por jobs con el mismo claim `FOR UPDATE SKIP LOCKED`,
+    así que no se pisan. Si un hijo muere, se relanza (con espera creciente si
+    vuelve a caer enseguida). Con Ctrl+C/SIGTERM se pide a los hijos que
+    terminen el job en curso; los que no salen en
+    `GENERATE_SHUTDOWN_TIMEOUT_SECONDS` se terminan y sus jobs los recupera el
+    reaper de leases.
+
+    Args:
+        processes: Cantidad de procesos hijos.
+    """
+    Base.metadata.create_all(bind=engine)
+    # Los hijos reparten los CPUs de render según este valor (ver `_render_workers`).
+    os.environ["GENERATE_WORKERS"] = str(processes)
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    shutdown_timeout = float(os.getenv("GENERATE_SHUTDOWN_TIMEOUT_SECONDS", "60"))
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        logger.info(f"Señal {signum} recibida; deteniendo pool de generación")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+
+    children: list[Any] = [None] * processes
+    started_at = [0.0] * processes
+    restart_at = [0.0] * processes
+    crashes = [0] * processes
+
+    logger.info(f"Pool de generación iniciado con {processes} procesos")
+    while not stop_event.is_set():
+        now = time.monotonic()
+        for slot in range(processes):
+            child = children[slot]
+            if child is not None and child.is_alive():
+                continue
+            if child is not None:
+                # Un hijo que duró poco cuenta como caída seguida: espera creciente.
+                crashes[slot] = crashes[slot] + 1 if now - started_at[slot] < 60 else 1
+                restart_at[slot] = now + min(60.0, 2.0 ** (crashes[slot] - 1))
+                logger.warning(
+                    f"Proceso de generación {child.name} terminó exitcode={child.exitcode}; "
+                    f"se relanza en {restart_at[slot] - now:.0f}s"
+                )
+                children[slot] = None
+            if now < restart_at[slot]:
+                continue
+            child = ctx.Process(
+                target=_pool_child,
+                args=(stop_event,),
+                name=f"generate_worker-{slot + 1}",
+            )
+            child.start()
+            children[slot] = child
+            started_at[slot] = now
+        stop_event.wait(1.0)
+
+    deadline = time.monotonic() + shutdown_timeout
+    for child in children:
+        if child is not None:
+            child.join(max(0.0, deadline - time.monotonic()))
+    for child in children:
+        if child is not None and child.is_alive():
+            logger.warning(f"Proceso {child.name} no terminó a tiempo; se fuerza")
+            child.terminate()
+            child.join()
+    logger.info("Pool de generación detenido")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Punto de entrada: un proceso o pool según `--processes`/`GENERATE_WORKERS`.
+
+    Args:
+        argv: Argumentos (sin el nombre del programa). Por defecto, `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(prog="python -m create_prints_server.worker.generate_worker")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=int(os.getenv("GENERATE_WORKERS", "1")),
+        help="Procesos de generación en paralelo (por defecto GENERATE_WORKERS o 1).",
+    )
+    args = parser.parse_args(argv)
+    if args.processes > 1:
+        run_pool(args.processes)
+    else:
+        run_worker()
 
 
 if __name__ == "__main__":
-    run_worker()
+    main()
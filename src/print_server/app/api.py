@@ -5,14 +5,23 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Any
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from fastapi.responses import HTMLResponse
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from sqlalchemy.orm import Session
 
 from printing_queue.db import get_db
-from printing_queue.infra.job_status_events import try_record_print_job_status_event
-from printing_queue.models import PrintJob, PrintJobStatus, PrintJobType
+from printing_queue.infra.idempotency import idempotency_key
+from printing_queue.infra.job_status_events import enqueue_job
+from printing_queue.models import (
+    JOB_PRIORITY_DEFAULT,
+    JOB_PRIORITY_LOWEST,
+    JOB_PRIORITY_URGENT,
+    PrintJob,
+    PrintJobArchive,
+    PrintJobStatus,
+    PrintJobType,
+)
 from print_server.config.settings import settings
 
 router = APIRouter(tags=["print_server"])
@@ -46,29 +55,29 @@ def enqueue_guides(db: Session = Depends(get_db)) -> dict[str, Any]:
     Nota:
         La generación se realiza en un worker. Este endpoint solo encola el job.
     """
+    payload = {"what": "guides", "date": date.today().isoformat()}
     job = PrintJob(
         job_type=PrintJobType.SHIPPING_DOCS,
         status=PrintJobStatus.PENDING,
-        payload={"what": "guides", "date": date.today().isoformat()},
+        payload=payload,
         file_path=None,
+        # Misma clave que `/api/jobs/generate` con what=guides: un doble click
+        # retorna el job en curso.
+        idempotency_key=idempotency_key(PrintJobType.SHIPPING_DOCS, payload),
     )
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-    try_record_print_job_status_event(
-        db,
-        job_id=job.id,
-        from_status=None,
-        to_status=job.status,
-        occurred_at=job.created_at,
-        source="api",
-    )
-    return {"id": job.id, "status": job.status.value, "job_type": job.job_type.value}
+    queued = enqueue_job(db, job, source="api")
+    return {
+        "id": queued.id,
+        "status": queued.status.value,
+        "job_type": queued.job_type.value,
+        "duplicate": queued is not job,
+    }
 
 
 @router.post("/api/print-upload")
 async def enqueue_upload(
     file: UploadFile = File(...),
+    priority: int = Form(JOB_PRIORITY_DEFAULT, ge=JOB_PRIORITY_URGENT, le=JOB_PRIORITY_LOWEST),
     db: Session = Depends(get_db),
 ) -> dict[str, Any]:
     filename = (file.filename or "").lower()
@@ -91,24 +100,16 @@ async def enqueue_upload(
             "files": [str(out_path)],
         },
         file_path=str(out_path),
+        priority=priority,
     )
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-    try_record_print_job_status_event(
-        db,
-        job_id=job.id,
-        from_status=None,
-        to_status=job.status,
-        occurred_at=job.created_at,
-        source="api",
-    )
+    enqueue_job(db, job, source="api")
     return {"id": job.id, "status": job.status.value, "job_type": job.job_type.value}
 
 
 @router.get("/api/jobs/{job_id}")
 def get_job(job_id: int, db: Session = Depends(get_db)) -> dict[str, Any]:
-    job = db.get(PrintJob, job_id)
+    # Los jobs terminados antiguos viven en el archivo (ver printing_queue.maintenance).
+    job = db.get(PrintJob, job_id) or db.get(PrintJobArchive, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job no encontrado.")
 
@@ -116,6 +117,7 @@ def get_job(job_id: int, db: Session = Depends(get_db)) -> dict[str, Any]:
         "id": job.id,
         "job_type": job.job_type.value,
         "status": job.status.value,
+        "priority": job.priority,
         "file_path": job.file_path,
         "payload": job.payload,
         "created_at": job.created_at.isoformat(),
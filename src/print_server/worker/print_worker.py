@@ -7,12 +7,15 @@ from pathlib import Path
 from typing import Any
 from print_server.infra.logging import get_logger
 
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from printing_queue.db import SessionLocal, engine
-from printing_queue.infra.job_status_events import try_record_print_job_status_event
+from printing_queue.infra.claims import claim_batch, seconds_until_available
+from printing_queue.infra.job_status_events import LeaseLostError, transition_job
+from printing_queue.infra.leases import LeaseKeeper, reap_expired_leases, worker_identity
+from printing_queue.infra.notifications import JobNotificationListener
 from printing_queue.infra.observability import capture_exception, init_sentry
+from printing_queue.infra.retries import retry_or_fail
 from printing_queue.models import Base, PrintJob, PrintJobStatus
 from print_server.infra.printer import print_pdf_windows_sumatra
 from print_server.config.settings import settings
@@ -21,6 +24,10 @@ from print_server.config.settings import settings
 logger = get_logger(__name__)
 
 
+class PermanentPrintError(RuntimeError):
+    """Falla que un reintento no arregla (job sin archivos o PDF inexistente)."""
+
+
 def _files_from_payload(payload: dict[str, Any]) -> list[str]:
     """Extrae y valida la lista de PDFs a imprimir desde payload.
 
@@ -39,42 +46,27 @@ def _files_from_payload(payload: dict[str, Any]) -> list[str]:
     return [str(p).strip() for p in files if str(p).strip()]
 
 
-def _claim_next_job(db: Session) -> PrintJob | None:
-    """Reclama el siguiente job READY usando bloqueo para evitar colisiones.
+def _claim_jobs(db: Session, worker_id: str) -> list[PrintJob]:
+    """Reclama hasta `CLAIM_BATCH_SIZE` jobs READY usando bloqueo para evitar colisiones.
 
     Args:
         db (Session): Sesión de BD.
+        worker_id (str): Identidad del worker que toma el lease.
 
     Returns:
-        PrintJob | None: Job reclamado o None si no hay.
+        list[PrintJob]: Jobs reclamados por prioridad y FIFO (vacío si no hay).
     """
-    stmt = (
-        select(PrintJob)
-        .where(PrintJob.status == PrintJobStatus.READY)
-        .order_by(PrintJob.created_at.asc())
-        .with_for_update(skip_locked=True)
-        .limit(1)
-    )
-    job = db.execute(stmt).scalars().first()
-    if not job:
-        return None
-
-    logger.info(f"Job READY reclamado id={job.id}")
-    prev_status = job.status
-    changed_at = datetime.now()
-    job.status = PrintJobStatus.PRINTING
-    job.updated_at = changed_at
-    db.commit()
-    db.refresh(job)
-    try_record_print_job_status_event(
+    jobs = claim_batch(
         db,
-        job_id=job.id,
-        from_status=prev_status,
-        to_status=job.status,
-        occurred_at=changed_at,
+        settings.CLAIM_BATCH_SIZE,
+        from_status=PrintJobStatus.READY,
+        to_status=PrintJobStatus.PRINTING,
         source="print_worker",
+        locked_by=worker_id,
     )
-    return job
+    if jobs:
+        logger.info(f"Jobs READY reclamados ids={[job.id for job in jobs]}")
+    return jobs
 
 
 def _mark_done(db: Session, job: PrintJob, payload_extra: dict[str, Any]) -> None:
@@ -85,72 +77,156 @@ def _mark_done(db: Session, job: PrintJob, payload_extra: dict[str, Any]) -> Non
         job (PrintJob): Job a actualizar.
         payload_extra (dict[str, Any]): Datos a mezclar en payload.
     """
-    prev_status = job.status
     changed_at = datetime.now()
-    job.status = PrintJobStatus.DONE
-    job.updated_at = changed_at
-    job.printed_at = changed_at
-    job.error_msg = None
-    job.payload = {**(job.payload or {}), **payload_extra}
-    db.commit()
-    try_record_print_job_status_event(
+    transition_job(
         db,
-        job_id=job.id,
-        from_status=prev_status,
-        to_status=job.status,
-        occurred_at=changed_at,
+        job,
+        PrintJobStatus.DONE,
         source="print_worker",
+        changed_at=changed_at,
+        printed_at=changed_at,
+        error_msg=None,
+        payload={**(job.payload or {}), **payload_extra},
     )
     logger.info(f"Job impreso OK id={job.id} archivos={payload_extra.get('printed_files')}")
 
 
-def _mark_error(db: Session, job: PrintJob, err: Exception) -> None:
-    """Marca el job como fallido.
+def _mark_error(db: Session, job: PrintJob, err: Exception, printed: list[str]) -> None:
+    """Reprograma el job con backoff o lo marca como fallido si agotó intentos.
+
+    Los archivos ya impresos quedan en `payload.printed_files` para que el
+    reintento no los vuelva a imprimir.
 
     Args:
         db (Session): Sesión de BD.
         job (PrintJob): Job a actualizar.
         err (Exception): Error ocurrido.
+        printed (list[str]): Archivos impresos hasta la falla (incluye intentos previos).
     """
-    prev_status = job.status
-    changed_at = datetime.now()
-    job.status = PrintJobStatus.ERROR
-    job.updated_at = changed_at
-    job.error_msg = str(err)
-    db.commit()
-    try_record_print_job_status_event(
+    retried = retry_or_fail(
         db,
-        job_id=job.id,
-        from_status=prev_status,
-        to_status=job.status,
-        occurred_at=changed_at,
+        job,
+        str(err),
         source="print_worker",
+        payload={**(job.payload or {}), "printed_files": printed},
     )
     capture_exception(err)
-    logger.exception(f"Job fallido id={job.id}")
+    if retried:
+        logger.exception(
+            f"Job fallido id={job.id}; reintento {job.attempts}/{job.max_attempts} "
+            f"desde {job.available_at:%H:%M:%S} (ya impresos: {len(printed)})"
+        )
+    else:
+        logger.exception(f"Job fallido id={job.id}; sin más reintentos")
 
 
-def _print_files(files: list[str]) -> list[str]:
-    """Imprime una lista de PDFs y retorna los que se imprimieron.
+def _mark_failed(db: Session, job: PrintJob, err: Exception, printed: list[str]) -> None:
+    """Deja el job en ERROR sin reintentar (la falla no se arregla sola).
 
     Args:
-        files (list[str]): Rutas a PDFs.
+        db (Session): Sesión de BD.
+        job (PrintJob): Job a actualizar.
+        err (Exception): Error permanente.
+        printed (list[str]): Archivos impresos hasta la falla.
+    """
+    transition_job(
+        db,
+        job,
+        PrintJobStatus.ERROR,
+        source="print_worker",
+        error_msg=str(err),
+        payload={**(job.payload or {}), "printed_files": printed},
+    )
+    capture_exception(err)
+    logger.error(f"Job fallido id={job.id}; error permanente, sin reintentos: {err}")
 
-    Returns:
-        list[str]: Rutas impresas.
+
+def _print_files(files: list[str], printed: list[str]) -> None:
+    """Imprime los PDFs que faltan, anotando en `printed` cada uno impreso.
+
+    Los que ya están en `printed` (de un intento anterior) se saltan. Antes de
+    imprimir se valida que existan todos los pendientes, para no dejar un job
+    a medio imprimir por un archivo que falta.
+
+    Args:
+        files (list[str]): Rutas a PDFs, en orden de impresión.
+        printed (list[str]): Rutas ya impresas; se agregan las nuevas.
 
     Raises:
-        RuntimeError: Si algún archivo no existe o falla la impresión.
+        PermanentPrintError: Si algún PDF pendiente no existe.
+        RuntimeError: Si falla la impresión.
     """
-    printed: list[str] = []
-    for p in files:
-        pdf = Path(p)
-        if not pdf.exists():
-            raise RuntimeError(f"PDF no existe: {pdf}")
+    pending = [Path(p) for p in files if str(Path(p)) not in printed]
+    missing = [str(pdf) for pdf in pending if not pdf.exists()]
+    if missing:
+        raise PermanentPrintError(f"PDF no existe: {', '.join(missing)}")
+    for pdf in pending:
         logger.info(f"Imprimiendo PDF {pdf}")
         print_pdf_windows_sumatra(str(pdf))
         printed.append(str(pdf))
-    return printed
+
+
+def _print_job(db: Session, job: PrintJob) -> None:
+    """Imprime los PDFs de un job reclamado y lo deja DONE, READY (reintento) o ERROR.
+
+    Args:
+        db (Session): Sesión de BD.
+        job (PrintJob): Job en estado PRINTING.
+
+    Raises:
+        LeaseLostError: Si el lease venció antes de registrar el resultado.
+    """
+    payload = job.payload or {}
+    printed = [str(p) for p in payload.get("printed_files") or []]
+    try:
+        files = _files_from_payload(payload)
+
+        if not files:
+            raise PermanentPrintError("Job READY sin payload.files para imprimir.")
+
+        if printed:
+            logger.info(f"Job id={job.id} reintento: {len(printed)} archivos ya impresos")
+        logger.info(f"Job id={job.id} iniciando impresión de {len(files)} archivos")
+        _print_files(files, printed)
+
+        _mark_done(
+            db,
+            job,
+            {
+                "printed_files": printed,
+                "printed_at": datetime.now().isoformat(),
+            },
+        )
+
+    except LeaseLostError:
+        raise
+
+    except PermanentPrintError as e:
+        _mark_failed(db, job, e, printed)
+
+    except Exception as e:
+        _mark_error(db, job, e, printed)
+
+
+def _reap_expired_leases() -> None:
+    """Devuelve a la cola los jobs PRINTING cuyo worker dejó vencer el lease."""
+    db = SessionLocal()
+    try:
+        reaped = reap_expired_leases(
+            db,
+            statuses=[PrintJobStatus.PRINTING],
+            source="print_worker",
+        )
+        for job in reaped:
+            logger.warning(
+                f"Lease vencido recuperado id={job.id} -> {job.status.value} attempts={job.attempts}"
+            )
+    except Exception as e:
+        db.rollback()
+        capture_exception(e)
+        logger.exception("Error recuperando leases vencidos")
+    finally:
+        db.close()
 
 
 def run_worker() -> None:
@@ -160,43 +236,47 @@ def run_worker() -> None:
     logger.info(f"Worker iniciado, buscando jobs para imprimir...")
     heartbeat_seconds = int(os.getenv("WORKER_HEARTBEAT_SECONDS", "60"))
     last_heartbeat = time.monotonic()
+    last_reap = 0.0
+    worker_id = worker_identity("print_worker")
+    listener = JobNotificationListener(PrintJobStatus.READY)
     while True:
-        db = SessionLocal()
+        if time.monotonic() - last_reap >= settings.REAPER_INTERVAL_SECONDS:
+            _reap_expired_leases()
+            last_reap = time.monotonic()
+
+        # Cada job del lote se commitea por separado; sin expire_on_commit esos
+        # commits no obligan a recargar los jobs que siguen en el lote.
+        db = SessionLocal(expire_on_commit=False)
+        next_retry: float | None = None
         try:
-            job = _claim_next_job(db)
-            if not job:
-                now = time.monotonic()
-                if heartbeat_seconds > 0 and (now - last_heartbeat) >= heartbeat_seconds:
-                    logger.info(f"Sin jobs READY; sleep {settings.POLL_SECONDS}s")
-                    last_heartbeat = now
-                time.sleep(settings.POLL_SECONDS)
-                continue
-
-            try:
-                payload = job.payload or {}
-                files = _files_from_payload(payload)
-
-                if not files:
-                    raise RuntimeError("Job READY sin payload.files para imprimir.")
-
-                logger.info(f"Job id={job.id} iniciando impresión de {len(files)} archivos")
-                printed = _print_files(files)
-
-                _mark_done(
-                    db,
-                    job,
-                    {
-                        "printed_files": printed,
-                        "printed_at": datetime.now().isoformat(),
-                    },
-                )
-
-            except Exception as e:
-                _mark_error(db, job, e)
-
+            jobs = _claim_jobs(db, worker_id)
+            if not jobs:
+                next_retry = seconds_until_available(db, status=PrintJobStatus.READY)
+            with LeaseKeeper([job.id for job in jobs], locked_by=worker_id):
+                for job in jobs:
+                    try:
+                        _print_job(db, job)
+                    except LeaseLostError as e:
+                        # El reaper ya lo devolvió a la cola: otro intento manda.
+                        logger.warning(f"Lease perdido; se descarta el resultado: {e}")
+                    except Exception as e:
+                        db.rollback()
+                        capture_exception(e)
+                        logger.exception(f"Error inesperado imprimiendo job_id={job.id}; sigue el lote")
         finally:
             db.close()
 
+        if jobs:
+            continue
+
+        # La sesión ya está cerrada: no retenemos conexión/transacción mientras
+        # se espera el NOTIFY.
+        now = time.monotonic()
+        if heartbeat_seconds > 0 and (now - last_heartbeat) >= heartbeat_seconds:
+            logger.info(f"Sin jobs READY; esperando NOTIFY (listen={listener.enabled})")
+            last_heartbeat = now
+        listener.wait(timeout=next_retry)
+
 
 if __name__ == "__main__":
     run_worker()
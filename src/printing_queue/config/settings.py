@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,7 +17,35 @@ class Settings(BaseSettings):
         UPLOAD_DIR: Carpeta para archivos subidos.
         PRINTER_NAME: Nombre exacto de la impresora en Windows.
         SUMATRA_PATH: Ruta a SumatraPDF.exe.
-        POLL_SECONDS: Intervalo de polling del worker.
+        POLL_SECONDS: Intervalo de polling del worker (sin LISTEN/NOTIFY).
+        JOBS_NOTIFY_ENABLED: Si es True, los workers esperan jobs con LISTEN/NOTIFY.
+        NOTIFY_FALLBACK_SECONDS: Espera máxima con LISTEN antes de revisar la cola
+            igual (red de seguridad ante notificaciones perdidas).
+        CLAIM_BATCH_SIZE: Máximo de jobs que el print worker reclama por query.
+        GENERATE_CLAIM_BATCH_SIZE: Máximo de jobs que cada proceso de generación
+            reclama por query. Por defecto 1: la generación es lenta y en serie,
+            y un lote dejaría a los demás procesos sin trabajo mientras sus
+            jobs esperan en GENERATING.
+        JOB_PRIORITY_AGING_SECONDS: Cada cuántos segundos de espera un job sube
+            un nivel de prioridad (0 desactiva el envejecimiento).
+        JOB_LEASE_SECONDS: Duración del lease de un job en curso; se renueva
+            cada un tercio de este valor mientras el worker lo procesa.
+        REAPER_INTERVAL_SECONDS: Cada cuánto un worker busca leases vencidos.
+        JOB_MAX_ATTEMPTS: Intentos por defecto de un job nuevo antes de quedar
+            en ERROR (fallas del worker o leases vencidos).
+        RETRY_BACKOFF_BASE_SECONDS: Espera base antes del primer reintento; se
+            duplica en cada intento (con jitter).
+        RETRY_BACKOFF_MAX_SECONDS: Tope de la espera entre reintentos.
+        ARCHIVE_AFTER_DAYS: Antigüedad (por `updated_at`) desde la que un job
+            DONE/ERROR se mueve a `printing.print_jobs_archive`.
+        ARCHIVE_BATCH_SIZE: Jobs movidos por transacción al archivar.
+        EVENT_PARTITIONS_AHEAD_MONTHS: Meses futuros con partición de eventos
+            ya creada.
+        STATUS_EVENTS_MODE: `transactional` (evento en el mismo commit que la
+            transición) o `buffered` (best-effort, escrito en bloque por un thread).
+        STATUS_EVENTS_BUFFER_SIZE: Máximo de eventos en memoria en modo buffered.
+        STATUS_EVENTS_FLUSH_BATCH: Eventos que fuerzan un flush en modo buffered.
+        STATUS_EVENTS_FLUSH_MS: Intervalo máximo entre flushes en modo buffered.
     """
 
     model_config = SettingsConfigDict(
@@ -29,6 +59,23 @@ class Settings(BaseSettings):
     PRINTER_NAME: str = ""
     SUMATRA_PATH: str = ""
     POLL_SECONDS: int = 2
+    JOBS_NOTIFY_ENABLED: bool = True
+    NOTIFY_FALLBACK_SECONDS: int = 30
+    CLAIM_BATCH_SIZE: int = 1
+    GENERATE_CLAIM_BATCH_SIZE: int = 1
+    JOB_PRIORITY_AGING_SECONDS: int = 120
+    JOB_LEASE_SECONDS: int = 300
+    REAPER_INTERVAL_SECONDS: int = 60
+    JOB_MAX_ATTEMPTS: int = 3
+    RETRY_BACKOFF_BASE_SECONDS: int = 10
+    RETRY_BACKOFF_MAX_SECONDS: int = 900
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_BATCH_SIZE: int = 1000
+    EVENT_PARTITIONS_AHEAD_MONTHS: int = 2
+    STATUS_EVENTS_MODE: Literal["transactional", "buffered"] = "transactional"
+    STATUS_EVENTS_BUFFER_SIZE: int = 10_000
+    STATUS_EVENTS_FLUSH_BATCH: int = 200
+    STATUS_EVENTS_FLUSH_MS: int = 500
 
 
 settings = Settings()
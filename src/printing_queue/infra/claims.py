@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import (
+    BindParameter,
+    Column,
+    ColumnElement,
+    DateTime,
+    Select,
+    String,
+    bindparam,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.orm import Session, aliased
+
+from printing_queue.config.settings import settings
+from printing_queue.infra.leases import lease_deadline
+from printing_queue.models import (
+    JOB_PRIORITY_LOWEST,
+    JOB_PRIORITY_URGENT,
+    PrintJob,
+    PrintJobStatus,
+    PrintJobStatusEvent,
+    PrintJobType,
+)
+
+_JOBS = PrintJob.__table__
+_EVENTS = PrintJobStatusEvent.__table__
+
+
+def _inline(value: object, column: Column) -> BindParameter:
+    """Parámetro que se renderiza como literal SQL al ejecutar.
+
+    Los índices parciales de `print_jobs` (`WHERE status = 'ready'`, ...) solo
+    se usan si el planner ve el valor; con un parámetro `$1` un plan genérico
+    cachea el plan sin ellos.
+
+    Args:
+        value: Valor a comparar (ej. un `PrintJobStatus`).
+        column: Columna cuyo tipo renderiza el literal.
+
+    Returns:
+        BindParameter: Parámetro con `literal_execute=True`.
+    """
+    return bindparam(None, value, type_=column.type, literal_execute=True)
+
+
+def effective_priority(now: datetime) -> ColumnElement[int]:
+    """Prioridad de claim con envejecimiento (menor = antes).
+
+    Un job sube un nivel por cada `JOB_PRIORITY_AGING_SECONDS` de espera
+    desde `created_at`, hasta `JOB_PRIORITY_URGENT`. Así un job de baja
+    prioridad no queda esperando para siempre detrás de los urgentes.
+
+    Args:
+        now: Momento del claim.
+
+    Returns:
+        ColumnElement[int]: `GREATEST(priority - FLOOR(espera / aging), 0)`.
+    """
+    aging = settings.JOB_PRIORITY_AGING_SECONDS
+    if aging <= 0:
+        return _JOBS.c.priority
+    waited = func.extract("epoch", literal(now, DateTime(timezone=False)) - _JOBS.c.created_at)
+    return func.greatest(
+        _JOBS.c.priority - func.floor(waited / aging),
+        JOB_PRIORITY_URGENT,
+    )
+
+
+def _claim_candidates(queue: Callable[[Select], Select], limit: int) -> Select:
+    """Ids candidatos al claim: los `limit` más antiguos de cada prioridad.
+
+    El orden con aging es una expresión y ningún índice lo sirve. Pero dentro
+    de una misma prioridad el más antiguo nunca queda detrás de uno más nuevo,
+    así que los `limit` mejores de la cola están entre los `limit` más antiguos
+    de cada nivel. Cada nivel es un recorrido corto del índice parcial
+    `(priority, created_at)` y el ORDER BY final ordena a lo sumo
+    `limit * niveles` filas, no toda la cola.
+
+    El `SKIP LOCKED` va en cada nivel: si fuera solo afuera, los candidatos
+    que otro worker tiene tomados dejarían el claim vacío aunque la cola
+    tenga más jobs. Los candidatos no elegidos quedan bloqueados solo hasta
+    el commit del claim.
+
+    Forma del SQL::
+
+        SELECT per_level.id
+        FROM generate_series(0, 9) AS level(level)
+        JOIN LATERAL (SELECT id ... WHERE priority = level.level
+                      ORDER BY created_at LIMIT :n
+                      FOR UPDATE SKIP LOCKED) AS per_level ON true
+
+    Args:
+        queue: Agrega los filtros de la cola (estado, tipo, `available_at`).
+        limit: Jobs a reclamar.
+
+    Returns:
+        Select: Ids candidatos (para un `IN`).
+    """
+    level = func.generate_series(JOB_PRIORITY_URGENT, JOB_PRIORITY_LOWEST).table_valued(
+        "level"
+    ).render_derived(name="level")
+    per_level = (
+        queue(select(_JOBS.c.id))
+        .where(_JOBS.c.priority == level.c.level)
+        .order_by(_JOBS.c.created_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .lateral("per_level")
+    )
+    return select(per_level.c.id).select_from(level.join(per_level, true()))
+
+
+def build_claim_statement(
+    *,
+    from_status: PrintJobStatus,
+    to_status: PrintJobStatus,
+    source: str,
+    locked_by: str,
+    changed_at: datetime,
+    job_type: PrintJobType | None = None,
+    limit: int = 1,
+) -> Select:
+    """Construye el claim atómico de hasta `limit` jobs como un único statement.
+
+    Forma del SQL (PostgreSQL)::
+
+        WITH claimed AS (
+            UPDATE printing.print_jobs
+            SET status = :to, updated_at = :now, attempts = attempts + 1,
+                locked_by = :worker, lease_until = :now + lease
+            WHERE id IN (SELECT id ... WHERE available_at <= :now
+                         AND id IN (<candidatos bloqueados, ver _claim_candidates>)
+                         ORDER BY <prioridad con aging>, created_at
+                         LIMIT :n)
+            RETURNING *
+        ), claimed_events AS (
+            INSERT INTO printing.print_job_status_events (...)
+            SELECT claimed.id, :from, :to, :now, :source FROM claimed
+        )
+        SELECT * FROM claimed
+
+    Sin aging (`JOB_PRIORITY_AGING_SECONDS <= 0`) no hay candidatos: el
+    SELECT interno ordena por `(priority, created_at)`, que sirve el índice
+    parcial directamente, y lleva él mismo el `FOR UPDATE SKIP LOCKED`.
+
+    Args:
+        from_status: Estado que debe tener el job para ser reclamado.
+        to_status: Estado en que queda el job reclamado.
+        source: Fuente del cambio para el evento (ej. generate_worker).
+        locked_by: Identidad del worker que toma el lease.
+        changed_at: Timestamp del cambio (job y evento comparten valor).
+        job_type: Si se indica, limita el claim a ese tipo de job.
+        limit: Máximo de jobs a reclamar.
+
+    Returns:
+        Select: Statement ORM que retorna los `PrintJob` reclamados.
+    """
+
+    def _queue(query: Select) -> Select:
+        query = query.where(_JOBS.c.status == _inline(from_status, _JOBS.c.status))
+        query = query.where(_JOBS.c.available_at <= changed_at)
+        if job_type is not None:
+            query = query.where(_JOBS.c.job_type == _inline(job_type, _JOBS.c.job_type))
+        return query
+
+    picked = _queue(select(_JOBS.c.id)).order_by(
+        effective_priority(changed_at).asc(), _JOBS.c.created_at.asc()
+    )
+    if settings.JOB_PRIORITY_AGING_SECONDS > 0:
+        # Los candidatos ya vienen bloqueados (ver `_claim_candidates`).
+        picked = picked.where(_JOBS.c.id.in_(_claim_candidates(_queue, limit))).limit(limit)
+    else:
+        # Sin aging el orden es `(priority, created_at)`: lo sirve el índice.
+        picked = picked.limit(limit).with_for_update(skip_locked=True)
+
+    claimed = (
+        update(_JOBS)
+        .where(_JOBS.c.id.in_(picked))
+        .values(
+            status=to_status,
+            updated_at=changed_at,
+            attempts=_JOBS.c.attempts + 1,
+            locked_by=locked_by,
+            lease_until=lease_deadline(changed_at),
+        )
+        .returning(*_JOBS.c)
+        .cte("claimed")
+    )
+
+    claimed_events = insert(_EVENTS).from_select(
+        ["job_id", "from_status", "to_status", "occurred_at", "source"],
+        select(
+            claimed.c.id,
+            # CAST explícito: un parámetro en la lista del SELECT se resuelve
+            # como text y PostgreSQL no lo convierte solo al enum.
+            cast(literal(from_status, _EVENTS.c.from_status.type), _EVENTS.c.from_status.type),
+            cast(literal(to_status, _EVENTS.c.to_status.type), _EVENTS.c.to_status.type),
+            literal(changed_at, DateTime(timezone=False)),
+            literal(source, String(50)),
+        ),
+    ).cte("claimed_events")
+
+    return select(aliased(PrintJob, claimed)).add_cte(claimed_events)
+
+
+def _aged_priority(job: PrintJob, now: datetime) -> int:
+    """Equivalente en Python de `effective_priority` para un job ya cargado."""
+    aging = settings.JOB_PRIORITY_AGING_SECONDS
+    if aging <= 0:
+        return job.priority
+    waited = (now - job.created_at).total_seconds()
+    return max(job.priority - int(waited // aging), JOB_PRIORITY_URGENT)
+
+
+def claim_batch(
+    db: Session,
+    n: int,
+    *,
+    from_status: PrintJobStatus,
+    to_status: PrintJobStatus,
+    source: str,
+    locked_by: str,
+    job_type: PrintJobType | None = None,
+) -> list[PrintJob]:
+    """Reclama hasta `n` jobs en `from_status` en un solo round trip.
+
+    Se toman por prioridad (con envejecimiento, ver `effective_priority`) y,
+    a igual prioridad, en orden FIFO.
+
+    Los cambios de estado y sus `PrintJobStatusEvent` (uno por job) se
+    escriben en el mismo statement, y los jobs vuelven con los valores de
+    `RETURNING`, por lo que no hace falta un `refresh()` ni un segundo commit.
+
+    Args:
+        db: Sesión de DB.
+        n: Máximo de jobs a reclamar (mínimo 1).
+        from_status: Estado que deben tener los jobs para ser reclamados.
+        to_status: Estado en que quedan los jobs reclamados.
+        source: Fuente del cambio para los eventos.
+        locked_by: Identidad del worker que toma el lease (ver `worker_identity`).
+        job_type: Si se indica, limita el claim a ese tipo de job.
+
+    Returns:
+        list[PrintJob]: Jobs reclamados (ya commiteados), en orden de claim.
+    """
+    now = datetime.now()
+    stmt = build_claim_statement(
+        from_status=from_status,
+        to_status=to_status,
+        source=source,
+        locked_by=locked_by,
+        changed_at=now,
+        job_type=job_type,
+        limit=max(1, int(n)),
+    )
+    jobs = list(db.execute(stmt).scalars().all())
+
+    # Se sacan de la sesión durante el commit para que no se expiren: los
+    # valores de RETURNING ya son los vigentes y así se evita un SELECT extra.
+    for job in jobs:
+        db.expunge(job)
+    db.commit()
+    for job in jobs:
+        db.add(job)
+
+    # RETURNING no garantiza orden: se respeta el orden del claim.
+    jobs.sort(key=lambda job: (_aged_priority(job, now), job.created_at, job.id))
+    return jobs
+
+
+def claim_next_job(
+    db: Session,
+    *,
+    from_status: PrintJobStatus,
+    to_status: PrintJobStatus,
+    source: str,
+    locked_by: str,
+    job_type: PrintJobType | None = None,
+) -> PrintJob | None:
+    """Reclama el próximo job en `from_status` (ver `claim_batch`).
+
+    Args:
+        db: Sesión de DB.
+        from_status: Estado que debe tener el job para ser reclamado.
+        to_status: Estado en que queda el job reclamado.
+        source: Fuente del cambio para el evento.
+        locked_by: Identidad del worker que toma el lease.
+        job_type: Si se indica, limita el claim a ese tipo de job.
+
+    Returns:
+        PrintJob | None: Job reclamado (ya commiteado) o None si no había.
+    """
+    jobs = claim_batch(
+        db,
+        1,
+        from_status=from_status,
+        to_status=to_status,
+        source=source,
+        locked_by=locked_by,
+        job_type=job_type,
+    )
+    return jobs[0] if jobs else None
+
+
+def seconds_until_available(
+    db: Session,
+    *,
+    status: PrintJobStatus,
+    job_type: PrintJobType | None = None,
+    now: datetime | None = None,
+) -> float | None:
+    """Segundos hasta que el próximo reintento diferido en `status` sea reclamable.
+
+    Un reintento con backoff no publica NOTIFY; el worker usa este valor para
+    acortar su espera y tomarlo a tiempo.
+
+    Args:
+        db: Sesión de DB.
+        status: Estado de la cola (PENDING o READY).
+        job_type: Si se indica, limita la búsqueda a ese tipo de job.
+        now: Momento de referencia. Por defecto, ahora.
+
+    Returns:
+        float | None: Segundos de espera, o None si no hay jobs diferidos.
+    """
+    now = now or datetime.now()
+    stmt = (
+        select(func.min(PrintJob.available_at))
+        .where(PrintJob.status == status)
+        .where(PrintJob.available_at > now)
+    )
+    if job_type is not None:
+        stmt = stmt.where(PrintJob.job_type == job_type)
+    next_at = db.scalar(stmt)
+    if next_at is None:
+        return None
+    return max(0.0, (next_at - now).total_seconds())
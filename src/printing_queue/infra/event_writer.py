@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from printing_queue.config.settings import settings
+from printing_queue.models import PrintJobStatusEvent
+
+_WRITER: "BufferedStatusEventWriter | None" = None
+_WRITER_LOCK = threading.Lock()
+
+
+class BufferedStatusEventWriter:
+    """Escritor en segundo plano de `PrintJobStatusEvent` (best-effort).
+
+    Los eventos se encolan en memoria y un thread los inserta en bloque
+    (INSERT multi-fila) cada `flush_interval_ms` o apenas se juntan
+    `flush_batch` eventos. Así una transición no espera el commit del evento.
+
+    El buffer es acotado: si se llena, el evento se descarta y se cuenta en
+    `dropped`. Un bloque que falla al insertarse también se cuenta como
+    descartado. Al cerrar (o al salir el proceso) se vacía lo pendiente.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        max_buffer: int = 10_000,
+        flush_batch: int = 200,
+        flush_interval_ms: int = 500,
+    ) -> None:
+        """Inicializa el escritor (sin arrancar el thread).
+
+        Args:
+            session_factory: Factory de sesiones de la cola (ej. `SessionLocal`).
+            max_buffer: Máximo de eventos en memoria antes de descartar.
+            flush_batch: Cantidad de eventos que fuerza un flush.
+            flush_interval_ms: Espera máxima antes de escribir lo acumulado.
+        """
+        self._session_factory = session_factory
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max(1, max_buffer))
+        self._flush_batch = max(1, flush_batch)
+        self._flush_interval = max(1, flush_interval_ms) / 1000.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._counter_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        """Arranca el thread de escritura (idempotente)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="status-event-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, **event: Any) -> bool:
+        """Encola un evento sin bloquear.
+
+        Args:
+            **event: Columnas de `PrintJobStatusEvent` (job_id, from_status,
+                to_status, occurred_at, source).
+
+        Returns:
+            bool: True si quedó encolado; False si el buffer estaba lleno.
+        """
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self._count(dropped=1)
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Detiene el thread y escribe lo que quede en el buffer.
+
+        Args:
+            timeout: Segundos máximos a esperar al thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._flush(self._drain(limit=None))
+
+    def _run(self) -> None:
+        """Loop del thread: acumula eventos y los escribe en bloque."""
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self._flush_interval
+            batch: list[dict[str, Any]] = []
+            while len(batch) < self._flush_batch and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            batch.extend(self._drain(limit=self._flush_batch - len(batch)))
+            self._flush(batch)
+
+    def _drain(self, limit: int | None) -> list[dict[str, Any]]:
+        """Saca del buffer, sin esperar, hasta `limit` eventos (o todos)."""
+        batch: list[dict[str, Any]] = []
+        while limit is None or len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list[dict[str, Any]]) -> None:
+        """Inserta un bloque de eventos; si falla, los cuenta como descartados."""
+        if not batch:
+            return
+        db = self._session_factory()
+        try:
+            db.execute(insert(PrintJobStatusEvent), batch)
+            db.commit()
+            self._count(written=len(batch))
+        except Exception:
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            self._count(dropped=len(batch))
+        finally:
+            db.close()
+
+    def _count(self, *, written: int = 0, dropped: int = 0) -> None:
+        with self._counter_lock:
+            self.written += written
+            self.dropped += dropped
+
+
+def get_status_event_writer() -> BufferedStatusEventWriter:
+    """Retorna el escritor buffered del proceso, creándolo y arrancándolo si hace falta.
+
+    Returns:
+        BufferedStatusEventWriter: Instancia compartida (se cierra en `atexit`).
+    """
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            from printing_queue.infra.db import SessionLocal
+
+            _WRITER = BufferedStatusEventWriter(
+                SessionLocal,
+                max_buffer=settings.STATUS_EVENTS_BUFFER_SIZE,
+                flush_batch=settings.STATUS_EVENTS_FLUSH_BATCH,
+                flush_interval_ms=settings.STATUS_EVENTS_FLUSH_MS,
+            )
+            atexit.register(_WRITER.close)
+        _WRITER.start()
+        return _WRITER
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobType
+
+# Estados en que un job ya no bloquea un alta con la misma clave: volver a
+# pedir lo mismo después de terminar es un pedido nuevo (ej. reimprimir).
+TERMINAL_STATUSES = (PrintJobStatus.DONE, PrintJobStatus.ERROR)
+
+
+def idempotency_key(
+    job_type: PrintJobType,
+    payload: dict[str, Any] | None = None,
+    *,
+    client_key: str | None = None,
+) -> str:
+    """Calcula la clave de idempotencia de un alta.
+
+    Se deriva del tipo de job y del payload (JSON canónico). Si el cliente
+    envía su propia clave (header `Idempotency-Key`) se combina con ese
+    payload: reusar la clave para otro pedido no devuelve el job anterior.
+    Siempre se guarda como sha256 en hex (64 caracteres).
+
+    Args:
+        job_type: Tipo de job.
+        payload: Payload que identifica el pedido (ej. what/date/venta_id).
+        client_key: Clave provista por el cliente.
+
+    Returns:
+        str: Clave a guardar en `PrintJob.idempotency_key`.
+    """
+    canonical = json.dumps(payload or {}, sort_keys=True, separators=(",", ":"), default=str)
+    material = f"payload:{job_type.value}:{canonical}"
+    if client_key:
+        material = f"client:{client_key}:{material}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def find_active_job(db: Session, key: str) -> PrintJob | None:
+    """Busca un job no terminado con la clave indicada.
+
+    Args:
+        db: Sesión de DB.
+        key: Clave de idempotencia.
+
+    Returns:
+        PrintJob | None: Job en curso con esa clave, si existe.
+    """
+    return db.scalars(
+        select(PrintJob)
+        .where(PrintJob.idempotency_key == key)
+        .where(PrintJob.status.not_in(TERMINAL_STATUSES))
+        .limit(1)
+    ).first()
@@ -1,47 +1,197 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from printing_queue.models import PrintJobStatus, PrintJobStatusEvent
+from printing_queue.config.settings import settings
+from printing_queue.infra.event_writer import get_status_event_writer
+from printing_queue.infra.idempotency import find_active_job
+from printing_queue.infra.notifications import notify_jobs_available
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobStatusEvent
 
+# Estado "en curso" (con lease de un worker) -> estado al que vuelve si el
+# lease vence sin que el worker termine.
+LEASED_STATUSES: dict[PrintJobStatus, PrintJobStatus] = {
+    PrintJobStatus.GENERATING: PrintJobStatus.PENDING,
+    PrintJobStatus.PRINTING: PrintJobStatus.READY,
+}
 
-def try_record_print_job_status_event(
+
+class LeaseLostError(RuntimeError):
+    """El worker perdió el lease del job antes de registrar su resultado.
+
+    El reaper lo devolvió a la cola (y quizá otro worker ya lo tomó): el
+    resultado de este worker se descarta sin tocar el job.
+    """
+
+
+def _commit_with_event(db: Session, **event: Any) -> None:
+    """Hace commit de la transición y registra su evento según `STATUS_EVENTS_MODE`.
+
+    - `transactional`: el evento entra en la misma transacción.
+    - `buffered`: se encola tras el commit (nunca referencia un job que no
+      llegó a persistirse) y lo escribe el `BufferedStatusEventWriter`.
+
+    Args:
+        db: Sesión de DB con la transición pendiente.
+        **event: Columnas del `PrintJobStatusEvent`.
+    """
+    if settings.STATUS_EVENTS_MODE == "buffered":
+        db.commit()
+        get_status_event_writer().submit(**event)
+        return
+
+    db.add(PrintJobStatusEvent(**event))
+    db.commit()
+
+
+def enqueue_job(db: Session, job: PrintJob, *, source: str) -> PrintJob:
+    """Inserta un job nuevo junto a su evento inicial en una sola transacción.
+
+    Si el job queda PENDING o READY, además publica el NOTIFY correspondiente
+    (se entrega al hacer commit).
+
+    Si el job trae `idempotency_key` y ya existe un job no terminado con esa
+    clave, no se inserta nada y se retorna el existente. El índice único
+    parcial resuelve también la carrera entre dos altas simultáneas.
+
+    Args:
+        db: Sesión de DB.
+        job: Job nuevo (sin persistir) con `status` ya definido.
+        source: Fuente del alta (por ejemplo: api).
+
+    Returns:
+        PrintJob: El mismo job, ya commiteado, o el job vivo con la misma clave.
+    """
+    key = job.idempotency_key
+    if key is not None:
+        existing = find_active_job(db, key)
+        if existing is not None:
+            return existing
+
+    if job.max_attempts is None:
+        job.max_attempts = settings.JOB_MAX_ATTEMPTS
+    db.add(job)
+    try:
+        # flush para obtener `id` y `created_at` antes de escribir el evento.
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        existing = find_active_job(db, key) if key is not None else None
+        if existing is None:
+            raise
+        return existing
+
+    notify_jobs_available(db, job.status)
+    _commit_with_event(
+        db,
+        job_id=job.id,
+        from_status=None,
+        to_status=job.status,
+        occurred_at=job.created_at,
+        source=source,
+    )
+    return job
+
+
+def transition_job(
     db: Session,
-    *,
-    job_id: int,
-    from_status: PrintJobStatus | None,
+    job: PrintJob,
     to_status: PrintJobStatus,
-    occurred_at: datetime,
+    *,
     source: str,
+    changed_at: datetime | None = None,
+    **changes: Any,
 ) -> None:
-    """Registra (best-effort) un evento de cambio de estado para un job.
+    """Cambia el estado de un job y registra su evento en la misma transacción.
 
-    La escritura es opcional y no debe romper el flujo principal (generación/
-    impresión). Si falla, hace rollback de *este* intento y retorna.
+    Antes el evento se escribía con un segundo commit best-effort; si el
+    proceso moría entre ambos commits, el evento se perdía y los tiempos por
+    estado en Grafana quedaban incompletos. Aquí ambos cambios son atómicos
+    (salvo que `STATUS_EVENTS_MODE=buffered` pida eventos best-effort).
+
+    Si el job está en GENERATING/PRINTING, el cambio solo se aplica si el
+    lease sigue siendo el que se cargó (ver `_fenced_update`).
 
     Args:
         db: Sesión de DB.
-        job_id: ID del job.
-        from_status: Estado anterior (puede ser None si es el evento inicial).
+        job: Job a actualizar.
         to_status: Estado nuevo.
-        occurred_at: Timestamp del cambio.
         source: Fuente del cambio (por ejemplo: api, generate_worker, print_worker).
+        changed_at: Timestamp del cambio. Por defecto, ahora.
+        **changes: Otros atributos del job a actualizar en la misma transacción
+            (por ejemplo `payload`, `error_msg`, `printed_at`).
+
+    Raises:
+        LeaseLostError: Si el job en curso ya no pertenece a este lease.
     """
-    try:
-        db.add(
-            PrintJobStatusEvent(
-                job_id=job_id,
-                from_status=from_status,
-                to_status=to_status,
-                occurred_at=occurred_at,
-                source=source,
-            )
-        )
-        db.commit()
-    except Exception:
-        try:
-            db.rollback()
-        except Exception:
-            pass
+    changed_at = changed_at or datetime.now()
+    from_status = job.status
+
+    values: dict[str, Any] = {"status": to_status, "updated_at": changed_at}
+    if to_status not in LEASED_STATUSES:
+        # Al salir de GENERATING/PRINTING el worker suelta el lease.
+        values["locked_by"] = None
+        values["lease_until"] = None
+    if to_status in LEASED_STATUSES.values():
+        # Vuelve a una cola: disponible ya, salvo que `changes` traiga un
+        # `available_at` futuro (reintento con backoff).
+        values["available_at"] = changed_at
+    values.update(changes)
+
+    if from_status in LEASED_STATUSES:
+        _fenced_update(db, job, values)
+    else:
+        for name, value in values.items():
+            setattr(job, name, value)
+
+    if job.available_at is None or job.available_at <= changed_at:
+        # Un reintento diferido no despierta workers: lo toman al vencer su espera.
+        notify_jobs_available(db, to_status)
+    _commit_with_event(
+        db,
+        job_id=job.id,
+        from_status=from_status,
+        to_status=to_status,
+        occurred_at=changed_at,
+        source=source,
+    )
+
+
+def _fenced_update(db: Session, job: PrintJob, values: dict[str, Any]) -> None:
+    """Aplica `values` a un job en curso solo si conserva el lease cargado.
+
+    Es un `UPDATE ... WHERE id = :id AND status = :en_curso AND locked_by = :yo
+    AND attempts = :intento`: si el lease venció y el reaper devolvió el job a
+    la cola, el UPDATE no encuentra la fila. `attempts` distingue un nuevo
+    claim del mismo worker sobre el mismo job.
+
+    Args:
+        db: Sesión de DB.
+        job: Job tal como lo cargó el worker (o el reaper).
+        values: Columnas a actualizar.
+
+    Raises:
+        LeaseLostError: Si ninguna fila cumple la condición (se hace rollback).
+    """
+    result = db.execute(
+        update(PrintJob)
+        .where(PrintJob.id == job.id)
+        .where(PrintJob.status == job.status)
+        .where(PrintJob.locked_by.is_not_distinct_from(job.locked_by))
+        .where(PrintJob.attempts == job.attempts)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        lost = f"job_id={job.id} ya no está en {job.status.value} con lease de {job.locked_by}"
+        db.rollback()
+        raise LeaseLostError(lost)
+    for name, value in values.items():
+        # Ya está escrito: se refleja en el objeto sin volver a marcarlo sucio.
+        set_committed_value(job, name, value)
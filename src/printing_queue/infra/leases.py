@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from printing_queue.config.settings import settings
+from printing_queue.infra.job_status_events import LEASED_STATUSES
+from printing_queue.infra.retries import retry_or_fail
+from printing_queue.models import PrintJob, PrintJobStatus
+
+
+def worker_identity(name: str) -> str:
+    """Identificador único del proceso worker para `PrintJob.locked_by`.
+
+    Args:
+        name: Nombre lógico del worker (ej. generate_worker).
+
+    Returns:
+        str: `name@host:pid`.
+    """
+    return f"{name}@{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_deadline(now: datetime | None = None) -> datetime:
+    """Calcula el vencimiento de un lease tomado o renovado ahora.
+
+    Args:
+        now: Momento de referencia. Por defecto, ahora.
+
+    Returns:
+        datetime: `now + JOB_LEASE_SECONDS`.
+    """
+    return (now or datetime.now()) + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+def renew_leases(db: Session, job_ids: list[int], *, locked_by: str) -> int:
+    """Extiende el lease de los jobs que este worker todavía posee.
+
+    Args:
+        db: Sesión de DB.
+        job_ids: Jobs a renovar.
+        locked_by: Identidad del worker dueño del lease.
+
+    Returns:
+        int: Cantidad de jobs renovados (0 si el reaper ya los recuperó).
+    """
+    if not job_ids:
+        return 0
+    result = db.execute(
+        update(PrintJob)
+        .where(PrintJob.id.in_(job_ids))
+        .where(PrintJob.locked_by == locked_by)
+        .where(PrintJob.status.in_(list(LEASED_STATUSES)))
+        .values(lease_until=lease_deadline())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return int(result.rowcount or 0)
+
+
+class LeaseKeeper:
+    """Renueva en segundo plano el lease de los jobs que se están procesando.
+
+    La generación y la impresión bloquean el thread principal, así que la
+    renovación corre en un thread aparte con su propia sesión, cada
+    `JOB_LEASE_SECONDS / 3` segundos.
+
+    Uso::
+
+        with LeaseKeeper([job.id for job in jobs], locked_by=worker):
+            ...
+    """
+
+    def __init__(
+        self,
+        job_ids: list[int],
+        *,
+        locked_by: str,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> None:
+        """Inicializa el keeper.
+
+        Args:
+            job_ids: Jobs cuyo lease se mantiene.
+            locked_by: Identidad del worker dueño del lease.
+            session_factory: Factory de sesiones. Por defecto `SessionLocal`.
+        """
+        if session_factory is None:
+            from printing_queue.infra.db import SessionLocal
+
+            session_factory = SessionLocal
+        self._job_ids = list(job_ids)
+        self._locked_by = locked_by
+        self._session_factory = session_factory
+        self._interval = max(1.0, settings.JOB_LEASE_SECONDS / 3)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "LeaseKeeper":
+        if self._job_ids:
+            self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            db = self._session_factory()
+            try:
+                renew_leases(db, self._job_ids, locked_by=self._locked_by)
+            except Exception:
+                # best-effort: el próximo intento vuelve a renovar
+                db.rollback()
+            finally:
+                db.close()
+
+
+def reap_expired_leases(
+    db: Session,
+    *,
+    statuses: list[PrintJobStatus],
+    source: str,
+    now: datetime | None = None,
+) -> list[PrintJob]:
+    """Devuelve a la cola los jobs cuyo lease venció (worker caído).
+
+    GENERATING vuelve a PENDING y PRINTING vuelve a READY, con el mismo
+    backoff que una falla (`retry_or_fail`). Si el job ya agotó
+    `max_attempts`, queda en ERROR para no reintentar sin fin.
+
+    Nota:
+        Un job PRINTING recuperado se vuelve a imprimir completo; si el worker
+        murió después de mandar el PDF a la impresora, puede salir duplicado.
+
+    Args:
+        db: Sesión de DB.
+        statuses: Estados "en curso" a revisar (subconjunto de `LEASED_STATUSES`).
+        source: Fuente del cambio para los eventos.
+        now: Momento de referencia. Por defecto, ahora.
+
+    Returns:
+        list[PrintJob]: Jobs recuperados.
+    """
+    now = now or datetime.now()
+    candidates = db.scalars(
+        select(PrintJob.id)
+        .where(PrintJob.status.in_(statuses))
+        .where(PrintJob.lease_until < now)
+    ).all()
+    db.rollback()
+
+    reaped: list[PrintJob] = []
+    for job_id in candidates:
+        # Se relee con bloqueo: otro reaper o el propio worker pudo tomarlo.
+        job = db.scalars(
+            select(PrintJob)
+            .where(PrintJob.id == job_id)
+            .where(PrintJob.status.in_(statuses))
+            .where(PrintJob.lease_until < now)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if job is None:
+            db.rollback()
+            continue
+
+        retry_or_fail(
+            db,
+            job,
+            f"Lease vencido de {job.locked_by} (intento {job.attempts}/{job.max_attempts}) "
+            f"en estado {job.status.value}.",
+            source=source,
+        )
+        reaped.append(job)
+    return reaped
@@ -4,7 +4,18 @@ import enum
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    CheckConstraint,
+    DateTime,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import ENUM as PGEnum
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -31,11 +42,15 @@ class PrintJobType(str, enum.Enum):
     UPLOAD = "upload"
 
 
-class PrintJob(Base):
-    """Modelo de cola de impresión."""
+# Prioridad de un job: menor valor = se reclama antes. El claim envejece la
+# prioridad de los jobs que esperan (ver `JOB_PRIORITY_AGING_SECONDS`).
+JOB_PRIORITY_URGENT = 0
+JOB_PRIORITY_DEFAULT = 5
+JOB_PRIORITY_LOWEST = 9
 
-    __tablename__ = "print_jobs"
-    __table_args__ = {"schema": "printing"}
+
+class PrintJobColumns:
+    """Columnas de un job, compartidas por la cola y su archivo."""
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     job_type: Mapped[PrintJobType] = mapped_column(
@@ -76,6 +91,107 @@ class PrintJob(Base):
 
     error_msg: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # Clave de idempotencia del alta (ver `printing_queue.infra.idempotency`).
+    # Única entre jobs no terminados: un pedido repetido devuelve el job vivo.
+    idempotency_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+    priority: Mapped[int] = mapped_column(
+        SmallInteger,
+        nullable=False,
+        default=JOB_PRIORITY_DEFAULT,
+        server_default=text(str(JOB_PRIORITY_DEFAULT)),
+    )
+
+    # Lease del worker que procesa el job (GENERATING/PRINTING). Si el worker
+    # cae, el reaper devuelve el job a la cola cuando vence `lease_until`.
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    locked_by: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    lease_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=False), nullable=True)
+
+    # Reintentos: un job que falla vuelve a su cola con `available_at` en el
+    # futuro (backoff) hasta agotar `max_attempts`. El claim ignora los jobs
+    # cuyo `available_at` todavía no llega.
+    max_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=3, server_default=text("3")
+    )
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False),
+        nullable=False,
+        default=datetime.now,
+        server_default=func.now(),
+    )
+
+
+class PrintJob(PrintJobColumns, Base):
+    """Modelo de cola de impresión.
+
+    Nota:
+        Las columnas agregadas después de la versión inicial (`attempts`,
+        `locked_by`, `lease_until`, ...) no las crea `create_all` sobre una
+        tabla existente: se agregan re-ejecutando `scripts/init_db.sql`.
+    """
+
+    __tablename__ = "print_jobs"
+    __table_args__ = (
+        # Índices parciales: cubren solo las filas vivas de cada cola, así el
+        # claim no crece con el histórico DONE/ERROR. `(priority, created_at)`
+        # sirve el recorrido por nivel de `claims._claim_candidates`. Mantener
+        # en sync con `scripts/init_db.sql`.
+        Index(
+            "ix_print_jobs_pending_shipping_priority_created_at",
+            "priority",
+            "created_at",
+            postgresql_where=text("status = 'pending' AND job_type = 'shipping_docs'"),
+        ),
+        Index(
+            "ix_print_jobs_ready_priority_created_at",
+            "priority",
+            "created_at",
+            postgresql_where=text("status = 'ready'"),
+        ),
+        # El claim recorre los niveles URGENT..LOWEST: una prioridad fuera de
+        # rango nunca se reclamaría.
+        CheckConstraint(
+            f"priority BETWEEN {JOB_PRIORITY_URGENT} AND {JOB_PRIORITY_LOWEST}",
+            name="ck_print_jobs_priority_range",
+        ),
+        Index(
+            "ix_print_jobs_leased_lease_until",
+            "lease_until",
+            postgresql_where=text("status IN ('generating', 'printing')"),
+        ),
+        Index(
+            "ux_print_jobs_active_idempotency_key",
+            "idempotency_key",
+            unique=True,
+            postgresql_where=text("status NOT IN ('done', 'error') AND idempotency_key IS NOT NULL"),
+            sqlite_where=text("status NOT IN ('done', 'error') AND idempotency_key IS NOT NULL"),
+        ),
+        {"schema": "printing"},
+    )
+
+
+class PrintJobArchive(PrintJobColumns, Base):
+    """Jobs DONE/ERROR antiguos movidos fuera de `print_jobs`.
+
+    Mantiene chica la tabla caliente de la cola (claims, reaper, paneles).
+    Conserva el `id` original: los `PrintJobStatusEvent` del job siguen
+    apuntando a él. Ver `printing_queue.infra.retention`.
+    """
+
+    __tablename__ = "print_jobs_archive"
+    __table_args__ = (
+        Index("ix_print_jobs_archive_created_at", "created_at"),
+        {"schema": "printing"},
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=False), nullable=False, default=datetime.now
+    )
+
 
 class PrintJobStatusEvent(Base):
     """Evento de cambio de estado de un job.
@@ -84,20 +200,22 @@ class PrintJobStatusEvent(Base):
     dashboards (Grafana/SQL).
 
     Nota:
-        Este modelo no requiere migración sobre `printing.print_jobs` porque es
-        una tabla nueva. `Base.metadata.create_all(...)` la crea si no existe.
+        En PostgreSQL la tabla la crea `scripts/init_db.sql` particionada por
+        mes sobre `occurred_at`; `create_all` la respeta porque ya existe. La
+        PK es `(id, occurred_at)` porque una tabla particionada exige incluir
+        la columna de partición. Sin FK a `print_jobs`: los eventos de un job
+        archivado (`PrintJobArchive`) se conservan.
     """
 
     __tablename__ = "print_job_status_events"
-    __table_args__ = {"schema": "printing"}
+    __table_args__ = (
+        # Historial de un job en orden.
+        Index("ix_print_job_status_events_job_id_occurred_at", "job_id", "occurred_at"),
+        {"schema": "printing"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    job_id: Mapped[int] = mapped_column(
-        Integer,
-        ForeignKey("printing.print_jobs.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True,
-    )
+    job_id: Mapped[int] = mapped_column(Integer, nullable=False)
 
     from_status: Mapped[PrintJobStatus | None] = mapped_column(
         PGEnum(
@@ -123,11 +241,11 @@ class PrintJobStatusEvent(Base):
         nullable=False,
     )
 
+    # Parte de la PK; las consultas por fecha se resuelven por partición.
     occurred_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=False),
-        nullable=False,
+        primary_key=True,
         default=datetime.now,
-        index=True,
     )
 
     source: Mapped[str | None] = mapped_column(String(50), nullable=True)
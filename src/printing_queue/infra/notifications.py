@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from printing_queue.config.settings import settings
+from printing_queue.models import PrintJobStatus
+
+# Un canal por estado "reclamable": el generate_worker escucha PENDING y el
+# print_worker escucha READY. El resto de estados no despierta a nadie.
+JOB_CHANNELS: dict[PrintJobStatus, str] = {
+    PrintJobStatus.PENDING: "printing_jobs_pending",
+    PrintJobStatus.READY: "printing_jobs_ready",
+}
+
+
+def notify_jobs_available(db: Session, status: PrintJobStatus) -> None:
+    """Publica un NOTIFY para despertar a los workers que esperan `status`.
+
+    Se ejecuta dentro de la transacción actual: PostgreSQL entrega la
+    notificación recién cuando se hace commit (y la descarta si hay rollback),
+    así el worker nunca despierta antes de que el job sea visible.
+
+    En motores distintos de PostgreSQL (por ejemplo SQLite en tests) no hace nada.
+
+    Args:
+        db: Sesión de DB con la transacción que deja el job disponible.
+        status: Estado en que queda el job (PENDING o READY).
+    """
+    channel = JOB_CHANNELS.get(status)
+    if channel is None or not settings.JOBS_NOTIFY_ENABLED:
+        return
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": channel})
+
+
+def _bounded(limit: float, timeout: float | None) -> float:
+    """Acota `timeout` a `limit` (None = sin cota adicional)."""
+    if timeout is None:
+        return limit
+    return max(0.0, min(limit, timeout))
+
+
+class JobNotificationListener:
+    """Espera notificaciones de jobs disponibles usando LISTEN.
+
+    Mantiene una conexión psycopg dedicada en autocommit (fuera del pool de
+    SQLAlchemy, porque una conexión con LISTEN activo no debe reciclarse).
+
+    Si NOTIFY está deshabilitado, el motor no es PostgreSQL o la conexión
+    falla, degrada a un `sleep` de `POLL_SECONDS` (polling clásico) y reintenta
+    conectar en la siguiente espera.
+    """
+
+    def __init__(self, status: PrintJobStatus, database_url: str | None = None) -> None:
+        """Inicializa el listener.
+
+        Args:
+            status: Estado cuyo canal se escucha (PENDING o READY).
+            database_url: URL SQLAlchemy de la cola. Por defecto `DATABASE_URL`.
+        """
+        self._channel = JOB_CHANNELS[status]
+        self._url = make_url(database_url or settings.DATABASE_URL)
+        self._conn: Any | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Indica si corresponde usar LISTEN en vez de polling puro."""
+        return settings.JOBS_NOTIFY_ENABLED and self._url.get_backend_name() == "postgresql"
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Bloquea hasta recibir un NOTIFY o hasta que venza el fallback.
+
+        Args:
+            timeout: Espera máxima en segundos (ej. hasta el próximo reintento
+                diferido). Nunca supera `NOTIFY_FALLBACK_SECONDS`, ni
+                `POLL_SECONDS` en modo polling.
+
+        Returns:
+            bool: True si llegó una notificación; False si venció el timeout o
+            se degradó a polling.
+        """
+        if not self.enabled:
+            time.sleep(_bounded(settings.POLL_SECONDS, timeout))
+            return False
+
+        try:
+            if self._conn is None or self._conn.closed:
+                # Lo notificado antes del LISTEN se perdió: conectar y forzar
+                # una revisión inmediata de la cola en vez de bloquear.
+                self._connect()
+                return True
+            conn = self._conn
+            wait_seconds = _bounded(settings.NOTIFY_FALLBACK_SECONDS, timeout)
+            for _notify in conn.notifies(timeout=wait_seconds, stop_after=1):
+                return True
+            return False
+        except Exception:
+            self.close()
+            time.sleep(settings.POLL_SECONDS)
+            return False
+
+    def close(self) -> None:
+        """Cierra la conexión dedicada (si existe)."""
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _connect(self) -> None:
+        """Abre la conexión dedicada en autocommit y ejecuta LISTEN."""
+        import psycopg
+
+        dsn = self._url.set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg.connect(dsn, autocommit=True)
+        conn.execute(f'LISTEN "{self._channel}"')
+        self._conn = conn
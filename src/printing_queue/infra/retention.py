@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import DateTime, delete, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from printing_queue.models import PrintJob, PrintJobArchive, PrintJobStatus
+
+_JOBS = PrintJob.__table__
+_ARCHIVE = PrintJobArchive.__table__
+
+# Estados finales: un job en ellos ya no lo vuelve a tocar ningún worker.
+FINISHED_STATUSES = (PrintJobStatus.DONE, PrintJobStatus.ERROR)
+
+# Columnas de la vista `printing.print_jobs_all`. Mantener en sync con
+# `scripts/init_db.sql` (`CREATE OR REPLACE VIEW` no admite cambiarlas).
+HISTORY_VIEW_COLUMNS = (
+    "id",
+    "job_type",
+    "status",
+    "payload",
+    "file_path",
+    "created_at",
+    "updated_at",
+    "printed_at",
+    "error_msg",
+    "attempts",
+    "max_attempts",
+)
+
+
+def archive_cutoff(days: int, now: datetime | None = None) -> datetime:
+    """Calcula el límite de antigüedad para archivar.
+
+    Args:
+        days: Días desde la última actualización del job.
+        now: Momento de referencia. Por defecto, ahora.
+
+    Returns:
+        datetime: Se archivan jobs con `updated_at` anterior a este valor.
+    """
+    return (now or datetime.now()) - timedelta(days=days)
+
+
+def _archive_batch(db: Session, *, older_than: datetime, batch_size: int, archived_at: datetime) -> int:
+    """Mueve un lote de jobs terminados a `print_jobs_archive` en una transacción.
+
+    Args:
+        db: Sesión de DB.
+        older_than: Solo jobs con `updated_at` anterior.
+        batch_size: Máximo de jobs del lote.
+        archived_at: Timestamp que queda en `archived_at`.
+
+    Returns:
+        int: Jobs movidos.
+    """
+    ids = db.scalars(
+        select(_JOBS.c.id)
+        .where(_JOBS.c.status.in_(FINISHED_STATUSES))
+        .where(_JOBS.c.updated_at < older_than)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        db.rollback()
+        return 0
+
+    names = [column.name for column in _JOBS.columns]
+    db.execute(
+        insert(_ARCHIVE).from_select(
+            [*names, "archived_at"],
+            select(
+                *[_JOBS.c[name] for name in names],
+                literal(archived_at, DateTime(timezone=False)),
+            ).where(_JOBS.c.id.in_(ids)),
+        )
+    )
+    db.execute(delete(_JOBS).where(_JOBS.c.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+
+def archive_finished_jobs(db: Session, *, older_than: datetime, batch_size: int = 1000) -> int:
+    """Mueve los jobs DONE/ERROR antiguos de `print_jobs` a `print_jobs_archive`.
+
+    Trabaja en lotes de `batch_size` (una transacción cada uno) para no
+    retener bloqueos largos sobre la cola mientras los workers reclaman.
+
+    Args:
+        db: Sesión de DB.
+        older_than: Solo jobs con `updated_at` anterior (ver `archive_cutoff`).
+        batch_size: Jobs por transacción.
+
+    Returns:
+        int: Total de jobs archivados.
+    """
+    batch_size = max(1, int(batch_size))
+    archived_at = datetime.now()
+    total = 0
+    while True:
+        moved = _archive_batch(db, older_than=older_than, batch_size=batch_size, archived_at=archived_at)
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+def _add_months(day: date, months: int) -> date:
+    """Primer día del mes que está `months` meses después del mes de `day`."""
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def ensure_event_partitions(db: Session, *, months_ahead: int = 2, today: date | None = None) -> int:
+    """Crea las particiones mensuales de eventos del mes actual y los siguientes.
+
+    Usa la función `printing.ensure_status_event_partitions` de
+    `scripts/init_db.sql`. Lo que cae fuera de las particiones creadas va a la
+    partición DEFAULT, y se reubica al crear la partición de ese mes.
+
+    En motores distintos de PostgreSQL (por ejemplo SQLite en tests) no hace nada.
+
+    Args:
+        db: Sesión de DB.
+        months_ahead: Meses futuros a dejar creados.
+        today: Día de referencia. Por defecto, hoy.
+
+    Returns:
+        int: Particiones creadas.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    first = _add_months(today or date.today(), 0)
+    created = db.scalar(
+        text("SELECT printing.ensure_status_event_partitions(:from_month, :to_month)"),
+        {"from_month": first, "to_month": _add_months(first, max(0, months_ahead))},
+    )
+    db.commit()
+    return int(created or 0)
+
+
+def ensure_history_view(db: Session) -> bool:
+    """Crea (o reemplaza) la vista `printing.print_jobs_all`: cola + archivo.
+
+    `scripts/init_db.sql` solo puede crearla si las tablas ya existen, y en
+    una instalación nueva las crea la app después. Por eso la crea también
+    `python -m printing_queue.maintenance archive`.
+
+    En motores distintos de PostgreSQL (por ejemplo SQLite en tests) no hace nada.
+
+    Args:
+        db: Sesión de DB (las tablas ya deben existir).
+
+    Returns:
+        bool: True si se creó o reemplazó la vista.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    columns = ", ".join(HISTORY_VIEW_COLUMNS)
+    db.execute(
+        text(
+            "CREATE OR REPLACE VIEW printing.print_jobs_all AS "
+            f"SELECT {columns}, NULL::timestamp AS archived_at FROM printing.print_jobs "
+            "UNION ALL "
+            f"SELECT {columns}, archived_at FROM printing.print_jobs_archive"
+        )
+    )
+    db.commit()
+    return True
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from printing_queue.config.settings import settings
+from printing_queue.infra.job_status_events import LEASED_STATUSES, transition_job
+from printing_queue.models import PrintJob, PrintJobStatus
+
+
+def retry_delay(attempts: int, *, rng: random.Random | None = None) -> float:
+    """Calcula la espera antes del próximo intento (backoff exponencial con jitter).
+
+    La espera nominal es `RETRY_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)`,
+    acotada a `RETRY_BACKOFF_MAX_SECONDS`. Se sortea entre la mitad y el total
+    de ese valor para que varios jobs que fallaron juntos (ej. caída de Sheets)
+    no vuelvan todos en el mismo instante.
+
+    Args:
+        attempts: Intentos ya consumidos (1 tras la primera falla).
+        rng: Generador aleatorio (para tests). Por defecto, `random`.
+
+    Returns:
+        float: Segundos a esperar.
+    """
+    exponent = max(0, attempts - 1)
+    nominal = min(
+        float(settings.RETRY_BACKOFF_MAX_SECONDS),
+        settings.RETRY_BACKOFF_BASE_SECONDS * (2.0 ** min(exponent, 30)),
+    )
+    return (rng or random).uniform(nominal / 2, nominal)
+
+
+def retry_or_fail(
+    db: Session,
+    job: PrintJob,
+    error: str,
+    *,
+    source: str,
+    changed_at: datetime | None = None,
+    **changes: Any,
+) -> bool:
+    """Reprograma un job en curso que falló o lo deja en ERROR si agotó intentos.
+
+    GENERATING vuelve a PENDING y PRINTING a READY, con `available_at` según
+    `retry_delay`; `error_msg` guarda la última falla para diagnóstico.
+
+    Args:
+        db: Sesión de DB.
+        job: Job en GENERATING o PRINTING.
+        error: Descripción de la falla.
+        source: Fuente del cambio para el evento.
+        changed_at: Timestamp del cambio. Por defecto, ahora.
+        **changes: Otros atributos del job a guardar en la misma transacción
+            (por ejemplo el `payload` con el avance del intento).
+
+    Returns:
+        bool: True si quedó reprogramado; False si quedó en ERROR.
+    """
+    changed_at = changed_at or datetime.now()
+    retry_status = LEASED_STATUSES.get(job.status)
+    if retry_status is None or job.attempts >= job.max_attempts:
+        transition_job(
+            db,
+            job,
+            PrintJobStatus.ERROR,
+            source=source,
+            changed_at=changed_at,
+            error_msg=error,
+            **changes,
+        )
+        return False
+
+    transition_job(
+        db,
+        job,
+        retry_status,
+        source=source,
+        changed_at=changed_at,
+        error_msg=error,
+        available_at=changed_at + timedelta(seconds=retry_delay(job.attempts)),
+        **changes,
+    )
+    return True
@@ -0,0 +1,81 @@
+"""Tareas de mantenimiento de la cola (programar a diario, ej. Task Scheduler).
+
+Uso::
+
+    python -m printing_queue.maintenance archive [--older-than-days N] [--batch-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from printing_queue.config.settings import settings
+from printing_queue.db import SessionLocal
+from printing_queue.infra.logging import get_logger
+from printing_queue.infra.retention import (
+    archive_cutoff,
+    archive_finished_jobs,
+    ensure_event_partitions,
+    ensure_history_view,
+)
+
+logger = get_logger(__name__)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Construye el parser de la CLI.
+
+    Returns:
+        argparse.ArgumentParser: Parser con el subcomando `archive`.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m printing_queue.maintenance",
+        description="Mantenimiento de printing.print_jobs y sus eventos.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive = commands.add_parser(
+        "archive",
+        help=(
+            "Crea particiones mensuales de eventos, archiva jobs DONE/ERROR antiguos "
+            "y crea la vista printing.print_jobs_all."
+        ),
+    )
+    archive.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    archive.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    archive.add_argument("--months-ahead", type=int, default=settings.EVENT_PARTITIONS_AHEAD_MONTHS)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Punto de entrada de la CLI.
+
+    Args:
+        argv: Argumentos (sin el nombre del programa). Por defecto, `sys.argv`.
+
+    Returns:
+        int: Código de salida.
+    """
+    args = _build_parser().parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        partitions = ensure_event_partitions(db, months_ahead=args.months_ahead)
+        archived = archive_finished_jobs(
+            db,
+            older_than=archive_cutoff(args.older_than_days),
+            batch_size=args.batch_size,
+        )
+        history_view = ensure_history_view(db)
+    finally:
+        db.close()
+
+    logger.info(f"Particiones de eventos creadas: {partitions}")
+    logger.info(f"Jobs archivados (> {args.older_than_days} días): {archived}")
+    if history_view:
+        logger.info("Vista printing.print_jobs_all actualizada")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
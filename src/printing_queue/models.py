@@ -1,5 +1,25 @@
 """Compat shim: import ORM models from `printing_queue.infra.models`."""
 
-from printing_queue.infra.models import Base, PrintJob, PrintJobStatus, PrintJobStatusEvent, PrintJobType
+from printing_queue.infra.models import (
+    JOB_PRIORITY_DEFAULT,
+    JOB_PRIORITY_LOWEST,
+    JOB_PRIORITY_URGENT,
+    Base,
+    PrintJob,
+    PrintJobArchive,
+    PrintJobStatus,
+    PrintJobStatusEvent,
+    PrintJobType,
+)
 
-__all__ = ["Base", "PrintJob", "PrintJobStatus", "PrintJobStatusEvent", "PrintJobType"]
+__all__ = [
+    "JOB_PRIORITY_DEFAULT",
+    "JOB_PRIORITY_LOWEST",
+    "JOB_PRIORITY_URGENT",
+    "Base",
+    "PrintJob",
+    "PrintJobArchive",
+    "PrintJobStatus",
+    "PrintJobStatusEvent",
+    "PrintJobType",
+]
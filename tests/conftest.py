@@ -2,8 +2,14 @@ from __future__ import annotations
 
 import os
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
 
 def _ensure_src_on_path() -> None:
     """Agrega `src` al `sys.path` para imports de test locales."""
@@ -23,4 +29,50 @@ def _seed_required_env() -> None:
 
 
 _ensure_src_on_path()
-_seed_required_env()
\ No newline at end of file
+_seed_required_env()
+
+
+@pytest.fixture
+def queue_db() -> Iterator[Session]:
+    """Sesión sobre una cola SQLite en memoria con el schema `printing`.
+
+    SQLite no tiene schemas: se adjunta una segunda base en memoria llamada
+    `printing` para que los modelos ORM se creen sin cambios.
+
+    Yields:
+        Session: Sesión lista para usar con `PrintJob`/`PrintJobStatusEvent`.
+    """
+
+    from printing_queue.models import Base
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _attach_printing_schema(dbapi_connection, _record) -> None:
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS printing")
+
+    # Como en PostgreSQL (`scripts/init_db.sql`), la tabla de eventos no la
+    # crea `create_all`: SQLite no admite autoincrement en la PK compuesta
+    # `(id, occurred_at)`, así que aquí `id` es la PK.
+    events = Base.metadata.tables["printing.print_job_status_events"]
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[table for table in Base.metadata.sorted_tables if table is not events],
+    )
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE printing.print_job_status_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, job_id INTEGER NOT NULL, "
+            "from_status VARCHAR(10), to_status VARCHAR(10) NOT NULL, "
+            "occurred_at DATETIME NOT NULL, source VARCHAR(50))"
+        )
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -5,9 +5,17 @@ from datetime import date
 
 import pandas as pd
 import pytest
+from fastapi import Response
+from sqlalchemy.orm import Session
 
 import create_prints_server.app.api as create_api
-from create_prints_server.infra.documents_provider import DocumentQuery
+from create_prints_server.infra.documents_provider import (
+    DocumentQuery,
+    EgresoSummary,
+    summarize_egresos,
+)
+from create_prints_server.infra.response_cache import ResponseCache
+from create_prints_server.infra.sheets_cache import SheetsTableCache
 
 
 def _build_egreso_frame() -> pd.DataFrame:
@@ -60,6 +68,37 @@ class _StubProvider:
         self.queries.append(query)
         return self.frame.copy(deep=True)
 
+    def aggregate_egresos(self, day: date) -> list[EgresoSummary]:
+        """Resume el frame de prueba como el fallback de Sheets.
+
+        Args:
+            day: Fecha solicitada por la API.
+
+        Returns:
+            list[EgresoSummary]: Una fila por venta.
+        """
+
+        return summarize_egresos(
+            self.load_orders_frame(DocumentQuery(day=day, allowed_types=["EGRESO"]))
+        )
+
+
+@pytest.fixture(autouse=True)
+def egresos_cache(monkeypatch: pytest.MonkeyPatch) -> ResponseCache:
+    """Cache de respuestas de `/api/egresos` vacío para cada test.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+
+    Returns:
+        ResponseCache: Cache usado por la API durante el test.
+    """
+
+    cache = ResponseCache(max_entries=8)
+    monkeypatch.setattr(create_api, "get_egresos_cache", lambda: cache)
+    monkeypatch.delenv("DOCUMENTS_DATA_SOURCE", raising=False)
+    return cache
+
 
 def test_list_egresos_uses_provider_and_builds_labels(
     monkeypatch: pytest.MonkeyPatch,
@@ -73,7 +112,7 @@ def test_list_egresos_uses_provider_and_builds_labels(
     provider = _StubProvider(_build_egreso_frame())
     monkeypatch.setattr(create_api, "build_documents_provider", lambda: provider)
 
-    result = create_api.list_egresos(day=date(2026, 2, 18))
+    result = create_api.list_egresos(Response(), day=date(2026, 2, 18), if_none_match=None)
 
     assert len(result) == 1
     assert result[0].venta_id == "101"
@@ -96,6 +135,140 @@ def test_list_egresos_returns_empty_list_when_no_rows(
     provider = _StubProvider(pd.DataFrame())
     monkeypatch.setattr(create_api, "build_documents_provider", lambda: provider)
 
-    result = create_api.list_egresos(day=date(2026, 2, 18))
+    result = create_api.list_egresos(Response(), day=date(2026, 2, 18), if_none_match=None)
+
+    assert result == []
+
+
+def test_list_egresos_caches_by_day_and_answers_304_on_matching_etag(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica el cache por día y la revalidación con `If-None-Match`.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+    """
+
+    provider = _StubProvider(_build_egreso_frame())
+    monkeypatch.setattr(create_api, "build_documents_provider", lambda: provider)
+    monkeypatch.setattr(create_api, "_today_in_config_timezone", lambda: date(2026, 2, 18))
+
+    today = Response()
+    first = create_api.list_egresos(today, day=date(2026, 2, 18), if_none_match=None)
+    revalidated = create_api.list_egresos(
+        Response(), day=date(2026, 2, 18), if_none_match=today.headers["ETag"]
+    )
+    past = Response()
+    create_api.list_egresos(past, day=date(2026, 2, 17), if_none_match=None)
+
+    assert len(provider.queries) == 2
+    assert first[0].venta_id == "101"
+    assert today.headers["Cache-Control"] == "private, no-cache"
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == today.headers["ETag"]
+    assert past.headers["Cache-Control"] == "private, max-age=600"
+
+
+def test_response_cache_expires_and_evicts_least_recently_used() -> None:
+    """Verifica vencimiento por TTL y el límite LRU del cache de respuestas."""
+
+    now = [0.0]
+    loads: list[str] = []
+    cache = ResponseCache(max_entries=2, clock=lambda: now[0])
+
+    def load(key: str):
+        return cache.get_or_load(key, lambda: loads.append(key) or [key], ttl_seconds=10)
+
+    load("a")
+    load("b")
+    load("a")
+    load("c")  # expulsa "b", el menos usado
+    load("a")
+    load("b")
+    now[0] = 11.0
+    etag = load("b").etag
+    load("b")
+
+    assert loads == ["a", "b", "c", "b", "b"]
+    assert etag == load("b").etag
+
+
+def test_enqueue_generate_request_validates_priority_range() -> None:
+    """Verifica el default y el rango de `priority` al encolar."""
+
+    assert create_api.EnqueueGenerateRequest(what="both").priority == 5
+    assert create_api.EnqueueGenerateRequest(what="egreso", venta_id="101", priority=0).priority == 0
+    with pytest.raises(ValueError):
+        create_api.EnqueueGenerateRequest(what="both", priority=10)
+
+
+def test_enqueue_generate_returns_existing_job_for_duplicate_request(queue_db: Session) -> None:
+    """Verifica que un doble click no encole dos veces la misma generación.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    req = create_api.EnqueueGenerateRequest(what="both", day=date(2026, 2, 18))
+
+    first = create_api.enqueue_generate(req, db=queue_db, idempotency_key_header=None)
+    again = create_api.enqueue_generate(req, db=queue_db, idempotency_key_header=None)
+    other_day = create_api.enqueue_generate(
+        create_api.EnqueueGenerateRequest(what="both", day=date(2026, 2, 19)),
+        db=queue_db,
+        idempotency_key_header=None,
+    )
+
+    assert first.duplicate is False
+    assert again.id == first.id and again.duplicate is True
+    assert other_day.id != first.id
+
+
+def test_enqueue_generate_scopes_idempotency_key_to_the_request(queue_db: Session) -> None:
+    """Verifica que reusar un `Idempotency-Key` con otro pedido no lo deduplique.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    req = create_api.EnqueueGenerateRequest(what="both", day=date(2026, 2, 18))
+
+    first = create_api.enqueue_generate(req, db=queue_db, idempotency_key_header="click-1")
+    again = create_api.enqueue_generate(req, db=queue_db, idempotency_key_header="click-1")
+    other = create_api.enqueue_generate(
+        create_api.EnqueueGenerateRequest(what="egreso", day=date(2026, 2, 18), venta_id="101"),
+        db=queue_db,
+        idempotency_key_header="click-1",
+    )
+
+    assert again.id == first.id and again.duplicate is True
+    assert other.id != first.id and other.duplicate is False
+
+
+def test_invalidate_sheets_cache_drops_requested_sheets(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica el endpoint de invalidación y los contadores del cache de Sheets.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+    """
+
+    cache = SheetsTableCache()
+    cache.put("sheet-id", "CLIENTES", "A1:K", pd.DataFrame({"nombre": ["Ana"]}))
+    cache.put("sheet-id", "VENTAS", "A1:H", pd.DataFrame({"id": ["1"]}))
+    cache.get("sheet-id", "CLIENTES", "A1:K", ttl_seconds=60)
+    monkeypatch.setattr(create_api, "get_sheets_table_cache", lambda: cache)
+
+    partial = create_api.invalidate_sheets_cache(
+        create_api.SheetsCacheInvalidateRequest(sheets=["CLIENTES"])
+    )
+    full = create_api.invalidate_sheets_cache(None)
 
-    assert result == []
\ No newline at end of file
+    assert partial.invalidated == 1
+    assert partial.sheets["CLIENTES"] == {"hits": 1, "misses": 0, "cached": 0}
+    assert partial.sheets["VENTAS"]["cached"] == 1
+    assert full.invalidated == 1
+    assert create_api.sheets_cache_stats().sheets == {
+        "CLIENTES": {"hits": 1, "misses": 0, "cached": 0}
+    }
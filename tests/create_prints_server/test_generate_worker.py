@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.orm import Session
+
+import create_prints_server.worker.generate_worker as generate_worker
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobType
+
+
+@pytest.mark.parametrize(
+    ("argv", "env", "expected"),
+    [
+        ([], None, ("worker", None)),
+        (["--processes", "4"], None, ("pool", 4)),
+        ([], "3", ("pool", 3)),
+        (["--processes", "1"], "3", ("worker", None)),
+    ],
+)
+def test_main_selects_single_worker_or_pool(
+    monkeypatch: pytest.MonkeyPatch,
+    argv: list[str],
+    env: str | None,
+    expected: tuple[str, int | None],
+) -> None:
+    """Verifica que `--processes`/`GENERATE_WORKERS` elijan el modo de ejecución.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+        argv: Argumentos de la CLI.
+        env: Valor de `GENERATE_WORKERS` (None = sin definir).
+        expected: Modo esperado y cantidad de procesos.
+    """
+
+    calls: list[tuple[str, int | None]] = []
+    monkeypatch.setattr(generate_worker, "run_worker", lambda: calls.append(("worker", None)))
+    monkeypatch.setattr(generate_worker, "run_pool", lambda n: calls.append(("pool", n)))
+    if env is None:
+        monkeypatch.delenv("GENERATE_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("GENERATE_WORKERS", env)
+
+    generate_worker.main(argv)
+
+    assert calls == [expected]
+
+
+def test_run_loop_returns_when_stop_event_is_set(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verifica que un hijo del pool salga sin reclamar si ya se pidió apagar.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+    """
+
+    stop_event = generate_worker.multiprocessing.get_context("spawn").Event()
+    stop_event.set()
+    monkeypatch.setattr(generate_worker, "_claim_jobs", lambda *_a: pytest.fail("no debe reclamar"))
+
+    generate_worker._run_loop(stop_event)
+
+
+def test_wait_for_jobs_returns_soon_after_stop_is_requested(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica que la espera de NOTIFY se corte en tramos al pedir apagado.
+
+    Args:
+        monkeypatch: Fixture de pytest para ajustar settings.
+    """
+
+    class _Listener:
+        enabled = True
+
+        def __init__(self) -> None:
+            self.timeouts: list[float | None] = []
+
+        def wait(self, timeout: float | None = None) -> bool:
+            self.timeouts.append(timeout)
+            if len(self.timeouts) == 2:
+                stop_event.set()
+            return False
+
+    monkeypatch.setattr(generate_worker.settings, "NOTIFY_FALLBACK_SECONDS", 30)
+    stop_event = generate_worker.multiprocessing.get_context("spawn").Event()
+    listener = _Listener()
+
+    generate_worker._wait_for_jobs(listener, None, stop_event)
+
+    assert len(listener.timeouts) == 2
+    assert all(t <= generate_worker.STOP_CHECK_SECONDS for t in listener.timeouts)
+
+
+def test_claim_jobs_uses_generate_claim_batch_size(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verifica que la generación reclame con su propio tamaño de lote.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+    """
+
+    sizes: list[int] = []
+    monkeypatch.setattr(generate_worker.settings, "CLAIM_BATCH_SIZE", 5)
+    monkeypatch.setattr(generate_worker.settings, "GENERATE_CLAIM_BATCH_SIZE", 1)
+    monkeypatch.setattr(
+        generate_worker, "claim_batch", lambda _db, n, **_kwargs: sizes.append(n) or []
+    )
+
+    assert generate_worker._claim_jobs(None, "generate_worker@host:1") == []
+    assert sizes == [1]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"date": "2026-02-18"},
+        {"what": "both"},
+        {"what": "both", "date": "18/02/2026"},
+        {"what": "labels", "date": "2026-02-18"},
+        {"what": "egreso", "date": "2026-02-18"},
+    ],
+)
+def test_invalid_payloads_go_straight_to_error(
+    queue_db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    payload: dict[str, str],
+) -> None:
+    """Verifica que un payload inválido deje el job en ERROR sin reintentos.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+        payload: Payload del job.
+    """
+
+    monkeypatch.setattr(
+        generate_worker, "generate_pdfs", lambda **_kwargs: pytest.fail("no debe generar")
+    )
+    job = PrintJob(
+        job_type=PrintJobType.SHIPPING_DOCS,
+        status=PrintJobStatus.GENERATING,
+        payload=payload,
+        attempts=1,
+        max_attempts=3,
+        locked_by="generate_worker@host:1",
+    )
+    queue_db.add(job)
+    queue_db.commit()
+
+    generate_worker._process_job(queue_db, job)
+
+    assert job.status == PrintJobStatus.ERROR
+    assert job.attempts == 1
+    assert job.locked_by is None
+    assert job.error_msg.startswith("payload.")
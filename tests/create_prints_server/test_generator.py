@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
@@ -93,6 +97,7 @@ def test_generate_pdfs_shipping_list_uses_provider_and_creates_pdf(
     assert artifacts.guides_path is None
     assert Path(artifacts.shipping_list_path).exists()
     assert provider.queries[0].allowed_types == ["DESPACHO"]
+    assert provider.queries[0].fresh is True
 
 
 def test_generate_pdfs_egreso_uses_venta_id_and_creates_guide(
@@ -120,11 +125,35 @@ def test_generate_pdfs_egreso_uses_venta_id_and_creates_guide(
     assert artifacts.shipping_list_path is None
     assert artifacts.guides_path is not None
     assert Path(artifacts.guides_path).exists()
-    assert Path(artifacts.guides_path).name == "guides_egreso_20260218.pdf"
+    assert Path(artifacts.guides_path).name == "guides_egreso_101_20260218.pdf"
     assert provider.queries[0].allowed_types == ["EGRESO"]
     assert provider.queries[0].venta_id == "101"
 
 
+def test_generate_pdfs_egresos_of_the_same_day_do_not_collide(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que dos egresos del mismo día escriban archivos distintos.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        tmp_path: Carpeta temporal para artefactos.
+    """
+
+    provider = _StubProvider(_build_orders_frame())
+    monkeypatch.setattr(generator, "build_documents_provider", lambda: provider)
+    monkeypatch.setenv("PDF_ORDERS_PATH", str(tmp_path / "shipping_list.pdf"))
+    monkeypatch.setenv("PDF_GUIDES_PATH", str(tmp_path / "guides.pdf"))
+
+    first = generator.generate_pdfs(what="egreso", day=date(2026, 2, 18), venta_id="101")
+    second = generator.generate_pdfs(what="egreso", day=date(2026, 2, 18), venta_id="102")
+
+    assert first.guides_path != second.guides_path
+    assert Path(first.guides_path).exists()
+    assert Path(second.guides_path).exists()
+
+
 def test_generate_pdfs_guides_keeps_orders_with_factura_despacho_true(
     monkeypatch: pytest.MonkeyPatch,
     tmp_path: Path,
@@ -174,4 +203,219 @@ def test_generate_pdfs_raises_when_provider_returns_no_orders(
         generator.generate_pdfs(
             what="shipping_list",
             day=date(2026, 2, 18),
-        )
\ No newline at end of file
+        )
+
+
+class _InlinePool:
+    """Pool doble que ejecuta cada tarea al enviarla y registra los envíos."""
+
+    def __init__(self) -> None:
+        """Inicializa el registro de tareas enviadas."""
+
+        self.submitted: list[tuple] = []
+
+    def submit(self, fn, *args) -> Future:
+        """Ejecuta `fn(*args)` y devuelve un `Future` ya resuelto.
+
+        Args:
+            fn: Función a ejecutar.
+            *args: Argumentos de la tarea.
+
+        Returns:
+            Future: Resultado o excepción de la tarea.
+        """
+
+        self.submitted.append(args)
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+def test_generate_pdfs_both_renders_documents_in_render_pool(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que `what=both` envíe ambos renders al pool y junte los artefactos.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        tmp_path: Carpeta temporal para artefactos.
+    """
+
+    pool = _InlinePool()
+    provider = _StubProvider(_build_orders_frame())
+    monkeypatch.setattr(generator, "build_documents_provider", lambda: provider)
+    monkeypatch.setattr(generator, "_get_render_pool", lambda: pool)
+    monkeypatch.setenv("PDF_ORDERS_PATH", str(tmp_path / "shipping_list.pdf"))
+    monkeypatch.setenv("PDF_GUIDES_PATH", str(tmp_path / "guides.pdf"))
+    monkeypatch.setenv("PDF_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RENDER_WORKERS", "2")
+
+    artifacts = generator.generate_pdfs(what="both", day=date(2026, 2, 18))
+
+    assert [task[0] for task in pool.submitted] == ["shipping_list", "guides"]
+    assert Path(artifacts.shipping_list_path).exists()
+    assert Path(artifacts.guides_path).exists()
+    assert artifacts.orders_count == 1
+
+
+def test_generate_pdfs_both_reraises_render_error_in_serial_order(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que un error de render en el pool se propague sin cambios.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        tmp_path: Carpeta temporal para artefactos.
+    """
+
+    def _failing_render(kind: str, *_args: object) -> str:
+        raise RuntimeError(f"fallo {kind}")
+
+    monkeypatch.setattr(generator, "build_documents_provider", lambda: _StubProvider(_build_orders_frame()))
+    monkeypatch.setattr(generator, "_get_render_pool", _InlinePool)
+    monkeypatch.setattr(generator, "_render_document", _failing_render)
+    monkeypatch.setenv("PDF_ORDERS_PATH", str(tmp_path / "shipping_list.pdf"))
+    monkeypatch.setenv("PDF_GUIDES_PATH", str(tmp_path / "guides.pdf"))
+    monkeypatch.setenv("PDF_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RENDER_WORKERS", "2")
+
+    with pytest.raises(RuntimeError, match="fallo shipping_list"):
+        generator.generate_pdfs(what="both", day=date(2026, 2, 18))
+
+
+def test_generate_pdfs_splits_large_guides_in_page_chunks(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que las guías grandes se rendericen por tramos y se unan en orden.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        tmp_path: Carpeta temporal para artefactos.
+    """
+
+    from pypdf import PdfReader
+
+    frame = pd.concat(
+        [_build_orders_frame().assign(venta_id=str(100 + index)) for index in range(7)],
+        ignore_index=True,
+    )
+    pool = _InlinePool()
+    monkeypatch.setattr(generator, "build_documents_provider", lambda: _StubProvider(frame))
+    monkeypatch.setattr(generator, "_get_render_pool", lambda: pool)
+    monkeypatch.setenv("PDF_ORDERS_PATH", str(tmp_path / "shipping_list.pdf"))
+    monkeypatch.setenv("PDF_GUIDES_PATH", str(tmp_path / "guides.pdf"))
+    monkeypatch.setenv("PDF_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RENDER_WORKERS", "2")
+    monkeypatch.setenv("GUIDES_CHUNK_PAGES", "1")
+
+    artifacts = generator.generate_pdfs(what="guides", day=date(2026, 2, 18))
+
+    assert [len(task[0]) for task in pool.submitted] == [3, 3, 1]
+    assert len(PdfReader(artifacts.guides_path).pages) == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["guides_20260218.pdf"]
+
+
+def test_run_in_render_pool_times_out_and_recycles_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verifica que un render colgado no bloquee el job: error y pool reciclado.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+    """
+
+    class _HungPool:
+        def submit(self, *_args: object) -> Future:
+            return Future()
+
+    resets: list[bool] = []
+    monkeypatch.setattr(generator, "_get_render_pool", _HungPool)
+    monkeypatch.setattr(generator, "_render_timeout_seconds", lambda: 0.05)
+    monkeypatch.setattr(generator, "_reset_render_pool", lambda *, kill=False: resets.append(kill))
+
+    with pytest.raises(generator.RenderTimeoutError):
+        generator._run_in_render_pool([(print, ("a",)), (print, ("b",))])
+
+    assert resets == [True]
+
+
+def test_reset_render_pool_kill_terminates_hung_render_processes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica que un render colgado en el pool real termine al reciclarlo.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+    """
+
+    monkeypatch.setenv("RENDER_WORKERS", "2")
+    monkeypatch.setattr(generator, "_render_timeout_seconds", lambda: 0.5)
+    pool = generator._get_render_pool()
+    # Espera a que los procesos arranquen (y reporten su PID) antes de colgarlos.
+    pool.submit(os.getpid).result(timeout=60)
+
+    with pytest.raises(generator.RenderTimeoutError):
+        generator._run_in_render_pool([(time.sleep, (60,)), (time.sleep, (60,))])
+
+    deadline = time.monotonic() + 10
+    while multiprocessing.active_children() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert multiprocessing.active_children() == []
+    assert generator._render_pool is None
+
+
+@pytest.mark.parametrize(
+    ("cpus", "generate_workers", "expected"),
+    [(8, "1", 4), (8, "4", 2), (4, "4", 1), (1, "1", 1), (1, None, 1)],
+)
+def test_render_workers_splits_cpus_between_generate_processes(
+    monkeypatch: pytest.MonkeyPatch,
+    cpus: int,
+    generate_workers: str | None,
+    expected: int,
+) -> None:
+    """Verifica que cada proceso de generación use su parte de los CPUs.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        cpus: CPUs de la máquina.
+        generate_workers: Valor de `GENERATE_WORKERS` (None = sin definir).
+        expected: Procesos de render esperados.
+    """
+
+    monkeypatch.setattr(generator.os, "cpu_count", lambda: cpus)
+    monkeypatch.delenv("RENDER_WORKERS", raising=False)
+    if generate_workers is None:
+        monkeypatch.delenv("GENERATE_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("GENERATE_WORKERS", generate_workers)
+
+    assert generator._render_workers() == expected
+
+
+def test_generate_pdfs_renders_in_process_without_spare_cpus(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que sin CPUs para un pool `what=both` se renderice en serie.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        tmp_path: Carpeta temporal para artefactos.
+    """
+
+    monkeypatch.setattr(generator, "build_documents_provider", lambda: _StubProvider(_build_orders_frame()))
+    monkeypatch.setattr(generator, "_get_render_pool", lambda: pytest.fail("no debe usar el pool"))
+    monkeypatch.setenv("PDF_ORDERS_PATH", str(tmp_path / "shipping_list.pdf"))
+    monkeypatch.setenv("PDF_GUIDES_PATH", str(tmp_path / "guides.pdf"))
+    monkeypatch.setenv("PDF_CACHE_ENABLED", "false")
+    monkeypatch.setenv("RENDER_WORKERS", "1")
+
+    artifacts = generator.generate_pdfs(what="both", day=date(2026, 2, 18))
+
+    assert Path(artifacts.shipping_list_path).exists()
+    assert Path(artifacts.guides_path).exists()
@@ -145,3 +145,37 @@ def test_receipt_stub_keeps_amount_between_checkboxes_and_signature() -> None:
     assert gap_to_checkboxes >= 12
     assert monto_y >= signature_y + 14
     assert gap_to_checkboxes < gap_to_signature
+
+
+def test_chunked_guides_merge_to_same_pages_as_single_render(tmp_path: Path) -> None:
+    """Verifica que renderizar por tramos y unir dé las mismas páginas en orden.
+
+    Args:
+        tmp_path: Carpeta temporal para los PDFs de prueba.
+    """
+
+    from pypdf import PdfReader
+
+    from create_prints_server.render.pdf_merge import merge_pdfs
+
+    guides = [_build_guide(index) for index in range(1, 8)]
+    out = SimpleNamespace(contact="", logo_path=None, max_items=5)
+
+    chunks = guides_pdf.split_guides_in_chunks(guides, pages_per_chunk=1)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+
+    parts = []
+    for index, chunk in enumerate(chunks):
+        part = str(tmp_path / f"part{index}.pdf")
+        guides_pdf.render_guides_pdf(chunk, out, part)
+        parts.append(part)
+    merge_pdfs(parts, str(tmp_path / "merged.pdf"))
+    guides_pdf.render_guides_pdf(guides, out, str(tmp_path / "single.pdf"))
+
+    merged = PdfReader(str(tmp_path / "merged.pdf"))
+    single = PdfReader(str(tmp_path / "single.pdf"))
+    assert len(merged.pages) == len(single.pages) == 3
+    assert [page.extract_text() for page in merged.pages] == [
+        page.extract_text() for page in single.pages
+    ]
+    assert "Cliente 7" in merged.pages[2].extract_text()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from create_prints_server.domain.money import parse_cl_number
+
+
+def _reference_parse(value: object) -> float:
+    """Conversión celda a celda de la implementación original de `parse_cl_number`.
+
+    Args:
+        value: Celda de una columna no numérica.
+
+    Returns:
+        float: Número convertido o NaN.
+    """
+
+    x = re.sub(r"[^\d,\.\-]", "", str(value).strip())
+    if x == "":
+        return np.nan
+    if "," in x and "." in x:
+        x = x.replace(".", "").replace(",", ".")
+    elif "," in x:
+        x = x.replace(",", ".")
+    elif x.count(".") > 1:
+        x = x.replace(".", "")
+    elif x.count(".") == 1:
+        left, right = x.split(".")
+        if len(right) == 3 and 1 <= len(left) <= 3:
+            x = left + right
+    try:
+        return float(x)
+    except ValueError:
+        return np.nan
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("3,0", 3.0),
+        ("$2.000", 2000.0),
+        ("$14.500", 14500.0),
+        ("2.000,50", 2000.5),
+        ("20.00", 20.0),
+        ("1.234.567", 1234567.0),
+        ("1234.567", 1234.567),
+        ("-$1.500", -1500.0),
+        (" 15 kg ", 15.0),
+        ("", np.nan),
+        (None, np.nan),
+        ("abc", np.nan),
+        ("1-2", np.nan),
+        ("1\x002", 12.0),
+    ],
+)
+def test_parse_cl_number_documented_cases(raw: object, expected: float) -> None:
+    """Verifica los formatos documentados y los casos inválidos.
+
+    Args:
+        raw: Celda de entrada.
+        expected: Valor esperado.
+    """
+
+    result = parse_cl_number(pd.Series(["0", raw], dtype=object))
+
+    np.testing.assert_array_equal(result.to_numpy()[1:], np.array([expected]))
+
+
+def test_parse_cl_number_matches_cell_by_cell_reference_on_random_inputs() -> None:
+    """Compara la versión vectorizada con la original sobre entradas aleatorias.
+
+    Se generan celdas con dígitos, separadores, signos, símbolos y texto en
+    proporciones que fuerzan todas las ramas (miles, decimal, ambos, inválido).
+    """
+
+    rng = random.Random(2026)
+    alphabet = "0123456789" * 3 + "..,,-$ kgx"
+    cells: list[object] = []
+    for _ in range(5000):
+        cells.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10))))
+    cells += [None, np.nan, 12, 3.5, "٣.٥٠٠", "1.", ".5", "-.5", "--1", "-", "."]
+    series = pd.Series(cells, index=range(100, 100 + len(cells)), name="kg", dtype=object)
+
+    result = parse_cl_number(series)
+    expected = np.array([_reference_parse(cell) for cell in cells])
+
+    assert result.index.equals(series.index)
+    assert result.name == "kg"
+    np.testing.assert_array_equal(result.to_numpy(), expected)
+
+
+def test_parse_cl_number_keeps_numeric_columns() -> None:
+    """Verifica que una columna ya numérica solo se convierta a float."""
+
+    result = parse_cl_number(pd.Series([1, 2, 3]))
+
+    assert result.dtype == float
+    assert result.tolist() == [1.0, 2.0, 3.0]
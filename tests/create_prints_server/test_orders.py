@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from create_prints_server.domain.orders import (
+    Order,
+    as_order,
+    build_daily_orders,
+    build_orders_structure,
+    compact_orders,
+)
+
+
+def _per_group_headers(det_dia: pd.DataFrame) -> list[dict]:
+    """Cabeceras calculadas grupo a grupo, como la implementación original.
+
+    Args:
+        det_dia: Detalle de ventas.
+
+    Returns:
+        list[dict]: Una cabecera por `venta_id`.
+    """
+
+    headers = []
+    for venta_id, g in det_dia.groupby("venta_id", sort=False):
+        r0 = g.iloc[0]
+        fecha = r0.get("fecha")
+        cliente_nombre = str(r0.get("nombre", "") or "")
+        destinatario = str(r0.get("destinatario", "") or "")
+        if destinatario:
+            cliente_nombre = f"{destinatario} ({cliente_nombre})"
+        direccion = str(r0.get("direccion", "") or "")
+        direccion_des = str(r0.get("direccion_destinatario", "") or "")
+        if direccion_des != "nan" and direccion_des:
+            direccion = direccion_des
+        headers.append(
+            {
+                "venta_id": venta_id,
+                "fecha_str": pd.to_datetime(fecha).strftime("%d-%m-%y") if pd.notna(fecha) else "",
+                "cliente_nombre": cliente_nombre,
+                "direccion": direccion,
+                "total_venta": g["precio_total"].sum(skipna=True),
+                "factura_despacho": r0.get("factura_despacho", None),
+            }
+        )
+    return headers
+
+
+def _detail_frame() -> pd.DataFrame:
+    """Construye un detalle con ventas intercaladas y una fila sin `venta_id`.
+
+    Returns:
+        pd.DataFrame: Detalle de ventas compatible con `build_orders_structure()`.
+    """
+
+    return pd.DataFrame(
+        {
+            "venta_id": ["B", "A", "B", None, "A", "C"],
+            "fecha": [pd.Timestamp("2026-02-18")] * 6,
+            "nombre": ["Cli B", "Cli A", "Cli B", "X", "Cli A", "Cli C"],
+            "destinatario": ["", "Dest A", "", "", "Dest A", ""],
+            "direccion": ["Dir B", "Dir A", "Dir B", "", "Dir A", "Dir C"],
+            "direccion_destinatario": ["nan", "Otra A", "nan", "", "Otra A", "nan"],
+            "producto": ["p1", "p2", "p3", "p4", "p5", "p6"],
+            "kg": [1.0, 2.0, np.nan, 4.0, 5.0, 6.0],
+            "precio_unit": [10, 20, 30, 40, 50, 60],
+            "precio_total": [100, 200, 300, 400, 500, 600],
+        }
+    )
+
+
+def test_build_orders_structure_groups_rows_in_first_appearance_order() -> None:
+    """Verifica agrupación, cabeceras e ítems compartidos sin modificar el detalle."""
+
+    frame = _detail_frame()
+    original = frame.copy(deep=True)
+
+    orders = build_orders_structure(frame)
+
+    assert [order.header["venta_id"] for order in orders] == ["B", "A", "C"]
+    assert all(isinstance(order, Order) for order in orders)
+    assert orders[0].items.columns is orders[1].items.columns
+    assert [row.producto for row in orders[0].items.rows()] == ["p1", "p3"]
+    assert [row.producto for row in orders[1].items.rows(limit=1)] == ["p2"]
+    assert orders[0].items.rows()[1].calibre == ""
+    assert orders[1].header["cliente_nombre"] == "Dest A (Cli A)"
+    assert orders[1].header["direccion"] == "Otra A"
+    assert orders[0].header["direccion"] == "Dir B"
+    assert orders[0].header["fecha_str"] == "18-02-26"
+    assert orders[0].header["total_venta"] == 400
+    pd.testing.assert_frame_equal(frame, original)
+
+
+def test_compact_orders_and_legacy_dicts_keep_the_same_rows() -> None:
+    """Verifica que un tramo compactado y el formato dict anterior den las mismas filas."""
+
+    orders = build_orders_structure(_detail_frame())
+
+    compacted = compact_orders(orders[1:])
+    legacy = as_order(
+        {
+            "header": orders[1].header,
+            "items": pd.DataFrame(
+                {"producto": ["p2", "p5"], "kg": [2.0, 5.0], "precio_unit": [20, 50]}
+            ),
+        }
+    )
+
+    assert len(compacted[0].items.columns["producto"]) == 3
+    assert [o.items.rows() for o in compacted] == [o.items.rows() for o in orders[1:]]
+    assert [row.producto for row in legacy.items.rows()] == ["p2", "p5"]
+    assert legacy.items.rows(fill=None)[0].precio_total is None
+
+
+def test_build_orders_structure_headers_match_per_group_computation() -> None:
+    """Verifica que las cabeceras vectorizadas coincidan con el cálculo por grupo."""
+
+    rng = np.random.default_rng(3)
+    size = 400
+    frame = pd.DataFrame(
+        {
+            "venta_id": rng.choice(["10", "11", "12", "13", None, "14", "15"], size=size),
+            "fecha": rng.choice(
+                np.array([pd.Timestamp("2026-02-18"), pd.Timestamp("2025-12-31"), pd.NaT]),
+                size=size,
+            ),
+            "nombre": rng.choice(np.array(["Cli", "", None, np.nan, 0], dtype=object), size=size),
+            "destinatario": rng.choice(np.array(["Dest", "", None], dtype=object), size=size),
+            "direccion": rng.choice(np.array(["Dir", np.nan, ""], dtype=object), size=size),
+            "direccion_destinatario": rng.choice(
+                np.array(["nan", "", "Otra", None], dtype=object), size=size
+            ),
+            "factura_despacho": rng.random(size) < 0.5,
+            "producto": "Palta",
+            "kg": rng.random(size),
+            "precio_unit": rng.integers(1, 100, size=size),
+            "precio_total": np.where(rng.random(size) < 0.1, np.nan, rng.random(size) * 1000),
+        }
+    )
+
+    orders = build_orders_structure(frame)
+    expected = _per_group_headers(frame)
+
+    assert [order.header["venta_id"] for order in orders] == [h["venta_id"] for h in expected]
+    for order, header in zip(orders, expected):
+        assert order.header == pytest.approx(header)
+
+
+def _sheet_tables() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Tablas mínimas como vienen de Sheets (ids numéricos, montos en texto).
+
+    Returns:
+        tuple: CLIENTES, DESTINATARIOS, VENTAS y DETALLE_VENTAS.
+    """
+
+    clientes = pd.DataFrame({"id": [1, 2], "nombre": ["Ana", "Beto"]})
+    destinatarios = pd.DataFrame(
+        {"id": [10, 11], "cliente_id": [1, 2], "nombre": ["Local A", "Local B"]}
+    )
+    ventas = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "fecha": ["01/02/2026", "01/02/2026", "02/02/2026", "no es fecha"],
+            "tipo": [" despacho", "EGRESO", "DESPACHO", "DESPACHO"],
+            "cliente": ["Beto", "Ana", "Ana", "Ana"],
+            "destinatario": ["Local B", "Local A", "Local A", "Local A"],
+        }
+    )
+    det = pd.DataFrame(
+        {
+            "venta_id": [1, 3, 1, 2, 9],
+            "producto": ["Palta", "Limón", "Nuez", "Pera", "Kiwi"],
+            "kg": ["10,5", "1", "2", "3", "4"],
+            "precio_unit": ["$1.000", "1", "500", "1", "1"],
+            "precio_total": ["$10.500", "1", "1.000", "3", "4"],
+        }
+    )
+    return clientes, destinatarios, ventas, det
+
+
+def test_build_daily_orders_filters_before_joining_and_keeps_inputs() -> None:
+    """Verifica filtros, joins y tipos de `build_daily_orders` sin mutar las tablas."""
+
+    tables = _sheet_tables()
+    originals = [table.copy() for table in tables]
+
+    det_dia = build_daily_orders(*tables, pd.Timestamp("2026-02-01"), ["DESPACHO"])
+
+    assert det_dia["venta_id"].tolist() == ["1", "1"]
+    assert det_dia["producto"].tolist() == ["Palta", "Nuez"]
+    assert det_dia["nombre"].tolist() == ["Beto", "Beto"]
+    assert det_dia["id_destinatario"].tolist() == ["11", "11"]
+    assert det_dia["tipo"].tolist() == ["DESPACHO", "DESPACHO"]
+    assert det_dia["kg"].tolist() == [10.5, 2.0]
+    assert det_dia["precio_total"].tolist() == [10500, 1000]
+    assert (det_dia["fecha"] == pd.Timestamp("2026-02-01")).all()
+    for table, original in zip(tables, originals):
+        pd.testing.assert_frame_equal(table, original)
+
+
+def test_build_daily_orders_by_venta_id_and_empty_day() -> None:
+    """Verifica el filtro por `venta_id` y el resultado vacío de un día sin ventas."""
+
+    tables = _sheet_tables()
+
+    only = build_daily_orders(*tables, pd.Timestamp("2026-02-01"), None, venta_id="2")
+    empty = build_daily_orders(*tables, pd.Timestamp("2026-03-01"), ["DESPACHO"])
+
+    assert only["producto"].tolist() == ["Pera"]
+    assert only["nombre"].tolist() == ["Ana"]
+    assert empty.empty
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import create_prints_server.app.generator as generator
+from create_prints_server.infra.documents_provider import DocumentQuery
+from create_prints_server.infra.pdf_cache import PdfCache, PdfCacheConfig, frame_digest
+
+
+def _build_orders_frame(kg: float = 100.0) -> pd.DataFrame:
+    """Construye una tabla mínima compatible con `build_orders_structure()`.
+
+    Args:
+        kg: Kilos del único ítem.
+
+    Returns:
+        pd.DataFrame: DataFrame de detalle de una venta.
+    """
+
+    return pd.DataFrame(
+        [
+            {
+                "venta_id": "101",
+                "fecha": pd.Timestamp("2026-02-18"),
+                "nombre": "Cliente Uno",
+                "direccion": "Direccion Cliente 123",
+                "destinatario": "Destinatario Uno",
+                "producto": "Palta Hass",
+                "calibre": "18",
+                "kg": kg,
+                "precio_unit": 1500,
+                "precio_total": int(kg * 1500),
+            }
+        ]
+    )
+
+
+@dataclass
+class _StubProvider:
+    """Provider doble que cuenta lecturas.
+
+    Args:
+        frame: DataFrame que se devolverá en cada consulta.
+        queries: Historial de queries recibidas.
+    """
+
+    frame: pd.DataFrame
+    queries: list[DocumentQuery] = field(default_factory=list)
+
+    def load_orders_frame(self, query: DocumentQuery) -> pd.DataFrame:
+        """Registra la query y devuelve una copia del frame de prueba.
+
+        Args:
+            query: Query solicitada por el generador.
+
+        Returns:
+            pd.DataFrame: Frame de prueba.
+        """
+
+        self.queries.append(query)
+        return self.frame.copy(deep=True)
+
+
+def _cache(tmp_path: Path, *, max_bytes: int = 10**9, max_age_seconds: int = 86400) -> PdfCache:
+    """Crea un cache en una carpeta temporal.
+
+    Args:
+        tmp_path: Carpeta temporal.
+        max_bytes: Tamaño máximo.
+        max_age_seconds: Antigüedad máxima.
+
+    Returns:
+        PdfCache: Cache configurado.
+    """
+
+    return PdfCache(
+        PdfCacheConfig(
+            enabled=True,
+            cache_dir=str(tmp_path / "cache"),
+            max_bytes=max_bytes,
+            max_age_seconds=max_age_seconds,
+        )
+    )
+
+
+def test_frame_digest_ignores_column_order_but_not_values() -> None:
+    """Verifica que el hash dependa del contenido y no del orden de columnas."""
+
+    frame = _build_orders_frame()
+    reordered = frame[list(reversed(frame.columns))]
+    changed = _build_orders_frame(kg=101.0)
+
+    assert frame_digest(frame) == frame_digest(reordered)
+    assert frame_digest(frame) != frame_digest(changed)
+
+
+def test_generate_pdfs_reuses_cached_pdf_for_same_frame(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que la reimpresión del mismo día no vuelva a renderizar.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        tmp_path: Carpeta temporal para artefactos.
+    """
+
+    provider = _StubProvider(_build_orders_frame())
+    monkeypatch.setattr(generator, "build_documents_provider", lambda: provider)
+    monkeypatch.setenv("PDF_ORDERS_PATH", str(tmp_path / "shipping_list.pdf"))
+    monkeypatch.setenv("PDF_GUIDES_PATH", str(tmp_path / "guides.pdf"))
+
+    first = generator.generate_pdfs(what="both", day=date(2026, 2, 18))
+    renders: list[str] = []
+
+    def _fake_render(kind: str):
+        def _render(_orders, _out, pdf_path: str, **_kwargs) -> None:
+            renders.append(kind)
+            Path(pdf_path).write_bytes(b"%PDF-1.4")
+
+        return _render
+
+    monkeypatch.setattr(generator, "render_orders_pdf", _fake_render("orders"))
+    monkeypatch.setattr(generator, "render_guides_pdf", _fake_render("guides"))
+    Path(first.guides_path).unlink()
+
+    second = generator.generate_pdfs(what="both", day=date(2026, 2, 18))
+
+    assert renders == []
+    assert Path(second.guides_path).exists()
+    assert second.orders_count == first.orders_count == 1
+    assert len(provider.queries) == 2
+
+    provider.frame = _build_orders_frame(kg=50.0)
+    generator.generate_pdfs(what="guides", day=date(2026, 2, 18))
+
+    assert renders == ["guides"]
+
+
+def test_pdf_cache_evicts_expired_and_least_recently_used(tmp_path: Path) -> None:
+    """Verifica la expiración por edad y por tamaño total.
+
+    Args:
+        tmp_path: Carpeta temporal.
+    """
+
+    cache = _cache(tmp_path, max_bytes=2500, max_age_seconds=3600)
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    now = time.time()
+    for age, key in [(7200, "expired"), (300, "old"), (200, "mid"), (100, "new")]:
+        entry = cache_dir / f"{key}.pdf"
+        entry.write_bytes(b"x" * 1000)
+        os.utime(entry, (now - age, now - age))
+
+    assert cache.evict(now=now) == 2
+    assert sorted(p.stem for p in (tmp_path / "cache").glob("*.pdf")) == ["mid", "new"]
+
+
+def test_generate_pdfs_prunes_every_dated_output_including_egreso(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que se borren las salidas viejas de despacho, guías y egreso.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de entorno.
+        tmp_path: Carpeta temporal para artefactos.
+    """
+
+    provider = _StubProvider(_build_orders_frame())
+    monkeypatch.setattr(generator, "build_documents_provider", lambda: provider)
+    monkeypatch.setenv("PDF_ORDERS_PATH", str(tmp_path / "shipping_list.pdf"))
+    monkeypatch.setenv("PDF_GUIDES_PATH", str(tmp_path / "guides.pdf"))
+    monkeypatch.setenv("PDF_CACHE_MAX_AGE_DAYS", "14")
+    stale = time.time() - 30 * 86400
+    old_outputs = [
+        "shipping_list_20260101.pdf",
+        "guides_20260101.pdf",
+        "guides_egreso_20260101.pdf",
+        "guides_egreso_102_20260101.pdf",
+    ]
+    for name in [*old_outputs, "manual.pdf"]:
+        path = tmp_path / name
+        path.write_bytes(b"%PDF-1.4")
+        os.utime(path, (stale, stale))
+
+    artifacts = generator.generate_pdfs(what="egreso", day=date(2026, 2, 18), venta_id="101")
+
+    assert not any((tmp_path / name).exists() for name in old_outputs)
+    assert (tmp_path / "manual.pdf").exists()
+    assert Path(artifacts.guides_path).exists()
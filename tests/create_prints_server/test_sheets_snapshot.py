@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import re
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import create_prints_server.infra.documents_provider as documents_provider
+from create_prints_server.infra.sheets_snapshot import (
+    SheetsSnapshotStore,
+    SnapshotConfig,
+    SnapshotSyncer,
+    SnapshotSyncLock,
+    rows_range,
+)
+
+_SHEETS = [
+    ("CLIENTES", "A1:K"),
+    ("DESTINATARIOS", "A1:H"),
+    ("VENTAS", "A1:H"),
+    ("DETALLE_VENTAS", "A1:J"),
+]
+
+
+class _FakeSheetsService:
+    """Doble local de Sheets que responde cualquier sub-rango `hoja!A<n>:<col>`.
+
+    Args:
+        sheets: Filas (header incluido) de cada hoja, desde la fila 1.
+    """
+
+    def __init__(self, sheets: dict[str, list[list[str]]]) -> None:
+        self.sheets = sheets
+        self.ranges: list[list[str]] = []
+
+    def spreadsheets(self) -> "_FakeSheetsService":
+        return self
+
+    def values(self) -> "_FakeSheetsService":
+        return self
+
+    def batchGet(self, **kwargs) -> "_FakeRequest":
+        self.ranges.append(list(kwargs["ranges"]))
+        value_ranges = []
+        for a1 in kwargs["ranges"]:
+            sheet, first_row = re.fullmatch(r"(\w+)!A(\d+):\w+", a1).groups()
+            rows = self.sheets[sheet][int(first_row) - 1 :]
+            value_ranges.append({"range": a1, "values": rows} if rows else {"range": a1})
+        return _FakeRequest({"valueRanges": value_ranges})
+
+
+class _FakeRequest:
+    """Request diferido como los de `googleapiclient`."""
+
+    def __init__(self, response: dict) -> None:
+        self._response = response
+
+    def execute(self) -> dict:
+        return self._response
+
+
+def _sheets() -> dict[str, list[list[str]]]:
+    """Hojas mínimas con shape de Sheets.
+
+    Returns:
+        dict[str, list[list[str]]]: Filas por hoja.
+    """
+
+    return {
+        "CLIENTES": [["id", "nombre", "rut"], ["1", "Cliente Uno", "11.111.111-1"]],
+        "DESTINATARIOS": [["id", "cliente_id", "nombre"], ["10", "1", "Destinatario Uno"]],
+        "VENTAS": [
+            ["id", "fecha", "cliente", "destinatario", "tipo"],
+            ["101", "18/02/2026", "Cliente Uno", "Destinatario Uno", "DESPACHO"],
+        ],
+        "DETALLE_VENTAS": [
+            ["venta_id", "producto", "calibre", "kg", "precio_unit", "precio_total"],
+            ["101", "Palta Hass", "18", "100", "1500", "150000"],
+        ],
+    }
+
+
+def _provider(
+    tmp_path: Path,
+    service: _FakeSheetsService,
+    monkeypatch: pytest.MonkeyPatch,
+    now: list[float],
+) -> documents_provider.SnapshotDocumentsProvider:
+    """Provider de snapshot sobre un SQLite temporal, sin sync en segundo plano.
+
+    Args:
+        tmp_path: Carpeta temporal.
+        service: Doble de Sheets.
+        monkeypatch: Fixture de pytest para modificar dependencias.
+        now: Reloj controlado por el test.
+
+    Returns:
+        documents_provider.SnapshotDocumentsProvider: Provider listo para usar.
+    """
+
+    config = documents_provider.GoogleSheetsConfig(
+        spreadsheet_id="sheet-id",
+        clientes_sheet="CLIENTES",
+        destinatarios_sheet="DESTINATARIOS",
+        ventas_sheet="VENTAS",
+        detalle_sheet="DETALLE_VENTAS",
+        clientes_range="A1:K",
+        destinatarios_range="A1:H",
+        ventas_range="A1:H",
+        detalle_range="A1:J",
+        credentials_path="/tmp/fake-google.json",
+    )
+    snapshot = SnapshotConfig(
+        path=str(tmp_path / "snapshot.sqlite3"), sync_seconds=0, full_sync_seconds=3600
+    )
+    store = SheetsSnapshotStore(snapshot.path, "sheet-id", clock=lambda: now[0])
+    provider = documents_provider.SnapshotDocumentsProvider(config, snapshot, store=store)
+    monkeypatch.setattr(provider, "_build_service", lambda: service)
+    return provider
+
+
+def test_rows_range_offsets_the_configured_range() -> None:
+    """Verifica el cálculo del rango incremental."""
+
+    assert rows_range("A1:H", 0) == "A1:H"
+    assert rows_range("A1:H", 120) == "A121:H"
+    assert rows_range("B3:F10", 7) == "B10:F10"
+    assert rows_range("B3:F10", 8) is None
+
+
+def test_snapshot_provider_answers_like_sheets_and_syncs_appended_rows(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica el snapshot inicial y que luego solo se pidan las filas nuevas.
+
+    Args:
+        tmp_path: Carpeta temporal.
+        monkeypatch: Fixture de pytest para modificar dependencias.
+    """
+
+    service = _FakeSheetsService(_sheets())
+    now = [0.0]
+    provider = _provider(tmp_path, service, monkeypatch, now)
+    query = documents_provider.DocumentQuery(day=date(2026, 2, 18), allowed_types=["DESPACHO"])
+
+    first = provider.load_orders_frame(query)
+    again = provider.load_orders_frame(query)
+
+    assert service.ranges == [[f"{name}!{a1}" for name, a1 in _SHEETS]]
+    pd.testing.assert_frame_equal(first, again)
+    assert list(first["producto"]) == ["Palta Hass"]
+
+    service.sheets["VENTAS"].append(
+        ["102", "18/02/2026", "Cliente Uno", "Destinatario Uno", "DESPACHO"]
+    )
+    service.sheets["DETALLE_VENTAS"].append(["102", "Nuez", "", "2", "500", "1.000"])
+    now[0] = 60.0
+    changes = provider.sync()
+    result = provider.load_orders_frame(query)
+
+    assert service.ranges[-1] == [
+        "CLIENTES!A2:K",
+        "DESTINATARIOS!A2:H",
+        "VENTAS!A2:H",
+        "DETALLE_VENTAS!A2:J",
+    ]
+    assert changes == {"VENTAS": 1, "DETALLE_VENTAS": 1}
+    assert list(result["venta_id"]) == ["101", "102"]
+    assert list(result["precio_total"]) == [150000, 1000]
+
+    # Reabrir el archivo (otro proceso) ve el mismo snapshot sin ir a la red.
+    reopened = _provider(tmp_path, _FakeSheetsService({}), monkeypatch, now)
+    pd.testing.assert_frame_equal(reopened.load_orders_frame(query), result)
+
+
+def test_snapshot_resyncs_sheet_when_last_row_changes_or_full_sync_is_due(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica las relecturas completas (marcador distinto y antigüedad).
+
+    Args:
+        tmp_path: Carpeta temporal.
+        monkeypatch: Fixture de pytest para modificar dependencias.
+    """
+
+    service = _FakeSheetsService(_sheets())
+    now = [0.0]
+    provider = _provider(tmp_path, service, monkeypatch, now)
+    provider.sync()
+
+    service.sheets["CLIENTES"][1] = ["1", "Cliente Uno", "22.222.222-2"]
+    now[0] = 60.0
+    changes = provider.sync()
+
+    assert changes == {"CLIENTES": -1}
+    assert service.ranges[-1] == ["CLIENTES!A1:K"]
+    assert provider._store.load("CLIENTES")["rut"].tolist() == ["22.222.222-2"]
+
+    # CLIENTES se releyó en t=60: aún no le toca la relectura periódica.
+    now[0] = 3600.0
+    assert provider.sync() == {"DESTINATARIOS": -1, "VENTAS": -1, "DETALLE_VENTAS": -1}
+
+
+def test_snapshot_provider_fresh_query_rereads_facts_before_reading(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica que una lectura `fresh` vea una fila editada tras el último sync.
+
+    Args:
+        tmp_path: Carpeta temporal.
+        monkeypatch: Fixture de pytest para modificar dependencias.
+    """
+
+    sheets = _sheets()
+    sheets["DETALLE_VENTAS"].append(["101", "Nuez", "", "1", "500", "500"])
+    service = _FakeSheetsService(sheets)
+    now = [0.0]
+    provider = _provider(tmp_path, service, monkeypatch, now)
+    query = documents_provider.DocumentQuery(day=date(2026, 2, 18), allowed_types=["DESPACHO"])
+    provider.load_orders_frame(query)
+
+    # Cambia una fila que no es la última: la sincronización incremental no la ve.
+    service.sheets["DETALLE_VENTAS"][1] = ["101", "Palta Hass", "18", "100", "1600", "160000"]
+    provider.sync()
+    incremental = provider.load_orders_frame(query)
+    fresh = provider.load_orders_frame(
+        documents_provider.DocumentQuery(
+            day=date(2026, 2, 18), allowed_types=["DESPACHO"], fresh=True
+        )
+    )
+
+    assert sorted(incremental["precio_total"]) == [500, 150000]
+    assert sorted(fresh["precio_total"]) == [500, 160000]
+    assert service.ranges[-1] == ["VENTAS!A1:H", "DETALLE_VENTAS!A1:J"]
+
+
+def test_snapshot_syncer_runs_only_in_the_process_holding_the_host_lock(
+    tmp_path: Path,
+) -> None:
+    """Verifica que con el lock tomado el resto de los syncers no sincronice.
+
+    Args:
+        tmp_path: Carpeta temporal.
+    """
+
+    lock_path = str(tmp_path / "snapshot.sqlite3.sync.lock")
+    calls: list[str] = []
+    leader = SnapshotSyncer(lambda: calls.append("leader"), 30, lock=SnapshotSyncLock(lock_path))
+    follower = SnapshotSyncer(
+        lambda: calls.append("follower"), 30, lock=SnapshotSyncLock(lock_path)
+    )
+
+    assert leader.run_once() is True
+    assert follower.run_once() is False
+    assert leader.run_once() is True
+
+    leader.stop()
+
+    assert follower.run_once() is True
+    assert calls == ["leader", "leader", "follower"]
+    follower.stop()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import Session
+
+import print_server.worker.print_worker as print_worker
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobType
+
+
+def _printing_job(db: Session, files: list[str], *, attempts: int = 1) -> PrintJob:
+    """Crea un job PRINTING tomado por el worker.
+
+    Args:
+        db: Sesión de DB.
+        files: Valor de `payload.files`.
+        attempts: Intentos consumidos.
+
+    Returns:
+        PrintJob: Job persistido.
+    """
+
+    job = PrintJob(
+        job_type=PrintJobType.SHIPPING_DOCS,
+        status=PrintJobStatus.PRINTING,
+        payload={"what": "both", "files": files},
+        attempts=attempts,
+        max_attempts=3,
+        locked_by="print_worker@host:1",
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _reclaim(db: Session, job: PrintJob) -> None:
+    """Simula el claim del reintento (READY -> PRINTING).
+
+    Args:
+        db: Sesión de DB.
+        job: Job reprogramado.
+    """
+
+    job.status = PrintJobStatus.PRINTING
+    job.locked_by = "print_worker@host:1"
+    job.attempts += 1
+    db.commit()
+
+
+def test_retry_skips_files_printed_by_previous_attempt(
+    queue_db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Verifica que un reintento no reimprima lo que ya salió.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+        tmp_path: Carpeta temporal para los PDFs.
+    """
+
+    shipping, guides = tmp_path / "shipping.pdf", tmp_path / "guides.pdf"
+    shipping.write_bytes(b"%PDF")
+    guides.write_bytes(b"%PDF")
+    sent: list[str] = []
+
+    def _print(path: str) -> None:
+        if path == str(guides) and str(guides) not in sent:
+            sent.append(path)
+            raise RuntimeError("impresora sin papel")
+        sent.append(path)
+
+    monkeypatch.setattr(print_worker, "print_pdf_windows_sumatra", _print)
+    job = _printing_job(queue_db, [str(shipping), str(guides)])
+
+    print_worker._print_job(queue_db, job)
+
+    assert job.status == PrintJobStatus.READY
+    assert job.payload["printed_files"] == [str(shipping)]
+
+    _reclaim(queue_db, job)
+    print_worker._print_job(queue_db, job)
+
+    assert job.status == PrintJobStatus.DONE
+    assert sent == [str(shipping), str(guides), str(guides)]
+    assert job.payload["printed_files"] == [str(shipping), str(guides)]
+
+
+@pytest.mark.parametrize("files", [[], ["no-existe.pdf"]])
+def test_permanent_errors_go_straight_to_error(
+    queue_db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    files: list[str],
+) -> None:
+    """Verifica que un job sin archivos o con un PDF inexistente no se reintente.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+        files: Valor de `payload.files`.
+    """
+
+    monkeypatch.setattr(
+        print_worker, "print_pdf_windows_sumatra", lambda _path: pytest.fail("no debe imprimir")
+    )
+    job = _printing_job(queue_db, files)
+
+    print_worker._print_job(queue_db, job)
+
+    assert job.status == PrintJobStatus.ERROR
+    assert job.attempts == 1
+    assert job.locked_by is None
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import printing_queue.infra.claims as claims
+from printing_queue.infra.claims import build_claim_statement
+from printing_queue.models import (
+    JOB_PRIORITY_URGENT,
+    PrintJob,
+    PrintJobStatus,
+    PrintJobStatusEvent,
+    PrintJobType,
+)
+
+
+def _compile(statement) -> str:
+    """Compila un statement con el dialecto PostgreSQL.
+
+    Args:
+        statement: Statement SQLAlchemy.
+
+    Returns:
+        str: SQL renderizado.
+    """
+
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_build_claim_statement_updates_and_records_event_in_one_statement() -> None:
+    """Verifica que el claim sea un único UPDATE ... RETURNING con el evento en un CTE."""
+
+    sql = _compile(
+        build_claim_statement(
+            from_status=PrintJobStatus.PENDING,
+            to_status=PrintJobStatus.GENERATING,
+            source="generate_worker",
+            locked_by="worker@test:1",
+            changed_at=datetime(2026, 2, 18, 8, 0),
+            job_type=PrintJobType.SHIPPING_DOCS,
+        )
+    )
+
+    assert sql.startswith("WITH claimed AS")
+    assert "UPDATE printing.print_jobs SET status" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "RETURNING printing.print_jobs.id" in sql
+    assert "INSERT INTO printing.print_job_status_events" in sql
+    assert "CAST(" in sql and "AS printing.print_job_status)" in sql
+    assert "print_jobs.job_type =" in sql
+    assert "attempts=(printing.print_jobs.attempts + %(attempts_1)s)" in sql
+    assert "locked_by=" in sql and "lease_until=" in sql
+    assert "print_jobs.available_at <=" in sql
+
+
+def test_build_claim_statement_without_job_type_does_not_filter_type() -> None:
+    """Verifica que el print_worker pueda reclamar cualquier tipo de job READY."""
+
+    sql = _compile(
+        build_claim_statement(
+            from_status=PrintJobStatus.READY,
+            to_status=PrintJobStatus.PRINTING,
+            source="print_worker",
+            locked_by="worker@test:1",
+            changed_at=datetime(2026, 2, 18, 8, 0),
+        )
+    )
+
+    assert "job_type =" not in sql
+
+
+def test_build_claim_statement_batch_uses_in_subquery_with_limit() -> None:
+    """Verifica que el claim por lote bloquee hasta N filas en un solo statement."""
+
+    statement = build_claim_statement(
+        from_status=PrintJobStatus.READY,
+        to_status=PrintJobStatus.PRINTING,
+        source="print_worker",
+        locked_by="worker@test:1",
+        changed_at=datetime(2026, 2, 18, 8, 0),
+        limit=5,
+    )
+    compiled = statement.compile(dialect=postgresql.dialect())
+
+    assert "WHERE printing.print_jobs.id IN (SELECT" in str(compiled)
+    assert 5 in compiled.params.values()
+
+
+def test_build_claim_statement_inlines_status_for_partial_indexes() -> None:
+    """Verifica que estado y tipo lleguen como literales (índices parciales)."""
+
+    statement = build_claim_statement(
+        from_status=PrintJobStatus.PENDING,
+        to_status=PrintJobStatus.GENERATING,
+        source="generate_worker",
+        locked_by="worker@test:1",
+        changed_at=datetime(2026, 2, 18, 8, 0),
+        job_type=PrintJobType.SHIPPING_DOCS,
+    )
+    sql = str(
+        statement.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"render_postcompile": True},
+        )
+    )
+
+    assert "print_jobs.status = 'pending'" in sql
+    assert "print_jobs.job_type = 'shipping_docs'" in sql
+
+
+def test_print_jobs_declares_partial_claim_indexes() -> None:
+    """Verifica que los índices del claim sean parciales sobre cada cola."""
+
+    indexes = {index.name: index for index in PrintJob.__table__.indexes}
+    ready = indexes["ix_print_jobs_ready_priority_created_at"]
+    pending = indexes["ix_print_jobs_pending_shipping_priority_created_at"]
+
+    assert [column.name for column in ready.columns] == ["priority", "created_at"]
+    assert [column.name for column in pending.columns] == ["priority", "created_at"]
+    assert str(ready.dialect_options["postgresql"]["where"]) == "status = 'ready'"
+    assert "job_type = 'shipping_docs'" in str(pending.dialect_options["postgresql"]["where"])
+    assert "ix_print_job_status_events_job_id_occurred_at" in {
+        index.name for index in PrintJobStatusEvent.__table__.indexes
+    }
+
+
+def test_build_claim_statement_orders_by_aged_priority_then_fifo() -> None:
+    """Verifica el orden `(prioridad envejecida, created_at)` del claim."""
+
+    sql = _compile(
+        build_claim_statement(
+            from_status=PrintJobStatus.READY,
+            to_status=PrintJobStatus.PRINTING,
+            source="print_worker",
+            locked_by="worker@test:1",
+            changed_at=datetime(2026, 2, 18, 8, 0),
+        )
+    )
+
+    assert "ORDER BY greatest(printing.print_jobs.priority - floor(" in sql
+    assert "EXTRACT(epoch FROM" in sql
+    assert "printing.print_jobs.created_at ASC" in sql
+
+
+def test_build_claim_statement_bounds_aged_sort_to_per_level_candidates(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica que con aging se ordenen solo los más antiguos de cada prioridad.
+
+    Args:
+        monkeypatch: Fixture de pytest para ajustar settings.
+    """
+
+    monkeypatch.setattr(claims.settings, "JOB_PRIORITY_AGING_SECONDS", 60)
+    sql = _compile(
+        build_claim_statement(
+            from_status=PrintJobStatus.READY,
+            to_status=PrintJobStatus.PRINTING,
+            source="print_worker",
+            locked_by="worker@test:1",
+            changed_at=datetime(2026, 2, 18, 8, 0),
+            limit=3,
+        )
+    )
+
+    assert "FROM generate_series(" in sql and "AS level(level)" in sql
+    assert "JOIN LATERAL (SELECT printing.print_jobs.id AS id" in sql
+    assert "printing.print_jobs.priority = level.level" in sql
+    # El bloqueo va en cada nivel, no en el ORDER BY con aging.
+    lateral, aged = sql.split("AS per_level ON true")
+    assert lateral.rstrip().endswith("FOR UPDATE SKIP LOCKED)")
+    assert "SKIP LOCKED" not in aged
+
+
+def test_build_claim_statement_without_aging_orders_by_index(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica que sin aging el claim ordene por `(priority, created_at)` sin candidatos.
+
+    Args:
+        monkeypatch: Fixture de pytest para ajustar settings.
+    """
+
+    monkeypatch.setattr(claims.settings, "JOB_PRIORITY_AGING_SECONDS", 0)
+    sql = _compile(
+        build_claim_statement(
+            from_status=PrintJobStatus.READY,
+            to_status=PrintJobStatus.PRINTING,
+            source="print_worker",
+            locked_by="worker@test:1",
+            changed_at=datetime(2026, 2, 18, 8, 0),
+        )
+    )
+
+    assert "generate_series" not in sql
+    assert (
+        "ORDER BY printing.print_jobs.priority ASC, printing.print_jobs.created_at ASC" in sql
+    )
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+def test_aged_priority_promotes_waiting_jobs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verifica que un job de baja prioridad suba un nivel por tramo de espera.
+
+    Args:
+        monkeypatch: Fixture de pytest para ajustar settings.
+    """
+
+    monkeypatch.setattr(claims.settings, "JOB_PRIORITY_AGING_SECONDS", 60)
+    now = datetime(2026, 2, 18, 8, 0)
+    fresh = PrintJob(priority=5, created_at=now)
+    waiting = PrintJob(priority=9, created_at=now - timedelta(minutes=7))
+    starving = PrintJob(priority=9, created_at=now - timedelta(hours=2))
+
+    assert claims._aged_priority(fresh, now) == 5
+    assert claims._aged_priority(waiting, now) == 2
+    assert claims._aged_priority(starving, now) == JOB_PRIORITY_URGENT
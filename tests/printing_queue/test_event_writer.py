@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from printing_queue.infra.event_writer import BufferedStatusEventWriter
+from printing_queue.infra.job_status_events import enqueue_job
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobStatusEvent, PrintJobType
+
+
+def _new_job(db: Session) -> PrintJob:
+    """Crea un job READY de prueba.
+
+    Args:
+        db: Sesión de DB.
+
+    Returns:
+        PrintJob: Job persistido.
+    """
+
+    return enqueue_job(
+        db,
+        PrintJob(job_type=PrintJobType.UPLOAD, status=PrintJobStatus.READY, payload={}),
+        source="api",
+    )
+
+
+def test_buffered_writer_flushes_pending_events_on_close(queue_db: Session) -> None:
+    """Verifica que los eventos encolados se escriban en bloque al cerrar.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job_id = _new_job(queue_db).id
+    writer = BufferedStatusEventWriter(
+        sessionmaker(bind=queue_db.get_bind()),
+        flush_interval_ms=60_000,
+    )
+    writer.start()
+
+    for to_status in (PrintJobStatus.PRINTING, PrintJobStatus.DONE):
+        assert writer.submit(
+            job_id=job_id,
+            from_status=PrintJobStatus.READY,
+            to_status=to_status,
+            occurred_at=datetime(2026, 2, 18, 9, 0),
+            source="print_worker",
+        )
+    writer.close()
+
+    total = queue_db.scalar(select(func.count()).select_from(PrintJobStatusEvent))
+    assert writer.written == 2
+    assert writer.dropped == 0
+    assert total == 3
+
+
+def test_buffered_writer_counts_drops_when_buffer_is_full(queue_db: Session) -> None:
+    """Verifica que un buffer lleno descarte y cuente en vez de bloquear.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job_id = _new_job(queue_db).id
+    writer = BufferedStatusEventWriter(sessionmaker(bind=queue_db.get_bind()), max_buffer=1)
+    event = {
+        "job_id": job_id,
+        "from_status": PrintJobStatus.READY,
+        "to_status": PrintJobStatus.PRINTING,
+        "occurred_at": datetime(2026, 2, 18, 9, 0),
+        "source": "print_worker",
+    }
+
+    assert writer.submit(**event) is True
+    assert writer.submit(**event) is False
+    writer.close()
+
+    assert writer.dropped == 1
+    assert writer.written == 1
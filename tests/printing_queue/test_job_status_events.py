@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from printing_queue.infra.idempotency import idempotency_key
+from printing_queue.infra.job_status_events import enqueue_job, transition_job
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobStatusEvent, PrintJobType
+
+
+def _events(db: Session) -> list[tuple[PrintJobStatus | None, PrintJobStatus, str | None]]:
+    """Lista los eventos registrados en orden de inserción.
+
+    Args:
+        db: Sesión de DB.
+
+    Returns:
+        list[tuple]: Tuplas `(from_status, to_status, source)`.
+    """
+
+    rows = db.execute(
+        select(
+            PrintJobStatusEvent.from_status,
+            PrintJobStatusEvent.to_status,
+            PrintJobStatusEvent.source,
+        ).order_by(PrintJobStatusEvent.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def test_enqueue_job_records_initial_event(queue_db: Session) -> None:
+    """Verifica que el alta del job y su evento inicial queden juntos.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = enqueue_job(
+        queue_db,
+        PrintJob(
+            job_type=PrintJobType.SHIPPING_DOCS,
+            status=PrintJobStatus.PENDING,
+            payload={"what": "guides", "date": "2026-02-18"},
+        ),
+        source="api",
+    )
+
+    assert job.id is not None
+    assert _events(queue_db) == [(None, PrintJobStatus.PENDING, "api")]
+
+
+def test_transition_job_updates_status_fields_and_event_atomically(queue_db: Session) -> None:
+    """Verifica que estado, atributos extra y evento se escriban en el mismo commit.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = enqueue_job(
+        queue_db,
+        PrintJob(job_type=PrintJobType.UPLOAD, status=PrintJobStatus.READY, payload={}),
+        source="api",
+    )
+    changed_at = datetime(2026, 2, 18, 9, 30)
+
+    transition_job(
+        queue_db,
+        job,
+        PrintJobStatus.ERROR,
+        source="print_worker",
+        changed_at=changed_at,
+        error_msg="sin papel",
+    )
+    queue_db.expire_all()
+
+    stored = queue_db.get(PrintJob, job.id)
+    assert stored.status == PrintJobStatus.ERROR
+    assert stored.error_msg == "sin papel"
+    assert stored.updated_at == changed_at
+    assert _events(queue_db)[-1] == (
+        PrintJobStatus.READY,
+        PrintJobStatus.ERROR,
+        "print_worker",
+    )
+
+
+def test_enqueue_job_with_same_idempotency_key_returns_active_job(queue_db: Session) -> None:
+    """Verifica que un alta repetida no inserte otro job mientras el primero siga vivo.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    payload = {"what": "both", "date": "2026-02-18"}
+    key = idempotency_key(PrintJobType.SHIPPING_DOCS, payload)
+
+    def _new_job() -> PrintJob:
+        return PrintJob(
+            job_type=PrintJobType.SHIPPING_DOCS,
+            status=PrintJobStatus.PENDING,
+            payload=dict(payload),
+            idempotency_key=key,
+        )
+
+    first = enqueue_job(queue_db, _new_job(), source="api")
+    second = enqueue_job(queue_db, _new_job(), source="api")
+
+    assert second is first
+    assert len(_events(queue_db)) == 1
+
+    transition_job(queue_db, first, PrintJobStatus.DONE, source="print_worker")
+    third = enqueue_job(queue_db, _new_job(), source="api")
+
+    assert third.id != first.id
+
+
+def test_active_idempotency_key_is_unique_in_db(queue_db: Session) -> None:
+    """Verifica el índice único parcial (carrera entre dos altas).
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    for _ in range(2):
+        queue_db.add(
+            PrintJob(
+                job_type=PrintJobType.UPLOAD,
+                status=PrintJobStatus.READY,
+                payload={},
+                idempotency_key="k" * 64,
+            )
+        )
+    with pytest.raises(IntegrityError):
+        queue_db.commit()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import printing_queue.infra.leases as leases
+from printing_queue.infra.job_status_events import LeaseLostError, transition_job
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobStatusEvent, PrintJobType
+
+NOW = datetime(2026, 2, 18, 9, 0)
+
+
+def _leased_job(
+    db: Session,
+    status: PrintJobStatus,
+    *,
+    attempts: int = 1,
+    lease_until: datetime = NOW - timedelta(minutes=1),
+) -> PrintJob:
+    """Crea un job en curso con lease de un worker.
+
+    Args:
+        db: Sesión de DB.
+        status: Estado en curso (GENERATING o PRINTING).
+        attempts: Intentos consumidos.
+        lease_until: Vencimiento del lease.
+
+    Returns:
+        PrintJob: Job persistido.
+    """
+
+    job = PrintJob(
+        job_type=PrintJobType.SHIPPING_DOCS,
+        status=status,
+        payload={},
+        attempts=attempts,
+        locked_by="generate_worker@host:1",
+        lease_until=lease_until,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_reap_expired_leases_returns_jobs_to_previous_queue(queue_db: Session) -> None:
+    """Verifica que un GENERATING con lease vencido vuelva a PENDING sin dueño.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    expired = _leased_job(queue_db, PrintJobStatus.GENERATING)
+    alive = _leased_job(queue_db, PrintJobStatus.GENERATING, lease_until=NOW + timedelta(minutes=5))
+
+    reaped = leases.reap_expired_leases(
+        queue_db,
+        statuses=[PrintJobStatus.GENERATING],
+        source="generate_worker",
+        now=NOW,
+    )
+
+    assert [job.id for job in reaped] == [expired.id]
+    assert expired.status == PrintJobStatus.PENDING
+    assert expired.locked_by is None
+    assert expired.lease_until is None
+    assert alive.status == PrintJobStatus.GENERATING
+
+
+def test_reap_expired_leases_marks_error_after_max_attempts(queue_db: Session) -> None:
+    """Verifica que un job que ya agotó intentos quede en ERROR.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = _leased_job(queue_db, PrintJobStatus.PRINTING, attempts=2)
+    job.max_attempts = 2
+    queue_db.commit()
+
+    leases.reap_expired_leases(
+        queue_db,
+        statuses=[PrintJobStatus.PRINTING],
+        source="print_worker",
+        now=NOW,
+    )
+
+    assert job.status == PrintJobStatus.ERROR
+    assert "Lease vencido" in (job.error_msg or "")
+
+
+def test_renew_leases_only_touches_jobs_owned_by_worker(queue_db: Session) -> None:
+    """Verifica que la renovación no pise un job de otro worker.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = _leased_job(queue_db, PrintJobStatus.GENERATING)
+
+    assert leases.renew_leases(queue_db, [job.id], locked_by="otro@host:2") == 0
+    assert leases.renew_leases(queue_db, [job.id], locked_by="generate_worker@host:1") == 1
+    queue_db.refresh(job)
+    assert job.lease_until > NOW
+
+
+def test_transition_out_of_leased_status_releases_lease(queue_db: Session) -> None:
+    """Verifica que terminar un job suelte `locked_by`/`lease_until`.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = _leased_job(queue_db, PrintJobStatus.PRINTING)
+
+    transition_job(queue_db, job, PrintJobStatus.DONE, source="print_worker")
+
+    assert job.locked_by is None
+    assert job.lease_until is None
+
+
+def test_transition_after_lease_takeover_is_dropped(queue_db: Session) -> None:
+    """Verifica que un worker cuyo lease fue recuperado no pise al nuevo dueño.
+
+    Entre el claim y el final del render, el reaper devuelve el job a la cola
+    y otro worker lo reclama. El resultado del primero se descarta.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = _leased_job(queue_db, PrintJobStatus.GENERATING)
+    assert job.locked_by == "generate_worker@host:1"
+
+    other = Session(bind=queue_db.get_bind())
+    reaped = leases.reap_expired_leases(
+        other, statuses=[PrintJobStatus.GENERATING], source="generate_worker", now=NOW
+    )
+    assert [stale.id for stale in reaped] == [job.id]
+    reclaimed = other.get(PrintJob, job.id)
+    reclaimed.status = PrintJobStatus.GENERATING
+    reclaimed.locked_by = "generate_worker@host:2"
+    reclaimed.attempts += 1
+    other.commit()
+    other.close()
+
+    with pytest.raises(LeaseLostError):
+        transition_job(queue_db, job, PrintJobStatus.READY, source="generate_worker")
+
+    stored = queue_db.get(PrintJob, job.id)
+    assert stored.status == PrintJobStatus.GENERATING
+    assert stored.locked_by == "generate_worker@host:2"
+    assert queue_db.scalars(
+        select(PrintJobStatusEvent.to_status).where(PrintJobStatusEvent.job_id == job.id)
+    ).all() == [PrintJobStatus.PENDING]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import printing_queue.infra.notifications as notifications
+from printing_queue.models import PrintJobStatus
+
+
+class _RecordingSession:
+    """Sesión doble que registra los statements ejecutados.
+
+    Args:
+        dialect_name: Nombre del dialecto que reporta el bind.
+    """
+
+    def __init__(self, dialect_name: str) -> None:
+        self.executed: list[tuple[str, dict]] = []
+        self._bind = type("Bind", (), {"dialect": type("Dialect", (), {"name": dialect_name})()})()
+
+    def get_bind(self):
+        return self._bind
+
+    def execute(self, statement, params=None) -> None:
+        self.executed.append((str(statement), params or {}))
+
+
+def test_notify_jobs_available_uses_channel_of_status() -> None:
+    """Verifica que PENDING y READY publiquen en su propio canal."""
+
+    db = _RecordingSession("postgresql")
+
+    notifications.notify_jobs_available(db, PrintJobStatus.PENDING)  # type: ignore[arg-type]
+    notifications.notify_jobs_available(db, PrintJobStatus.READY)  # type: ignore[arg-type]
+    notifications.notify_jobs_available(db, PrintJobStatus.DONE)  # type: ignore[arg-type]
+
+    assert [params["channel"] for _sql, params in db.executed] == [
+        "printing_jobs_pending",
+        "printing_jobs_ready",
+    ]
+    assert "pg_notify" in db.executed[0][0]
+
+
+def test_notify_jobs_available_is_noop_outside_postgres() -> None:
+    """Verifica que en SQLite (tests) no se intente publicar NOTIFY."""
+
+    with Session(create_engine("sqlite:///:memory:")) as db:
+        notifications.notify_jobs_available(db, PrintJobStatus.PENDING)
+
+
+def test_listener_falls_back_to_polling_when_not_postgres(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica que sin PostgreSQL el listener degrade a `sleep(POLL_SECONDS)`.
+
+    Args:
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+    """
+
+    sleeps: list[float] = []
+    monkeypatch.setattr(notifications.time, "sleep", sleeps.append)
+    listener = notifications.JobNotificationListener(
+        PrintJobStatus.READY,
+        database_url="sqlite:///:memory:",
+    )
+
+    assert listener.enabled is False
+    assert listener.wait() is False
+    assert sleeps == [notifications.settings.POLL_SECONDS]
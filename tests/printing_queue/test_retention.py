@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import printing_queue.maintenance as maintenance
+from printing_queue.infra.retention import (
+    HISTORY_VIEW_COLUMNS,
+    archive_finished_jobs,
+    ensure_event_partitions,
+    ensure_history_view,
+)
+from printing_queue.models import (
+    PrintJob,
+    PrintJobArchive,
+    PrintJobStatus,
+    PrintJobStatusEvent,
+    PrintJobType,
+)
+
+NOW = datetime(2026, 2, 18, 9, 0)
+
+
+def _job(db: Session, status: PrintJobStatus, *, age_days: int) -> PrintJob:
+    """Crea un job con su evento, actualizado hace `age_days` días.
+
+    Args:
+        db: Sesión de DB.
+        status: Estado del job.
+        age_days: Antigüedad de `updated_at`.
+
+    Returns:
+        PrintJob: Job persistido.
+    """
+
+    changed_at = NOW - timedelta(days=age_days)
+    job = PrintJob(
+        job_type=PrintJobType.SHIPPING_DOCS,
+        status=status,
+        payload={"what": "both"},
+        created_at=changed_at,
+        updated_at=changed_at,
+    )
+    db.add(job)
+    db.flush()
+    db.add(PrintJobStatusEvent(job_id=job.id, to_status=status, occurred_at=changed_at, source="test"))
+    db.commit()
+    return job
+
+
+def test_archive_finished_jobs_moves_old_done_and_error_in_batches(queue_db: Session) -> None:
+    """Verifica que solo los terminados antiguos pasen al archivo, sin perder eventos.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    old_ids = [
+        _job(queue_db, PrintJobStatus.DONE, age_days=40).id,
+        _job(queue_db, PrintJobStatus.ERROR, age_days=35).id,
+        _job(queue_db, PrintJobStatus.DONE, age_days=31).id,
+    ]
+    recent = _job(queue_db, PrintJobStatus.DONE, age_days=1)
+    pending = _job(queue_db, PrintJobStatus.PENDING, age_days=90)
+
+    archived = archive_finished_jobs(queue_db, older_than=NOW - timedelta(days=30), batch_size=2)
+
+    assert archived == 3
+    assert sorted(queue_db.scalars(select(PrintJob.id))) == sorted([recent.id, pending.id])
+    archive = {job.id: job for job in queue_db.scalars(select(PrintJobArchive))}
+    assert sorted(archive) == sorted(old_ids)
+    assert archive[old_ids[1]].status == PrintJobStatus.ERROR
+    assert archive[old_ids[0]].payload == {"what": "both"}
+    assert queue_db.scalar(select(func.count()).select_from(PrintJobStatusEvent)) == 5
+
+
+def test_ensure_event_partitions_is_noop_outside_postgres(queue_db: Session) -> None:
+    """Verifica que en SQLite no se intente particionar.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    assert ensure_event_partitions(queue_db, months_ahead=2) == 0
+    assert ensure_history_view(queue_db) is False
+
+
+def test_history_view_columns_match_init_db_script() -> None:
+    """Verifica que la vista de `maintenance` y la de `init_db.sql` coincidan."""
+
+    script = (Path(__file__).resolve().parents[2] / "scripts" / "init_db.sql").read_text(
+        encoding="utf-8"
+    )
+    view_sql = " ".join(script.split("CREATE OR REPLACE VIEW printing.print_jobs_all AS")[1].split())
+    expected = ", ".join(HISTORY_VIEW_COLUMNS)
+
+    assert f"SELECT {expected}, NULL::timestamp AS archived_at FROM printing.print_jobs " in view_sql
+    assert f"SELECT {expected}, archived_at FROM printing.print_jobs_archive" in view_sql
+
+
+def test_maintenance_archive_cli(
+    queue_db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verifica `python -m printing_queue.maintenance archive`.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+        monkeypatch: Fixture de pytest para stubs de dependencias.
+    """
+
+    job = _job(queue_db, PrintJobStatus.DONE, age_days=0)
+    job.updated_at = datetime.now() - timedelta(days=10)
+    queue_db.commit()
+    monkeypatch.setattr(maintenance, "SessionLocal", lambda: queue_db)
+
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, format="{message}")
+    try:
+        assert maintenance.main(["archive", "--older-than-days", "5", "--batch-size", "10"]) == 0
+    finally:
+        logger.remove(handler_id)
+
+    assert "Jobs archivados (> 5 días): 1\n" in messages
+
+
+def test_status_event_model_matches_partitioned_table() -> None:
+    """Verifica que el modelo declare la PK del particionado y no el índice redundante."""
+
+    table = PrintJobStatusEvent.__table__
+
+    assert [column.name for column in table.primary_key.columns] == ["id", "occurred_at"]
+    assert [[column.name for column in index.columns] for index in table.indexes] == [
+        ["job_id", "occurred_at"]
+    ]
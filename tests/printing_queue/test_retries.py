@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+import printing_queue.infra.retries as retries
+from printing_queue.infra.claims import seconds_until_available
+from printing_queue.models import PrintJob, PrintJobStatus, PrintJobType
+
+NOW = datetime(2026, 2, 18, 9, 0)
+
+
+def _running_job(db: Session, status: PrintJobStatus, *, attempts: int, max_attempts: int = 3) -> PrintJob:
+    """Crea un job en curso tomado por un worker.
+
+    Args:
+        db: Sesión de DB.
+        status: Estado en curso (GENERATING o PRINTING).
+        attempts: Intentos consumidos.
+        max_attempts: Máximo de intentos del job.
+
+    Returns:
+        PrintJob: Job persistido.
+    """
+
+    job = PrintJob(
+        job_type=PrintJobType.SHIPPING_DOCS,
+        status=status,
+        payload={},
+        attempts=attempts,
+        max_attempts=max_attempts,
+        locked_by="generate_worker@host:1",
+        lease_until=NOW + timedelta(minutes=5),
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_retry_delay_grows_exponentially_with_jitter_and_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verifica el rango [nominal/2, nominal] y el tope de la espera.
+
+    Args:
+        monkeypatch: Fixture de pytest para ajustar settings.
+    """
+
+    monkeypatch.setattr(retries.settings, "RETRY_BACKOFF_BASE_SECONDS", 10)
+    monkeypatch.setattr(retries.settings, "RETRY_BACKOFF_MAX_SECONDS", 60)
+    rng = random.Random(7)
+
+    for attempts, nominal in [(1, 10), (2, 20), (3, 40), (4, 60), (50, 60)]:
+        delay = retries.retry_delay(attempts, rng=rng)
+        assert nominal / 2 <= delay <= nominal
+
+
+def test_retry_or_fail_reschedules_into_previous_queue(queue_db: Session) -> None:
+    """Verifica que una falla transitoria devuelva el job a PENDING diferido.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = _running_job(queue_db, PrintJobStatus.GENERATING, attempts=1)
+
+    retried = retries.retry_or_fail(
+        queue_db, job, "Sheets no responde", source="generate_worker", changed_at=NOW
+    )
+
+    assert retried is True
+    assert job.status == PrintJobStatus.PENDING
+    assert job.error_msg == "Sheets no responde"
+    assert job.locked_by is None
+    assert job.available_at > NOW
+    assert seconds_until_available(queue_db, status=PrintJobStatus.PENDING, now=NOW) == pytest.approx(
+        (job.available_at - NOW).total_seconds()
+    )
+
+
+def test_retry_or_fail_marks_error_when_attempts_exhausted(queue_db: Session) -> None:
+    """Verifica que al agotar `max_attempts` el job quede en ERROR.
+
+    Args:
+        queue_db: Sesión sobre la cola en memoria.
+    """
+
+    job = _running_job(queue_db, PrintJobStatus.PRINTING, attempts=3, max_attempts=3)
+
+    retried = retries.retry_or_fail(queue_db, job, "Spooler caído", source="print_worker", changed_at=NOW)
+
+    assert retried is False
+    assert job.status == PrintJobStatus.ERROR
+    assert seconds_until_available(queue_db, status=PrintJobStatus.READY, now=NOW) is None